@@ -0,0 +1,77 @@
+"""Store snapshot and session metrics as indexed JSONB with typed hot columns
+
+Tables are created by Base.metadata.create_all on startup, so every
+statement here is written to be a no-op on a database that already has
+the new shape.
+
+Revision ID: 0001_jsonb_metrics
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_jsonb_metrics"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _number(key: str) -> str:
+    # Only copy values that are JSON numbers; anything else becomes NULL
+    return (
+        f"CASE WHEN jsonb_typeof(metrics -> '{key}') = 'number' "
+        f"THEN (metrics ->> '{key}')::double precision END"
+    )
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE progress_snapshots ALTER COLUMN metrics TYPE JSONB USING metrics::jsonb")
+    op.execute("ALTER TABLE workout_sessions ALTER COLUMN metrics TYPE JSONB USING metrics::jsonb")
+
+    op.execute("ALTER TABLE progress_snapshots ADD COLUMN IF NOT EXISTS weight_kg DOUBLE PRECISION")
+    op.execute("ALTER TABLE progress_snapshots ADD COLUMN IF NOT EXISTS bodyfat_pct DOUBLE PRECISION")
+    op.execute("ALTER TABLE progress_snapshots ADD COLUMN IF NOT EXISTS waist_cm DOUBLE PRECISION")
+    op.execute("ALTER TABLE workout_sessions ADD COLUMN IF NOT EXISTS total_volume DOUBLE PRECISION")
+    op.execute("ALTER TABLE workout_sessions ADD COLUMN IF NOT EXISTS duration_minutes INTEGER")
+
+    op.execute(
+        f"""
+        UPDATE progress_snapshots SET
+            weight_kg = {_number('weight_kg')},
+            bodyfat_pct = {_number('bodyfat_pct')},
+            waist_cm = {_number('waist_cm')}
+        """
+    )
+    op.execute(
+        f"""
+        UPDATE workout_sessions SET
+            total_volume = {_number('total_volume')},
+            duration_minutes = ({_number('duration_minutes')})::integer
+        WHERE metrics IS NOT NULL
+        """
+    )
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_progress_snapshots_metrics ON progress_snapshots USING gin (metrics)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_workout_sessions_metrics ON workout_sessions USING gin (metrics)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_progress_snapshots_user_date ON progress_snapshots (user_id, date)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_workout_sessions_user_start_time ON workout_sessions (user_id, start_time)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_workout_sessions_user_start_time")
+    op.execute("DROP INDEX IF EXISTS ix_progress_snapshots_user_date")
+    op.execute("DROP INDEX IF EXISTS ix_workout_sessions_metrics")
+    op.execute("DROP INDEX IF EXISTS ix_progress_snapshots_metrics")
+
+    op.execute("ALTER TABLE workout_sessions DROP COLUMN IF EXISTS duration_minutes")
+    op.execute("ALTER TABLE workout_sessions DROP COLUMN IF EXISTS total_volume")
+    op.execute("ALTER TABLE progress_snapshots DROP COLUMN IF EXISTS waist_cm")
+    op.execute("ALTER TABLE progress_snapshots DROP COLUMN IF EXISTS bodyfat_pct")
+    op.execute("ALTER TABLE progress_snapshots DROP COLUMN IF EXISTS weight_kg")
+
+    op.execute("ALTER TABLE workout_sessions ALTER COLUMN metrics TYPE JSON USING metrics::json")
+    op.execute("ALTER TABLE progress_snapshots ALTER COLUMN metrics TYPE JSON USING metrics::json")
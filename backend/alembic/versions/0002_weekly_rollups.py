@@ -0,0 +1,63 @@
+"""Add per-user ISO-week rollups and backfill them
+
+Revision ID: 0002_weekly_rollups
+Revises: 0001_jsonb_metrics
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_weekly_rollups"
+down_revision: Union[str, None] = "0001_jsonb_metrics"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS weekly_rollups (
+            id UUID PRIMARY KEY,
+            user_id UUID NOT NULL REFERENCES users (id),
+            week_start DATE NOT NULL,
+            workouts_completed INTEGER NOT NULL DEFAULT 0,
+            workout_volume DOUBLE PRECISION NOT NULL DEFAULT 0,
+            workout_minutes INTEGER NOT NULL DEFAULT 0,
+            habits_completed INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT uq_weekly_rollups_user_week UNIQUE (user_id, week_start)
+        )
+        """
+    )
+    # Same computation as app.services.rollups.rebuild_weekly_rollups
+    op.execute("DELETE FROM weekly_rollups")
+    op.execute(
+        """
+        INSERT INTO weekly_rollups
+            (id, user_id, week_start, workouts_completed, workout_volume, workout_minutes, habits_completed)
+        SELECT gen_random_uuid(), user_id, week_start,
+               sum(workouts_completed), sum(workout_volume), sum(workout_minutes), sum(habits_completed)
+        FROM (
+            SELECT user_id,
+                   date_trunc('week', start_time AT TIME ZONE 'UTC')::date AS week_start,
+                   1 AS workouts_completed,
+                   coalesce(total_volume, 0) AS workout_volume,
+                   coalesce(duration_minutes, 0) AS workout_minutes,
+                   0 AS habits_completed
+            FROM workout_sessions
+            WHERE end_time IS NOT NULL
+            UNION ALL
+            SELECT habits.user_id, date_trunc('week', habit_logs.date::timestamp)::date, 0, 0, 0, 1
+            FROM habit_logs JOIN habits ON habits.id = habit_logs.habit_id
+            WHERE habit_logs.status = 'done'
+        ) AS events
+        GROUP BY user_id, week_start
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS weekly_rollups")
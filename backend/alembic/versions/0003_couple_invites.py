@@ -0,0 +1,66 @@
+"""Persist couple invites and limit users to one couple
+
+Revision ID: 0003_couple_invites
+Revises: 0002_weekly_rollups
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_couple_invites"
+down_revision: Union[str, None] = "0002_weekly_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS couple_invites (
+            id UUID PRIMARY KEY,
+            couple_id UUID NOT NULL REFERENCES couples (id),
+            code VARCHAR(8) NOT NULL,
+            created_by_user_id UUID NOT NULL REFERENCES users (id),
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_couple_invites_code ON couple_invites (code)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_couple_invites_expires_at ON couple_invites (expires_at)")
+
+    # Keep each user's earliest membership before enforcing one couple per user
+    op.execute(
+        """
+        DELETE FROM couple_members AS m
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY user_id ORDER BY joined_at NULLS LAST, id
+            ) AS position
+            FROM couple_members
+        ) AS ranked
+        WHERE m.id = ranked.id AND ranked.position > 1
+        """
+    )
+    # Same name create_all gives the column's unique constraint
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'couple_members_user_id_key'
+            ) THEN
+                ALTER TABLE couple_members
+                    ADD CONSTRAINT couple_members_user_id_key UNIQUE (user_id);
+            END IF;
+        END $$
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE couple_members DROP CONSTRAINT IF EXISTS couple_members_user_id_key")
+    op.execute("DROP TABLE IF EXISTS couple_invites")
@@ -0,0 +1,60 @@
+"""Split weekly rollups by workout mode and count skipped habits
+
+Revision ID: 0004_rollup_breakdowns
+Revises: 0003_couple_invites
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_rollup_breakdowns"
+down_revision: Union[str, None] = "0003_couple_invites"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_COUNTERS = ("gym_sessions", "home_sessions", "habits_skipped")
+
+
+def upgrade() -> None:
+    for counter in NEW_COUNTERS:
+        op.execute(f"ALTER TABLE weekly_rollups ADD COLUMN IF NOT EXISTS {counter} INTEGER NOT NULL DEFAULT 0")
+
+    # Same computation as app.services.rollups.rebuild_weekly_rollups
+    op.execute("DELETE FROM weekly_rollups")
+    op.execute(
+        """
+        INSERT INTO weekly_rollups
+            (id, user_id, week_start, workouts_completed, gym_sessions, home_sessions,
+             workout_volume, workout_minutes, habits_completed, habits_skipped)
+        SELECT gen_random_uuid(), user_id, week_start,
+               sum(workouts_completed), sum(gym_sessions), sum(home_sessions),
+               sum(workout_volume), sum(workout_minutes), sum(habits_completed), sum(habits_skipped)
+        FROM (
+            SELECT user_id,
+                   date_trunc('week', start_time AT TIME ZONE 'UTC')::date AS week_start,
+                   1 AS workouts_completed,
+                   (mode = 'gym')::integer AS gym_sessions,
+                   (mode = 'home')::integer AS home_sessions,
+                   coalesce(total_volume, 0) AS workout_volume,
+                   coalesce(duration_minutes, 0) AS workout_minutes,
+                   0 AS habits_completed,
+                   0 AS habits_skipped
+            FROM workout_sessions
+            WHERE end_time IS NOT NULL
+            UNION ALL
+            SELECT habits.user_id, date_trunc('week', habit_logs.date::timestamp)::date, 0, 0, 0, 0, 0,
+                   (habit_logs.status = 'done')::integer, (habit_logs.status = 'skipped')::integer
+            FROM habit_logs JOIN habits ON habits.id = habit_logs.habit_id
+            WHERE habit_logs.status IN ('done', 'skipped')
+        ) AS events
+        GROUP BY user_id, week_start
+        """
+    )
+
+
+def downgrade() -> None:
+    for counter in NEW_COUNTERS:
+        op.execute(f"ALTER TABLE weekly_rollups DROP COLUMN IF EXISTS {counter}")
@@ -0,0 +1,26 @@
+"""Track account deletion requests for the purge job
+
+Revision ID: 0005_account_deletion
+Revises: 0004_rollup_breakdowns
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_account_deletion"
+down_revision: Union[str, None] = "0004_rollup_breakdowns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_users_deleted_at ON users (deleted_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_users_deleted_at")
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS deleted_at")
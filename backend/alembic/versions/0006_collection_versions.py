@@ -0,0 +1,36 @@
+"""Per-user collection change counters for list ETags
+
+Revision ID: 0006_collection_versions
+Revises: 0005_account_deletion
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_collection_versions"
+down_revision: Union[str, None] = "0005_account_deletion"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # No backfill: a missing row reads as version 0, and the first write creates it
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS collection_versions (
+            id UUID PRIMARY KEY,
+            user_id UUID NOT NULL REFERENCES users (id),
+            collection VARCHAR(32) NOT NULL,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT uq_collection_versions_user_collection UNIQUE (user_id, collection)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS collection_versions")
@@ -0,0 +1,61 @@
+"""updated_at on every synced table, and tombstones for deletes
+
+Revision ID: 0007_delta_sync
+Revises: 0006_collection_versions
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_delta_sync"
+down_revision: Union[str, None] = "0006_collection_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_UPDATED_AT = ("habit_logs", "workout_sessions", "progress_snapshots")
+
+INDEXES = (
+    ("ix_habits_user_updated_at", "habits", "user_id, updated_at"),
+    ("ix_habit_logs_habit_updated_at", "habit_logs", "habit_id, updated_at"),
+    ("ix_workout_templates_owner_updated_at", "workout_templates", "owner_user_id, updated_at"),
+    ("ix_workout_sessions_user_updated_at", "workout_sessions", "user_id, updated_at"),
+    ("ix_progress_snapshots_user_updated_at", "progress_snapshots", "user_id, updated_at"),
+    ("ix_share_permissions_owner_updated_at", "share_permissions", "owner_user_id, updated_at"),
+    ("ix_share_permissions_viewer_updated_at", "share_permissions", "viewer_user_id, updated_at"),
+)
+
+
+def upgrade() -> None:
+    for table in NEW_UPDATED_AT:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()")
+        # Existing rows were last written when they were created
+        op.execute(f"UPDATE {table} SET updated_at = created_at WHERE created_at IS NOT NULL")
+
+    for name, table, columns in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_tombstones (
+            id UUID PRIMARY KEY,
+            user_id UUID NOT NULL REFERENCES users (id),
+            entity VARCHAR(32) NOT NULL,
+            entity_id UUID NOT NULL,
+            deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_sync_tombstones_user_deleted_at ON sync_tombstones (user_id, deleted_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS sync_tombstones")
+    for name, _, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    for table in NEW_UPDATED_AT:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS updated_at")
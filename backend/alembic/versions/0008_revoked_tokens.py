@@ -0,0 +1,39 @@
+"""revoked_tokens for logout and refresh token rotation
+
+Revision ID: 0008_revoked_tokens
+Revises: 0007_delta_sync
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_revoked_tokens"
+down_revision: Union[str, None] = "0007_delta_sync"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            id UUID PRIMARY KEY,
+            jti VARCHAR(64) NOT NULL UNIQUE,
+            token_type VARCHAR(16) NOT NULL,
+            user_id UUID,
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            revoked_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at ON revoked_tokens (expires_at)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_revoked_tokens_type_revoked_at ON revoked_tokens (token_type, revoked_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS revoked_tokens")
@@ -0,0 +1,28 @@
+"""users.security_version for trusting access-token claims
+
+Revision ID: 0009_security_version
+Revises: 0008_revoked_tokens
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_security_version"
+down_revision: Union[str, None] = "0008_revoked_tokens"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS security_version INTEGER NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS security_changed_at TIMESTAMP WITH TIME ZONE")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_users_security_changed_at ON users (security_changed_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_users_security_changed_at")
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS security_changed_at")
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS security_version")
@@ -24,11 +24,99 @@ class Settings(BaseSettings):
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     
+    # Sign in with Apple
+    APPLE_CLIENT_ID: str = ""  # The app's bundle id; the identity token's audience
+    APPLE_ISSUER: str = "https://appleid.apple.com"
+    APPLE_JWKS_URL: str = "https://appleid.apple.com/auth/keys"
+    APPLE_JWKS_FILE: str = ""  # A local JWKS document to use instead of the URL
+    APPLE_JWKS_TTL_SECONDS: int = 86400
+    APPLE_JWKS_MIN_REFRESH_SECONDS: int = 60
+    APPLE_JWKS_TIMEOUT_SECONDS: float = 5.0
+    
+    # Password Hashing
+    PASSWORD_HASH_WORKERS: int = 4
+    
+    # Login Throttling
+    LOGIN_THROTTLE_EMAIL_FREE_FAILURES: int = 5
+    LOGIN_THROTTLE_IP_FREE_FAILURES: int = 20
+    LOGIN_THROTTLE_BASE_DELAY_SECONDS: float = 1.0
+    LOGIN_THROTTLE_MAX_DELAY_SECONDS: float = 900.0
+    LOGIN_THROTTLE_RESET_SECONDS: int = 3600
+    LOGIN_THROTTLE_MAX_TRACKED: int = 100000
+    
+    # Couple Invites
+    COUPLE_INVITE_EXPIRE_HOURS: int = 48
+    COUPLE_INVITE_PURGE_INTERVAL_SECONDS: int = 3600
+    
+    # Caching
+    PROGRESS_SUMMARY_CACHE_TTL_SECONDS: int = 300
+    PROGRESS_SUMMARY_CACHE_SIZE: int = 10000
+    TOKEN_CLAIMS_CACHE_SIZE: int = 10000
+    
+    # Token Revocation
+    REVOCATION_SYNC_INTERVAL_SECONDS: int = 10
+    # Re-read rows this far behind the last sync, covering commit delays and clock skew
+    REVOCATION_SYNC_OVERLAP_SECONDS: int = 60
+    REVOCATION_PURGE_INTERVAL_SECONDS: int = 3600
+    
+    # Bulk Import
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 100
+    
+    # Data Export
+    EXPORT_BATCH_SIZE: int = 500
+    EXPORT_CHUNK_BYTES: int = 65536
+    
+    # Account Deletion
+    ACCOUNT_PURGE_BATCH_SIZE: int = 1000
+    ACCOUNT_PURGE_INTERVAL_SECONDS: int = 300
+    
+    # Delta Sync
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_MAX_PAGE_SIZE: int = 2000
+    SYNC_CURSOR_LAG_SECONDS: int = 5
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90
+    SYNC_TOMBSTONE_PURGE_INTERVAL_SECONDS: int = 3600
+    
+    # Response Compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_CONTENT_TYPES: str = "application/json,application/x-ndjson,text/*"
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
+    # Server-Timing
+    SERVER_TIMING_SAMPLE_RATE: float = 0.05
+    SERVER_TIMING_HEADER: bool = True
+    
+    # Profiling
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_ROUTES: str = "/api/habits/logs,/api/habits/stats,/api/workout-sessions/stats"
+    PROFILER_MAX_CONCURRENT: int = 1
+    PROFILER_INTERVAL_SECONDS: float = 0.001
+    PROFILER_FORMAT: str = "speedscope"
+    PROFILER_OUTPUT_DIR: str = "profiles"
+    
+    # Health Checks
+    HEALTH_PROBE_INTERVAL_SECONDS: int = 5
+    HEALTH_PROBE_MAX_AGE_SECONDS: int = 15
+    HEALTH_POOL_SATURATION_THRESHOLD: float = 1.0
+    
+    # Proxies
+    # Comma-separated IPs/CIDRs of load balancers whose X-Forwarded-For is believed;
+    # empty means clients connect directly
+    TRUSTED_PROXIES: str = ""
+    
     # CORS
     CORS_ORIGINS: str = "*"
     
     # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_WINDOW: int = 60
+    RATE_LIMIT_IP_REQUESTS: int = 300  # Per RATE_LIMIT_WINDOW; covers several users behind one NAT
+    RATE_LIMIT_ROUTE_OVERRIDES: str = "POST /api/auth/login=10/60,POST /api/auth/register=5/300,POST /api/auth/apple=10/60"
+    RATE_LIMIT_STORE: str = "memory"  # or "sqlite" to share counters between workers on one host
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_SQLITE_PATH: str = "/tmp/couples-rate-limit.sqlite3"
 
 settings = Settings()
\ No newline at end of file
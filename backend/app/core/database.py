@@ -1,9 +1,18 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import orjson
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+def json_serializer(value) -> str:
+    # orjson for the JSON/JSONB columns (metrics, exercises); much faster than json.dumps
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -0,0 +1,110 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Optional
+import time
+
+from .config import settings
+from .database import engine as default_engine
+
+class DatabaseProbe:
+    """
+    The last result of a background `SELECT 1`, refreshed every
+    HEALTH_PROBE_INTERVAL_SECONDS by a periodic job. Readiness checks read
+    this instead of querying, so probes add no load of their own; a result
+    older than HEALTH_PROBE_MAX_AGE_SECONDS (e.g. because the job is stuck
+    waiting on an exhausted pool) counts as a failure.
+    """
+
+    def __init__(self):
+        self.ok = False
+        self.error: Optional[str] = "not checked yet"
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[datetime] = None
+        self.alembic_version: Optional[str] = None
+        self.engine: Engine = default_engine
+        self._checked_monotonic: Optional[float] = None
+        self._lock = Lock()
+
+    def refresh(self, db: Session) -> int:
+        """Periodic job entry point (see start_periodic_job); always returns 0 rows affected."""
+        started = time.perf_counter()
+        ok, error, version = True, None, None
+        try:
+            db.execute(text("SELECT 1"))
+            version = self._alembic_version(db)
+        except SQLAlchemyError as e:
+            ok, error = False, e.__class__.__name__
+        finally:
+            # Read-only; don't sit in an open transaction until the session closes
+            db.rollback()
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            self.ok = ok
+            self.error = error
+            self.latency_ms = round(latency_ms, 2)
+            self.checked_at = datetime.now(timezone.utc)
+            self._checked_monotonic = time.monotonic()
+            self.engine = db.get_bind()
+            if ok:
+                self.alembic_version = version
+        return 0
+
+    def _alembic_version(self, db: Session) -> Optional[str]:
+        # Savepoint, so a database that was never migrated doesn't fail the probe
+        try:
+            with db.begin_nested():
+                return db.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except SQLAlchemyError:
+            return None
+
+    def age_seconds(self) -> Optional[float]:
+        if self._checked_monotonic is None:
+            return None
+        return time.monotonic() - self._checked_monotonic
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            age = self.age_seconds()
+            fresh = age is not None and age <= settings.HEALTH_PROBE_MAX_AGE_SECONDS
+            return {
+                "ok": self.ok and fresh,
+                "error": self.error if fresh or age is None else "probe result is stale",
+                "latency_ms": self.latency_ms,
+                "checked_at": self.checked_at,
+                "age_seconds": round(age, 2) if age is not None else None
+            }
+
+database_probe = DatabaseProbe()
+
+def pool_stats(engine: Engine) -> Optional[dict]:
+    """Connection pool usage, read from the pool itself without touching the database."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0
+    }
+
+def readiness() -> dict:
+    """Whether this worker should receive traffic, with the evidence."""
+    database = database_probe.snapshot()
+    pool = pool_stats(database_probe.engine)
+    pool_ok = pool is None or pool["saturation"] < settings.HEALTH_POOL_SATURATION_THRESHOLD
+    return {
+        "ready": database["ok"] and pool_ok,
+        "database": database,
+        "pool": pool,
+        "migration": {"version": database_probe.alembic_version}
+    }
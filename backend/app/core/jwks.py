@@ -0,0 +1,113 @@
+"""
+A per-process cache of a JSON Web Key Set, for verifying tokens signed by
+a third party (e.g. Sign in with Apple) without fetching its keys per request.
+
+Keys are refetched when the set is older than `ttl_seconds`, or when a token
+names a key id the cached set lacks (the provider rotated keys) - at most
+once per `min_refresh_seconds`, so tokens with made-up key ids can't turn
+into a stream of fetches. Concurrent misses share a single fetch.
+"""
+from threading import Lock
+from typing import Callable, Dict, Optional
+import json
+import logging
+import time
+
+import requests
+
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Anything returning a parsed JWKS document ({"keys": [...]}) can be a key source
+KeySource = Callable[[], dict]
+
+class JWKSError(Exception):
+    """No key with the requested id is available."""
+
+class HTTPKeySource:
+    def __init__(self, url: str, timeout_seconds: float = 5.0):
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+
+    def __call__(self) -> dict:
+        response = requests.get(self.url, timeout=self.timeout_seconds)
+        response.raise_for_status()
+        return response.json()
+
+class FileKeySource:
+    """A JWKS document on disk, for tests and offline development."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self) -> dict:
+        with open(self.path, "rb") as f:
+            return json.load(f)
+
+class JWKSCache:
+    def __init__(
+        self,
+        name: str,
+        source: KeySource,
+        ttl_seconds: float,
+        min_refresh_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.source = source
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self.clock = clock
+        self.fetches = 0
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = Lock()
+
+    def _fresh(self, now: float) -> bool:
+        return self._fetched_at is not None and now - self._fetched_at < self.ttl_seconds
+
+    def get_key(self, kid: str) -> dict:
+        """The JWK with id `kid`, fetching the set only when needed."""
+        key = self._keys.get(kid)
+        if key is not None and self._fresh(self.clock()):
+            CACHE_REQUESTS.labels(self.name, "hit").inc()
+            return key
+
+        CACHE_REQUESTS.labels(self.name, "miss").inc()
+        with self._lock:
+            # Whoever held the lock before us may already have fetched what we need
+            now = self.clock()
+            key = self._keys.get(kid)
+            if key is not None and self._fresh(now):
+                return key
+
+            recently_fetched = self._fetched_at is not None and now - self._fetched_at < self.min_refresh_seconds
+            if not recently_fetched:
+                self._refresh(now)
+                key = self._keys.get(kid)
+
+        if key is None:
+            raise JWKSError(f"Unknown key id: {kid}")
+        return key
+
+    def _refresh(self, now: float) -> None:
+        try:
+            document = self.source()
+            keys = {key["kid"]: key for key in document["keys"] if "kid" in key}
+        except Exception:
+            # Keep serving the keys we have; the provider rotates them rarely
+            logger.exception("Fetching %s keys failed", self.name)
+            if self._fetched_at is None:
+                raise JWKSError(f"No {self.name} keys available")
+            self._fetched_at = now - self.ttl_seconds + self.min_refresh_seconds
+            return
+
+        self.fetches += 1
+        self._keys = keys
+        self._fetched_at = now
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = None
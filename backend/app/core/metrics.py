@@ -0,0 +1,122 @@
+"""
+Prometheus metrics for the API process.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory before the server starts (and clear it on every deploy):
+each worker then writes its samples there and /metrics aggregates all of
+them, whichever worker answers the scrape.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Tuple
+import os
+import time
+
+from .timing import record_phase
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last body chunk",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed", ["operation"])
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool")
+DB_POOL_CONNECTIONS_CREATED = Counter("db_pool_connections_created_total", "New database connections opened")
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out",
+    "Connections currently checked out of the pool",
+    multiprocess_mode="livesum"
+)
+
+BCRYPT_QUEUE_DEPTH = Gauge(
+    "bcrypt_queue_depth",
+    "Password hash/verify calls waiting for or running on the hashing pool",
+    multiprocess_mode="livesum"
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds",
+    "Time a password hash/verify call spent queued and running",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+LOGIN_ATTEMPTS = Counter("login_attempts_total", "POST /auth/login outcomes", ["result"])
+LOGIN_LOCKOUTS = Counter("login_lockouts_total", "Failed logins that (re)locked an email or IP", ["scope"])
+
+CACHE_REQUESTS = Counter("cache_requests_total", "In-process cache lookups", ["cache", "result"])
+
+COMPRESSION_BYTES_IN = Counter("compression_bytes_in_total", "Response bytes before compression", ["encoding"])
+COMPRESSION_BYTES_OUT = Counter("compression_bytes_out_total", "Response bytes after compression", ["encoding"])
+COMPRESSION_CPU_SECONDS = Counter("compression_cpu_seconds_total", "CPU time spent compressing responses", ["encoding"])
+
+# Bounded label values, so odd statements can't blow up the series count
+SQL_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+def _operation(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return verb if verb in SQL_OPERATIONS else "OTHER"
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every statement run on `engine`, and track its pool usage."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+        operation = _operation(statement)
+        DB_QUERIES.labels(operation).inc()
+        DB_QUERY_DURATION.labels(operation).observe(elapsed)
+        record_phase("db", elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # after_cursor_execute doesn't fire for failed statements
+        connection = context.connection
+        if connection is not None and connection.info.get("query_start_times"):
+            connection.info["query_start_times"].pop()
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS_CREATED.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+def render_metrics() -> Tuple[bytes, str]:
+    """The Prometheus text exposition and its content type."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges from the multiprocess directory on shutdown."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,41 @@
+"""
+The client's address as seen through trusted reverse proxies.
+
+Behind a load balancer every request arrives from the balancer's address.
+When the direct peer is one of TRUSTED_PROXIES, X-Forwarded-For is read
+right to left, skipping further trusted hops, and the first untrusted
+address is the client. Headers from untrusted peers are ignored, so
+clients can't pick their own address.
+"""
+from functools import lru_cache
+from ipaddress import ip_address, ip_network
+from typing import List, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+from .config import settings
+
+@lru_cache(maxsize=4)
+def _trusted_networks(value: str) -> List:
+    return [ip_network(entry.strip(), strict=False) for entry in value.split(",") if entry.strip()]
+
+def _is_trusted(address: str, networks: List) -> bool:
+    try:
+        parsed = ip_address(address)
+    except ValueError:
+        return False
+    return any(parsed in network for network in networks)
+
+def get_client_ip(scope: Scope) -> str:
+    peer: Optional[str] = scope["client"][0] if scope.get("client") else None
+    networks = _trusted_networks(settings.TRUSTED_PROXIES)
+    if peer is None or not networks or not _is_trusted(peer, networks):
+        return peer or "unknown"
+
+    forwarded = Headers(scope=scope).get("x-forwarded-for", "")
+    for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+        if not _is_trusted(hop, networks):
+            return hop
+    # Every hop is a proxy we run: the leftmost is as close to the client as we can get
+    return forwarded.split(",")[0].strip() or peer
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+from jose import JWTError, jwt
+from pathlib import Path
+from threading import Lock
+from typing import List, Optional
+import random
+import re
+import uuid
+
+from .config import settings
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+except ImportError:  # Profiling is unavailable without pyinstrument; everything else works
+    Profiler = None
+
+PROFILE_TOKEN_TYPE = "profile"
+
+# File extension and renderer per PROFILER_FORMAT
+PROFILE_FORMATS = {
+    "speedscope": (".speedscope.json", "SpeedscopeRenderer"),
+    "html": (".html", "HTMLRenderer"),
+}
+
+def create_profile_token(expires_delta: Optional[timedelta] = None) -> str:
+    """A token for the X-Profile header; anyone holding the JWT secret can mint one."""
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(hours=1))
+    return jwt.encode(
+        {"exp": expire, "type": PROFILE_TOKEN_TYPE},
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM
+    )
+
+def verify_profile_token(token: str) -> bool:
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("type") == PROFILE_TOKEN_TYPE
+
+class ProfileSlots:
+    """Non-blocking cap on profiles running at once; requests over the cap simply aren't profiled."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._lock = Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+def sampled_route_prefixes() -> List[str]:
+    return [prefix.strip() for prefix in settings.PROFILER_ROUTES.split(",") if prefix.strip()]
+
+def should_profile(path: str, profile_token: Optional[str]) -> bool:
+    """A signed X-Profile header profiles any route; otherwise sample the configured routes."""
+    if Profiler is None:
+        return False
+    if profile_token:
+        return verify_profile_token(profile_token)
+    if settings.PROFILER_SAMPLE_RATE <= 0:
+        return False
+    if not any(path.startswith(prefix) for prefix in sampled_route_prefixes()):
+        return False
+    return random.random() < settings.PROFILER_SAMPLE_RATE
+
+def start_profiler() -> "Profiler":
+    profiler = Profiler(interval=settings.PROFILER_INTERVAL_SECONDS, async_mode="enabled")
+    profiler.start()
+    return profiler
+
+def profile_filename(method: str, path: str) -> str:
+    extension, _ = PROFILE_FORMATS[settings.PROFILER_FORMAT]
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-") or "root"
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}-{method.lower()}-{slug}-{uuid.uuid4().hex[:8]}{extension}"
+
+def write_profile(profiler: "Profiler", filename: str) -> Path:
+    """Render a stopped profiler into PROFILER_OUTPUT_DIR. Blocking; run it off the event loop."""
+    _, renderer_name = PROFILE_FORMATS[settings.PROFILER_FORMAT]
+    renderer = SpeedscopeRenderer() if renderer_name == "SpeedscopeRenderer" else HTMLRenderer()
+
+    output_dir = Path(settings.PROFILER_OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / filename
+    path.write_text(profiler.output(renderer), encoding="utf-8")
+    return path
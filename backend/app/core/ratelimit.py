@@ -0,0 +1,178 @@
+"""
+Sliding-window rate limiting.
+
+Each key gets a counter per fixed window; the current estimate is this
+window's count plus the previous window's count weighted by how much of it
+still overlaps the sliding window. Rejected requests are not counted.
+"""
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import math
+import re
+import sqlite3
+
+from starlette.routing import compile_path
+
+from .config import settings
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # Seconds; 0 when allowed
+
+def _evaluate(previous: int, current: int, limit: int, window: int, now: float) -> RateLimitResult:
+    elapsed = now % window
+    weight = 1 - elapsed / window
+    estimate = previous * weight + current
+    if estimate + 1 <= limit:
+        return RateLimitResult(True, limit, max(int(limit - estimate - 1), 0), 0)
+
+    if current + 1 > limit or previous == 0:
+        # Even a fully decayed previous window leaves no room: wait for the next window
+        retry_after = window - elapsed
+    else:
+        # Wait until the previous window's weight has decayed enough for one more request
+        needed_weight = (limit - current - 1) / previous
+        retry_after = (1 - needed_weight) * window - elapsed
+    # Rounded first so float noise (40.000000001) doesn't add a second
+    return RateLimitResult(False, limit, 0, max(math.ceil(round(retry_after, 6)), 1))
+
+class MemoryRateLimitStore:
+    """
+    Per-process counters, split across shards with their own locks so
+    concurrent requests for different keys rarely contend.
+    """
+
+    SWEEP_EVERY = 1024
+    blocking = False
+
+    def __init__(self, shards: Optional[int] = None):
+        shards = shards or settings.RATE_LIMIT_SHARDS
+        self._shards: List[Dict[str, Tuple[int, int, int, int]]] = [{} for _ in range(shards)]
+        self._locks = [Lock() for _ in range(shards)]
+        self._operations = [0] * shards
+
+    def hit(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        index = hash(key) % len(self._shards)
+        counters = self._shards[index]
+        window_index = int(now // window)
+        with self._locks[index]:
+            stored_index, previous, current, _ = counters.get(key, (window_index, 0, 0, window))
+            if stored_index == window_index - 1:
+                previous, current = current, 0
+            elif stored_index != window_index:
+                previous, current = 0, 0
+
+            result = _evaluate(previous, current, limit, window, now)
+            if result.allowed:
+                current += 1
+            counters[key] = (window_index, previous, current, window)
+
+            self._operations[index] += 1
+            if self._operations[index] % self.SWEEP_EVERY == 0:
+                self._sweep(counters, now)
+        return result
+
+    @staticmethod
+    def _sweep(counters: Dict[str, Tuple[int, int, int, int]], now: float) -> None:
+        # A key idle for two of its windows can no longer affect any decision
+        expired = [
+            key for key, (window_index, _, _, window) in counters.items()
+            if (window_index + 2) * window <= now
+        ]
+        for key in expired:
+            del counters[key]
+
+class SQLiteRateLimitStore:
+    """
+    Counters in a local SQLite file, shared by every worker process on the
+    host. Each hit is one short IMMEDIATE transaction, which serializes
+    writers across processes.
+    """
+
+    SWEEP_EVERY = 1024
+    # hit() may wait up to the connection timeout for another worker's write lock
+    blocking = True
+
+    def __init__(self, path: Optional[str] = None):
+        self._connection = sqlite3.connect(
+            path or settings.RATE_LIMIT_SQLITE_PATH,
+            timeout=5,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_counters (
+                key TEXT NOT NULL,
+                window INTEGER NOT NULL,
+                window_seconds INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (key, window)
+            )
+            """
+        )
+        self._lock = Lock()
+        self._operations = 0
+
+    def hit(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        window_index = int(now // window)
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                counts = dict(cursor.execute(
+                    "SELECT window, count FROM rate_limit_counters WHERE key = ? AND window IN (?, ?)",
+                    (key, window_index - 1, window_index)
+                ).fetchall())
+                result = _evaluate(counts.get(window_index - 1, 0), counts.get(window_index, 0), limit, window, now)
+                if result.allowed:
+                    cursor.execute(
+                        """
+                        INSERT INTO rate_limit_counters (key, window, window_seconds, count) VALUES (?, ?, ?, 1)
+                        ON CONFLICT (key, window) DO UPDATE SET count = count + 1
+                        """,
+                        (key, window_index, window)
+                    )
+                self._operations += 1
+                if self._operations % self.SWEEP_EVERY == 0:
+                    cursor.execute(
+                        "DELETE FROM rate_limit_counters WHERE (window + 2) * window_seconds <= ?",
+                        (now,)
+                    )
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+        return result
+
+class RateLimitRule(NamedTuple):
+    method: str
+    path_regex: re.Pattern
+    limit: int
+    window: int
+    name: str
+
+def parse_route_overrides(value: str) -> List[RateLimitRule]:
+    """
+    Parse RATE_LIMIT_ROUTE_OVERRIDES: comma-separated `METHOD /path=limit/window`
+    entries, where the path may use route parameters like `{habit_id}`.
+    """
+    rules = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        route, _, quota = entry.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        limit, _, window = quota.partition("/")
+        path_regex, _, _ = compile_path(path.strip())
+        rules.append(RateLimitRule(method.upper(), path_regex, int(limit), int(window), f"{method.upper()} {path.strip()}"))
+    return rules
+
+def create_rate_limit_store():
+    if settings.RATE_LIMIT_STORE == "sqlite":
+        return SQLiteRateLimitStore()
+    return MemoryRateLimitStore()
@@ -0,0 +1,70 @@
+"""
+Revoked access tokens, checked on every authenticated request.
+
+Each worker keeps the ids (jti) of revoked, not yet expired access tokens in
+a dict, along with the users whose security version was bumped recently
+(making older tokens' claims stale), and pulls changes made by other workers
+every REVOCATION_SYNC_INTERVAL_SECONDS (app.services.revocation). The checks
+themselves never touch the database; a token revoked on another worker keeps
+working here until the next sync. Access tokens live for minutes, so both
+dicts stay small; refresh tokens are checked against the table when used.
+"""
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Optional, Tuple
+import time
+
+class RevocationList:
+    def __init__(self):
+        self._expires_at: Dict[str, float] = {}
+        # User id -> (current security version, when no older token can still be unexpired)
+        self._security_versions: Dict[str, Tuple[int, float]] = {}
+        self._lock = Lock()
+        # Database time the last sync started, so the next one only reads newer rows
+        self.synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+    def add(self, jti: str, expires_at: float) -> bool:
+        """Remember `jti` until `expires_at` (epoch seconds). Returns whether it was new."""
+        with self._lock:
+            is_new = jti not in self._expires_at
+            self._expires_at[jti] = expires_at
+        return is_new
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._expires_at
+
+    def set_security_version(self, user_id: str, version: int, forget_at: float) -> bool:
+        """Reject the user's tokens claiming an older version until `forget_at`. Returns whether it was new."""
+        with self._lock:
+            known = self._security_versions.get(user_id)
+            if known is not None and known[0] >= version:
+                return False
+            self._security_versions[user_id] = (version, forget_at)
+        return True
+
+    def is_stale(self, user_id: str, version: int) -> bool:
+        known = self._security_versions.get(user_id)
+        return known is not None and version < known[0]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Forget entries whose tokens have expired anyway. Returns how many were dropped."""
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [jti for jti, expires_at in self._expires_at.items() if expires_at <= now]
+            for jti in expired:
+                del self._expires_at[jti]
+            settled = [user_id for user_id, (_, forget_at) in self._security_versions.items() if forget_at <= now]
+            for user_id in settled:
+                del self._security_versions[user_id]
+        return len(expired) + len(settled)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires_at.clear()
+            self._security_versions.clear()
+            self.synced_at = None
+
+revocation_list = RevocationList()
@@ -1,13 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
+from typing import Callable, Optional, Union, Any
 from jose import jwt
 from passlib.context import CryptContext
+import asyncio
+import hashlib
+import secrets
+import time
+import uuid
+from .cache import TTLCache
 from .config import settings
+from .metrics import BCRYPT_DURATION, BCRYPT_QUEUE_DEPTH
+from .revocation import revocation_list
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified claims by token digest, each kept until its token's own exp
+token_claims_cache = TTLCache(
+    "token_claims",
+    maxsize=settings.TOKEN_CLAIMS_CACHE_SIZE,
+    ttl_seconds=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+# bcrypt is deliberately slow; keep it off the event loop on a bounded pool
+_password_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
 def create_access_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any], expires_delta: Optional[timedelta] = None, claims: Optional[dict] = None
 ) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -15,13 +37,13 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(subject: Union[str, Any]) -> str:
     expire = datetime.utcnow() + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh", "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
@@ -31,11 +53,55 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+@lru_cache(maxsize=1)
+def dummy_password_hash() -> str:
+    """A real hash of a random password, verified against when the email is unknown so timing matches."""
+    return get_password_hash(secrets.token_urlsafe(16))
+
+async def _run_password_hash(operation: str, func: Callable, *args):
+    started = time.perf_counter()
+    BCRYPT_QUEUE_DEPTH.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_hash_pool, func, *args)
+    finally:
+        BCRYPT_QUEUE_DEPTH.dec()
+        BCRYPT_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_hash("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_hash("hash", get_password_hash, password)
+
+def _token_digest(token: str) -> bytes:
+    # Raw tokens are never kept in memory as cache keys
+    return hashlib.sha256(token.encode()).digest()
+
+def token_id(token: str, payload: dict) -> str:
+    """The token's jti; tokens issued before jti existed are identified by their digest."""
+    return payload.get("jti") or _token_digest(token).hex()
+
 def decode_token(token: str) -> Optional[dict]:
+    """
+    Verified, unrevoked claims of `token`, or None. A token seen before costs
+    one cache lookup instead of a signature check; callers must treat the
+    dict as read-only.
+    """
+    key = _token_digest(token)
+    payload = token_claims_cache.get(key)
+    if payload is not None:
+        # Revocation is checked on every call, so logging out works even for cached claims
+        return None if revocation_list.is_revoked(token_id(token, payload)) else payload
+    
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except jwt.JWTError:
-        return None
\ No newline at end of file
+        return None
+    
+    # Tokens without exp are never cached, so a cached entry can't outlive its token
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_claims_cache.set(key, payload, ttl_seconds=expires_in)
+    return None if revocation_list.is_revoked(token_id(token, payload)) else payload
\ No newline at end of file
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from typing import Callable, List
+
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_background_tasks: List[asyncio.Task] = []
+
+def _run_job(job: Callable[[Session], int]) -> int:
+    # The session lives and dies on the worker thread, so cancelling the
+    # awaiting task at shutdown can't close it mid-query
+    db = SessionLocal()
+    try:
+        return job(db)
+    finally:
+        db.close()
+
+async def _run_periodically(name: str, job: Callable[[Session], int], interval_seconds: int):
+    while True:
+        try:
+            # Jobs use the sync session, so keep them off the event loop
+            affected = await asyncio.to_thread(_run_job, job)
+            if affected:
+                logger.info("%s: %s rows affected", name, affected)
+        except Exception:
+            logger.exception("Background job %s failed", name)
+        await asyncio.sleep(interval_seconds)
+
+def start_periodic_job(name: str, job: Callable[[Session], int], interval_seconds: int) -> None:
+    """Schedule `job(db)` to run every `interval_seconds` on the running event loop."""
+    task = asyncio.create_task(_run_periodically(name, job, interval_seconds), name=name)
+    _background_tasks.append(task)
+
+async def stop_periodic_jobs() -> None:
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
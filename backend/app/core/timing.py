@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi.routing import APIRoute
+from typing import Callable, Dict, Iterator, Optional
+import asyncio
+import functools
+import time
+
+class RequestTimings:
+    """Time spent per phase of one sampled request, accumulated across calls."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.handler_finished: Optional[float] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """The phases as a Server-Timing header value, in milliseconds."""
+        entries = []
+        for phase, seconds in self.durations.items():
+            entry = f"{phase};dur={seconds * 1000:.1f}"
+            if phase == "db":
+                entry += f';desc="{self.counts[phase]} queries"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request_timings() -> RequestTimings:
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+def record_phase(phase: str, seconds: float) -> None:
+    """Add to a phase of the current request; a no-op unless the request is sampled."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+def _timed_endpoint(call: Callable) -> Callable:
+    def finish(timings: RequestTimings, started: float) -> None:
+        timings.handler_finished = time.perf_counter()
+        timings.add("handler", timings.handler_finished - started)
+
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def endpoint(**kwargs):
+            timings = _current_timings.get()
+            if timings is None:
+                return await call(**kwargs)
+            started = time.perf_counter()
+            try:
+                return await call(**kwargs)
+            finally:
+                finish(timings, started)
+    else:
+        @functools.wraps(call)
+        def endpoint(**kwargs):
+            timings = _current_timings.get()
+            if timings is None:
+                return call(**kwargs)
+            started = time.perf_counter()
+            try:
+                return call(**kwargs)
+            finally:
+                finish(timings, started)
+    endpoint.timed = True
+    return endpoint
+
+class TimedRoute(APIRoute):
+    """
+    Splits a sampled request's route time into the endpoint body ("handler")
+    and what FastAPI does with its return value afterwards: response model
+    validation and rendering ("serialize").
+    """
+
+    def get_route_handler(self) -> Callable:
+        if not getattr(self.dependant.call, "timed", False):
+            self.dependant.call = _timed_endpoint(self.dependant.call)
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request):
+            response = await route_handler(request)
+            timings = _current_timings.get()
+            if timings is not None and timings.handler_finished is not None:
+                timings.add("serialize", time.perf_counter() - timings.handler_finished)
+            return response
+
+        return timed_route_handler
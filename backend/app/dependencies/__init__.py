@@ -1,3 +1,8 @@
-from .auth import get_current_user, get_current_active_user
+from .auth import Principal, get_current_user, get_current_active_user, get_current_principal, get_active_principal
+from .permissions import PermissionResolver, get_permissions
+from .conditional import ConditionalGet, conditional_get
 
-__all__ = ["get_current_user", "get_current_active_user"]
\ No newline at end of file
+__all__ = [
+    "Principal", "get_current_user", "get_current_active_user", "get_current_principal", "get_active_principal",
+    "PermissionResolver", "get_permissions", "ConditionalGet", "conditional_get"
+]
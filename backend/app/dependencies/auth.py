@@ -1,44 +1,110 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from dataclasses import dataclass
 from jose import JWTError
+from typing import Optional
 import uuid
 
 from ..core.database import get_db
+from ..core.revocation import revocation_list
 from ..core.security import decode_token
+from ..core.timing import timed
+from ..models.couple import CoupleMember
 from ..models.user import User
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+@dataclass(frozen=True)
+class Principal:
+    """
+    The caller as described by their access token's signed claims. Enough
+    for handlers that only need the user's id; handlers that need profile
+    fields depend on get_current_active_user instead.
+    """
+    id: uuid.UUID
+    couple_id: Optional[uuid.UUID]
+    is_active: bool
+    security_version: int
+
+def _credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def _access_token_claims(token: str) -> dict:
     try:
-        payload = decode_token(credentials.credentials)
-        if payload is None:
-            raise credentials_exception
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        with timed("jwt"):
+            payload = decode_token(token)
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == uuid.UUID(user_id)).first()
-    if user is None:
-        raise credentials_exception
-    
-    return user
+        raise _credentials_exception()
+    # Refresh tokens are only revoked in the table, so they must never pass as access tokens
+    if payload is None or payload.get("type") == "refresh" or payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    with timed("auth"):
+        payload = _access_token_claims(credentials.credentials)
+        
+        user = db.query(User).filter(User.id == uuid.UUID(payload["sub"])).first()
+        if user is None:
+            raise _credentials_exception()
+        
+        return user
 
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    with timed("auth"):
+        payload = _access_token_claims(credentials.credentials)
+        try:
+            user_id = uuid.UUID(payload["sub"])
+        except ValueError:
+            raise _credentials_exception()
+        
+        if "sv" in payload:
+            # The claims stand in for the user row until a bump_security_version makes them stale
+            if revocation_list.is_stale(payload["sub"], payload["sv"]):
+                raise _credentials_exception("Token is out of date")
+            couple_id = payload.get("cid")
+            return Principal(
+                id=user_id,
+                couple_id=uuid.UUID(couple_id) if couple_id else None,
+                is_active=payload.get("act", False),
+                security_version=payload["sv"]
+            )
+        
+        # Tokens issued before these claims existed cost one lookup
+        row = db.query(User.is_active, User.security_version, CoupleMember.couple_id).outerjoin(
+            CoupleMember, CoupleMember.user_id == User.id
+        ).filter(User.id == user_id).first()
+        if row is None:
+            raise _credentials_exception()
+        
+        return Principal(
+            id=user_id,
+            couple_id=row.couple_id,
+            is_active=row.is_active,
+            security_version=row.security_version
+        )
+
+async def get_active_principal(
+    principal: Principal = Depends(get_current_principal)
+) -> Principal:
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
@@ -0,0 +1,54 @@
+from fastapi import Depends, Request, Response, status
+from sqlalchemy.orm import Session
+from datetime import date
+import hashlib
+
+from ..core.database import get_db
+from ..services.versions import get_collection_version
+from .auth import Principal, get_active_principal
+
+class ConditionalGet:
+    """The ETag of a list response and whether the client's cached copy is still current."""
+
+    def __init__(self, etag: str, not_modified: bool):
+        self.etag = etag
+        self.not_modified = not_modified
+
+    def not_modified_response(self) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        )
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+def conditional_get(collection: str):
+    """
+    Dependency factory for list endpoints backed by a versioned collection.
+
+    The ETag is derived from the user's collection version (one indexed
+    lookup), the query string and today's date, so it can be checked before
+    the endpoint runs its own queries. Handlers return
+    `not_modified_response()` when `not_modified` is set.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        current_user: Principal = Depends(get_active_principal),
+        db: Session = Depends(get_db)
+    ) -> ConditionalGet:
+        version = get_collection_version(db, current_user.id, collection)
+        # Today's date is part of the key: some lists (e.g. habits' today_status) change at midnight
+        key = f"{current_user.id}:{collection}:{version}:{date.today()}:{request.url.query}"
+        etag = '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+        
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        
+        if_none_match = request.headers.get("if-none-match")
+        return ConditionalGet(etag, bool(if_none_match) and _matches(if_none_match, etag))
+    
+    return dependency
@@ -0,0 +1,187 @@
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+import uuid
+
+from ..core.database import get_db
+from ..models.user import User
+from ..models.couple import CoupleMember, CoupleSettings, CoupleRole
+from ..models.share import SharePermissions
+from .auth import Principal, get_active_principal
+
+# Marks a resolver whose couple has to be looked up from the membership table
+_UNKNOWN_COUPLE = object()
+
+class PermissionResolver:
+    """
+    Answers sharing and couple-access questions for one user.
+
+    Couple membership (with settings) and share grants are each loaded with a
+    single query the first time they are needed, then every check is answered
+    in memory for the rest of the request.
+
+    When the caller already knows the user's couple (the token's couple claim),
+    membership is loaded straight from that couple, and a user without one
+    needs no couple query at all.
+    """
+
+    def __init__(self, db: Session, user_id: uuid.UUID, couple_id=_UNKNOWN_COUPLE):
+        self.db = db
+        self.user_id = user_id
+        self._known_couple_id = couple_id
+        self._couple_loaded = False
+        self._members: List[CoupleMember] = []
+        self._member_names: Dict[uuid.UUID, str] = {}
+        self._settings: Optional[CoupleSettings] = None
+        self._grants_loaded = False
+        self._received: Dict[uuid.UUID, SharePermissions] = {}
+        self._owned: Dict[uuid.UUID, SharePermissions] = {}
+
+    # Loading
+
+    def _load_couple(self):
+        if self._couple_loaded:
+            return
+
+        if self._known_couple_id is None:
+            self._couple_loaded = True
+            return
+
+        # All members of the user's couple (if any) plus the couple's settings
+        if self._known_couple_id is _UNKNOWN_COUPLE:
+            user_couple = self.db.query(CoupleMember.couple_id).filter(
+                CoupleMember.user_id == self.user_id
+            ).scalar_subquery()
+        else:
+            user_couple = self._known_couple_id
+
+        rows = self.db.query(CoupleMember, CoupleSettings, User.display_name).join(
+            User, User.id == CoupleMember.user_id
+        ).outerjoin(
+            CoupleSettings, CoupleSettings.couple_id == CoupleMember.couple_id
+        ).filter(
+            CoupleMember.couple_id == user_couple
+        ).all()
+
+        for member, couple_settings, display_name in rows:
+            self._members.append(member)
+            self._member_names[member.user_id] = display_name
+            if couple_settings is not None:
+                self._settings = couple_settings
+        self._couple_loaded = True
+
+    def _load_grants(self):
+        if self._grants_loaded:
+            return
+
+        grants = self.db.query(SharePermissions).filter(
+            (SharePermissions.owner_user_id == self.user_id) |
+            (SharePermissions.viewer_user_id == self.user_id)
+        ).all()
+
+        for grant in grants:
+            if grant.viewer_user_id == self.user_id:
+                self._received[grant.owner_user_id] = grant
+            if grant.owner_user_id == self.user_id:
+                self._owned[grant.viewer_user_id] = grant
+        self._grants_loaded = True
+
+    # Couple access
+
+    @property
+    def membership(self) -> Optional[CoupleMember]:
+        self._load_couple()
+        for member in self._members:
+            if member.user_id == self.user_id:
+                return member
+        return None
+
+    @property
+    def couple_id(self) -> Optional[uuid.UUID]:
+        membership = self.membership
+        return membership.couple_id if membership else None
+
+    @property
+    def partner(self) -> Optional[CoupleMember]:
+        self._load_couple()
+        for member in self._members:
+            if member.user_id != self.user_id:
+                return member
+        return None
+
+    @property
+    def partner_name(self) -> Optional[str]:
+        partner = self.partner
+        return self._member_names.get(partner.user_id) if partner else None
+
+    @property
+    def couple_settings(self) -> Optional[CoupleSettings]:
+        self._load_couple()
+        return self._settings
+
+    def is_couple_member(self, couple_id: uuid.UUID) -> bool:
+        return self.couple_id == couple_id
+
+    def is_couple_owner(self, couple_id: uuid.UUID) -> bool:
+        membership = self.membership
+        return (
+            membership is not None
+            and membership.couple_id == couple_id
+            and membership.role == CoupleRole.owner
+        )
+
+    def is_partner(self, user_id: uuid.UUID) -> bool:
+        partner = self.partner
+        return partner is not None and partner.user_id == user_id
+
+    # Share grants
+
+    def grant_from(self, owner_user_id: uuid.UUID) -> Optional[SharePermissions]:
+        """The grant `owner_user_id` has given to the current user, if any."""
+        self._load_grants()
+        return self._received.get(owner_user_id)
+
+    def grant_to(self, viewer_user_id: uuid.UUID) -> Optional[SharePermissions]:
+        """The grant the current user has given to `viewer_user_id`, if any."""
+        self._load_grants()
+        return self._owned.get(viewer_user_id)
+
+    def owned_grant(self, permission_id: uuid.UUID) -> Optional[SharePermissions]:
+        self._load_grants()
+        for grant in self._owned.values():
+            if grant.id == permission_id:
+                return grant
+        return None
+
+    def can_view_progress(self, owner_user_id: uuid.UUID) -> bool:
+        if owner_user_id == self.user_id:
+            return True
+        grant = self.grant_from(owner_user_id)
+        if grant is None or not grant.can_view_progress:
+            return False
+        # A couple can switch progress sharing off for both partners
+        if self.is_partner(owner_user_id) and self.couple_settings is not None:
+            return bool(self.couple_settings.share_progress_enabled)
+        return True
+
+    def can_view_habits(self, owner_user_id: uuid.UUID) -> bool:
+        if owner_user_id == self.user_id:
+            return True
+        grant = self.grant_from(owner_user_id)
+        if grant is None or not grant.can_view_habits:
+            return False
+        if self.is_partner(owner_user_id) and self.couple_settings is not None:
+            return bool(self.couple_settings.share_habits_enabled)
+        return True
+
+async def get_permissions(
+    request: Request,
+    current_user: Principal = Depends(get_active_principal),
+    db: Session = Depends(get_db)
+) -> PermissionResolver:
+    # Memoize on the request so every dependency and handler shares one resolver
+    resolver = getattr(request.state, "permissions", None)
+    if resolver is None or resolver.user_id != current_user.id:
+        resolver = PermissionResolver(db, current_user.id, current_user.couple_id)
+        request.state.permissions = resolver
+    return resolver
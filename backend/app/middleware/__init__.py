@@ -0,0 +1,10 @@
+from .compression import CompressionMiddleware, compression_stats
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .ratelimit import RateLimitMiddleware
+from .timing import ServerTimingMiddleware
+
+__all__ = [
+    "CompressionMiddleware", "compression_stats", "MetricsMiddleware", "ProfilingMiddleware",
+    "RateLimitMiddleware", "ServerTimingMiddleware"
+]
@@ -0,0 +1,219 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from threading import Lock
+from typing import Dict, List, Optional
+import logging
+import time
+import zlib
+
+from ..core.config import settings
+from ..core.metrics import COMPRESSION_BYTES_IN, COMPRESSION_BYTES_OUT, COMPRESSION_CPU_SECONDS
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+class CompressionStats:
+    """Per-encoding totals, including the CPU time spent compressing, for tuning the levels."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(
+                encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0}
+            )
+            totals["bytes_in"] += bytes_in
+            totals["bytes_out"] += bytes_out
+            totals["cpu_seconds"] += cpu_seconds
+        COMPRESSION_BYTES_IN.labels(encoding).inc(bytes_in)
+        COMPRESSION_BYTES_OUT.labels(encoding).inc(bytes_out)
+        COMPRESSION_CPU_SECONDS.labels(encoding).inc(cpu_seconds)
+
+    def response_done(self, encoding: str) -> None:
+        with self._lock:
+            self._totals[encoding]["responses"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {encoding: dict(totals) for encoding, totals in self._totals.items()}
+
+compression_stats = CompressionStats()
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so each streamed chunk reaches the client as soon as it is produced
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+# Preferred first when the client weighs them equally
+ENCODERS = {"br": _BrotliEncoder, "gzip": _GzipEncoder} if brotli else {"gzip": _GzipEncoder}
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The best encoding we support from an Accept-Encoding header, or None for identity."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODERS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def _compressible(content_type: Optional[str], allowed: List[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    for pattern in allowed:
+        if pattern.endswith("/*"):
+            if media_type.startswith(pattern[:-1]):
+                return True
+        elif media_type == pattern:
+            return True
+    return False
+
+class CompressionMiddleware:
+    """
+    Compresses responses whose content type is in COMPRESSION_CONTENT_TYPES
+    with brotli or gzip, whichever the client prefers.
+
+    Complete bodies under COMPRESSION_MINIMUM_SIZE are sent as-is. Streaming
+    responses are compressed chunk by chunk and flushed as they go, so
+    NDJSON progress events still arrive promptly.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None, content_types: Optional[List[str]] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.content_types = content_types or [
+            content_type.strip().lower()
+            for content_type in settings.COMPRESSION_CONTENT_TYPES.split(",") if content_type.strip()
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send_downstream = send
+        self.start_message: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send_downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            if not self._should_compress(start, body, more_body):
+                self.passthrough = True
+                await self.send_downstream(start)
+                await self.send_downstream(message)
+                return
+            self.encoder = ENCODERS[self.encoding]()
+            compressed = self._encode(body, more_body)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoder.name
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # The compressed bytes differ, so a strong validator no longer applies
+                headers["ETag"] = "W/" + etag
+            await self.send_downstream(start)
+            await self.send_downstream({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        await self.send_downstream({
+            "type": "http.response.body",
+            "body": self._encode(body, more_body),
+            "more_body": more_body
+        })
+
+    def _should_compress(self, start: Message, body: bytes, more_body: bool) -> bool:
+        headers = MutableHeaders(raw=start["headers"])
+        if not _compressible(headers.get("content-type"), self.middleware.content_types):
+            return False
+        # The response varies on Accept-Encoding even when this one goes out uncompressed
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding is None or "content-encoding" in headers:
+            return False
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        return more_body or len(body) >= self.middleware.minimum_size
+
+    def _encode(self, body: bytes, more_body: bool) -> bytes:
+        started = time.thread_time()
+        compressed = self.encoder.compress(body) if more_body else self.encoder.finish(body)
+        cpu_seconds = time.thread_time() - started
+
+        compression_stats.record(self.encoder.name, len(body), len(compressed), cpu_seconds)
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        self.cpu_seconds += cpu_seconds
+        if not more_body:
+            compression_stats.response_done(self.encoder.name)
+            logger.debug(
+                "Compressed %d -> %d bytes with %s in %.2fms CPU",
+                self.bytes_in, self.bytes_out, self.encoder.name, self.cpu_seconds * 1000
+            )
+        return compressed
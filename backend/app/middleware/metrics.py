@@ -0,0 +1,40 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+
+from ..core.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT
+
+class MetricsMiddleware:
+    """
+    Records request latency per route template (e.g. `/api/habits/{habit_id}/logs`,
+    never the raw path) and the number of requests in flight.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # The router fills in the matched route while handling the request
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method, route.path if route is not None else "unmatched", str(status_code)
+            ).observe(time.perf_counter() - started)
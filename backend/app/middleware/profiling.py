@@ -0,0 +1,48 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import asyncio
+import logging
+
+from ..core.config import settings
+from ..core.profiling import ProfileSlots, profile_filename, should_profile, start_profiler, write_profile
+
+logger = logging.getLogger(__name__)
+
+class ProfilingMiddleware:
+    """
+    Runs a statistical profiler around requests that carry a signed
+    `X-Profile` header, or a PROFILER_SAMPLE_RATE sample of PROFILER_ROUTES,
+    and writes the profile to PROFILER_OUTPUT_DIR. At most
+    PROFILER_MAX_CONCURRENT profiles run at once per worker, so it can stay
+    enabled in production. The file name is returned in `X-Profile-File`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.slots = ProfileSlots(settings.PROFILER_MAX_CONCURRENT)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not should_profile(scope["path"], Headers(scope=scope).get("x-profile")):
+            await self.app(scope, receive, send)
+            return
+        if not self.slots.try_acquire():
+            await self.app(scope, receive, send)
+            return
+
+        filename = profile_filename(scope["method"], scope["path"])
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-File", filename)
+            await send(message)
+
+        try:
+            profiler = start_profiler()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.stop()
+            path = await asyncio.to_thread(write_profile, profiler, filename)
+            logger.info("Wrote profile of %s %s to %s", scope["method"], scope["path"], path)
+        finally:
+            self.slots.release()
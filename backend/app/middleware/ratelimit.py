@@ -0,0 +1,101 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import List, Optional, Tuple
+import logging
+import time
+
+from ..core.config import settings
+from ..core.network import get_client_ip
+from ..core.ratelimit import RateLimitResult, create_rate_limit_store, parse_route_overrides
+from ..core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+# Probes and scrapes must keep working while a client is being throttled
+EXEMPT_PATH_PREFIXES = ("/api/health", "/metrics")
+
+class RateLimitMiddleware:
+    """
+    Enforces RATE_LIMIT_REQUESTS per RATE_LIMIT_WINDOW for each signed-in
+    user and RATE_LIMIT_IP_REQUESTS for each client IP, or the stricter
+    RATE_LIMIT_ROUTE_OVERRIDES quota on routes like /auth/login. Over-limit
+    requests get 429 with Retry-After and are not counted.
+    """
+
+    def __init__(self, app: ASGIApp, store=None):
+        self.app = app
+        self.store = store or create_rate_limit_store()
+        self.overrides = parse_route_overrides(settings.RATE_LIMIT_ROUTE_OVERRIDES)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(EXEMPT_PATH_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        quotas = self._quotas(scope)
+        try:
+            # Stores that do I/O (SQLite waits on other workers' locks) stay off the event loop
+            if self.store.blocking:
+                rejection = await run_in_threadpool(self._check, quotas)
+            else:
+                rejection = self._check(quotas)
+        except Exception:
+            # A broken store must not take the API down with it: fail open
+            logger.exception("Rate limit store failed; allowing request")
+            rejection = None
+
+        if rejection is not None:
+            await self._reject(rejection)(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    def _check(self, quotas: List[Tuple[str, int, int]]) -> Optional[RateLimitResult]:
+        now = time.time()
+        for key, limit, window in quotas:
+            result = self.store.hit(key, limit, window, now)
+            if not result.allowed:
+                return result
+        return None
+
+    def _quotas(self, scope: Scope) -> List[Tuple[str, int, int]]:
+        identities = [f"ip:{get_client_ip(scope)}"]
+        user_id = self._user_id(scope)
+        if user_id is not None:
+            identities.insert(0, f"user:{user_id}")
+
+        for rule in self.overrides:
+            if rule.method == scope["method"] and rule.path_regex.match(scope["path"]):
+                return [(f"{rule.name}:{identity}", rule.limit, rule.window) for identity in identities]
+
+        quotas = [(f"default:{identities[-1]}", settings.RATE_LIMIT_IP_REQUESTS, settings.RATE_LIMIT_WINDOW)]
+        if user_id is not None:
+            quotas.insert(0, (f"default:{identities[0]}", settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_WINDOW))
+        return quotas
+
+    @staticmethod
+    def _user_id(scope: Scope) -> Optional[str]:
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        payload = decode_token(token)
+        return payload.get("sub") if payload else None
+
+    @staticmethod
+    def _reject(result: RateLimitResult) -> JSONResponse:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests"},
+            headers={
+                "Retry-After": str(result.retry_after),
+                "X-RateLimit-Limit": str(result.limit),
+                "X-RateLimit-Remaining": "0"
+            }
+        )
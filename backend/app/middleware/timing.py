@@ -0,0 +1,53 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
+import logging
+import orjson
+import random
+
+from ..core.config import settings
+from ..core.timing import start_request_timings
+
+logger = logging.getLogger("app.timing")
+
+class ServerTimingMiddleware:
+    """
+    Times the phases of a sample of requests (SERVER_TIMING_SAMPLE_RATE) and
+    reports them in a `Server-Timing` header and one structured log line.
+    Unsampled requests pay only for the random draw.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = settings.SERVER_TIMING_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request_timings()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    # Streaming bodies aren't finished yet; the log line has their full time
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            logger.info(orjson.dumps({
+                "event": "request_timing",
+                "method": scope["method"],
+                "route": route.path if route is not None else scope["path"],
+                "status": status_code,
+                "total_ms": round(timings.elapsed() * 1000, 2),
+                "phases_ms": {phase: round(seconds * 1000, 2) for phase, seconds in timings.durations.items()},
+                "db_queries": timings.counts.get("db", 0)
+            }).decode())
@@ -1,19 +1,28 @@
 from .user import User
-from .couple import Couple, CoupleMember, CoupleSettings
+from .couple import Couple, CoupleMember, CoupleSettings, CoupleInvite
 from .workout import WorkoutTemplate, WorkoutSession
 from .habit import Habit, HabitLog
 from .progress import ProgressSnapshot
 from .share import SharePermissions
+from .rollup import WeeklyRollup
+from .version import CollectionVersion
+from .sync import SyncTombstone
+from .token import RevokedToken
 
 __all__ = [
     "User",
     "Couple", 
     "CoupleMember",
     "CoupleSettings",
+    "CoupleInvite",
     "WorkoutTemplate",
     "WorkoutSession", 
     "Habit",
     "HabitLog",
     "ProgressSnapshot",
-    "SharePermissions"
+    "SharePermissions",
+    "WeeklyRollup",
+    "CollectionVersion",
+    "SyncTombstone",
+    "RevokedToken"
 ]
\ No newline at end of file
@@ -20,12 +20,13 @@ class Couple(Base):
     members = relationship("CoupleMember", back_populates="couple", cascade="all, delete-orphan")
     settings = relationship("CoupleSettings", back_populates="couple", uselist=False, cascade="all, delete-orphan")
     workout_sessions = relationship("WorkoutSession", back_populates="couple")
+    invites = relationship("CoupleInvite", back_populates="couple", cascade="all, delete-orphan")
 
 class CoupleMember(Base):
     __tablename__ = "couple_members"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), unique=True, nullable=False)  # A user belongs to at most one couple
     couple_id = Column(UUID(as_uuid=True), ForeignKey("couples.id"), nullable=False)
     role = Column(Enum(CoupleRole), nullable=False, default=CoupleRole.member)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -45,4 +46,17 @@ class CoupleSettings(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    couple = relationship("Couple", back_populates="settings")
\ No newline at end of file
+    couple = relationship("Couple", back_populates="settings")
+
+class CoupleInvite(Base):
+    __tablename__ = "couple_invites"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    couple_id = Column(UUID(as_uuid=True), ForeignKey("couples.id"), nullable=False)
+    code = Column(String(8), unique=True, index=True, nullable=False)
+    created_by_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    couple = relationship("Couple", back_populates="invites")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Boolean, Text, Date
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Boolean, Text, Date, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -17,6 +17,9 @@ class HabitLogStatus(str, enum.Enum):
 
 class Habit(Base):
     __tablename__ = "habits"
+    __table_args__ = (
+        Index("ix_habits_user_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -33,6 +36,9 @@ class Habit(Base):
 
 class HabitLog(Base):
     __tablename__ = "habit_logs"
+    __table_args__ = (
+        Index("ix_habit_logs_habit_updated_at", "habit_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     habit_id = Column(UUID(as_uuid=True), ForeignKey("habits.id"), nullable=False)
@@ -40,6 +46,7 @@ class HabitLog(Base):
     status = Column(Enum(HabitLogStatus), nullable=False)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     habit = relationship("Habit", back_populates="logs")
\ No newline at end of file
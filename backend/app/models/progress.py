@@ -1,18 +1,42 @@
-from sqlalchemy import Column, DateTime, ForeignKey, JSON, Date
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, DateTime, ForeignKey, Date, Float, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 import uuid
 from ..core.database import Base
 
+def numeric_metric(metrics: dict, key: str):
+    """A metric value as float, or None if missing or not a number."""
+    value = (metrics or {}).get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
 class ProgressSnapshot(Base):
     __tablename__ = "progress_snapshots"
+    __table_args__ = (
+        Index("ix_progress_snapshots_user_date", "user_id", "date"),
+        Index("ix_progress_snapshots_metrics", "metrics", postgresql_using="gin"),
+        Index("ix_progress_snapshots_user_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     date = Column(Date, nullable=False)
-    metrics = Column(JSON, nullable=False)  # {"weight_kg": float?, "bodyfat_pct": float?, "waist_cm": float?, "workouts_completed_week": int, "habits_completed_week": int}
+    metrics = Column(JSONB, nullable=False)  # {"weight_kg": float?, "bodyfat_pct": float?, "waist_cm": float?, "workouts_completed_week": int, "habits_completed_week": int}
+    # Frequently charted metrics, kept in sync with `metrics` on write
+    weight_kg = Column(Float, nullable=True)
+    bodyfat_pct = Column(Float, nullable=True)
+    waist_cm = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="progress_snapshots")
\ No newline at end of file
+    user = relationship("User", back_populates="progress_snapshots")
+
+    @validates("metrics")
+    def _sync_hot_metrics(self, key, metrics):
+        self.weight_kg = numeric_metric(metrics, "weight_kg")
+        self.bodyfat_pct = numeric_metric(metrics, "bodyfat_pct")
+        self.waist_cm = numeric_metric(metrics, "waist_cm")
+        return metrics
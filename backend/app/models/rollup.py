@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from ..core.database import Base
+
+class WeeklyRollup(Base):
+    """Per-user counters for one ISO week, maintained on write by the workout and habit routers."""
+    __tablename__ = "weekly_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "week_start", name="uq_weekly_rollups_user_week"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    week_start = Column(Date, nullable=False)  # Monday of the ISO week (UTC)
+    workouts_completed = Column(Integer, nullable=False, default=0)
+    gym_sessions = Column(Integer, nullable=False, default=0)
+    home_sessions = Column(Integer, nullable=False, default=0)
+    workout_volume = Column(Float, nullable=False, default=0)
+    workout_minutes = Column(Integer, nullable=False, default=0)
+    habits_completed = Column(Integer, nullable=False, default=0)
+    habits_skipped = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
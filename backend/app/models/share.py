@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -7,6 +7,10 @@ from ..core.database import Base
 
 class SharePermissions(Base):
     __tablename__ = "share_permissions"
+    __table_args__ = (
+        Index("ix_share_permissions_owner_updated_at", "owner_user_id", "updated_at"),
+        Index("ix_share_permissions_viewer_updated_at", "viewer_user_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from ..core.database import Base
+
+class SyncTombstone(Base):
+    """Records a deleted row so /sync can tell clients to drop it. Pruned after SYNC_TOMBSTONE_RETENTION_DAYS."""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)  # Whose clients must drop the row
+    entity = Column(String(32), nullable=False)  # One of app.services.sync.SYNC_ENTITIES
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
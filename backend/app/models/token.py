@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Index, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from ..core.database import Base
+
+class RevokedToken(Base):
+    """A logged-out or rotated token, kept until it would have expired anyway."""
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_type_revoked_at", "token_type", "revoked_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    jti = Column(String(64), unique=True, nullable=False)
+    token_type = Column(String(16), nullable=False)  # "access" or "refresh"
+    # No foreign key: rows simply expire, including those of purged accounts
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -18,6 +18,10 @@ class User(Base):
     height_cm = Column(Integer, nullable=True)
     weight_kg = Column(Integer, nullable=True)
     is_active = Column(Boolean, default=True)
+    # Bumped when token claims (active flag, couple) change, so older access tokens stop being trusted
+    security_version = Column(Integer, nullable=False, default=0, server_default="0")
+    security_changed_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True, index=True)  # Set on deletion request; the purge job removes the account
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from ..core.database import Base
+
+class CollectionVersion(Base):
+    """Per-user change counter for one list collection, bumped by every write to it. Backs list ETags."""
+    __tablename__ = "collection_versions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "collection", name="uq_collection_versions_user_collection"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    collection = Column(String(32), nullable=False)  # One of app.services.versions.VERSIONED_COLLECTIONS
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
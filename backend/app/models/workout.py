@@ -1,10 +1,11 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text, JSON, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text, JSON, Integer, Float, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 import uuid
 import enum
 from ..core.database import Base
+from .progress import numeric_metric
 
 class WorkoutType(str, enum.Enum):
     gym = "gym"
@@ -12,6 +13,9 @@ class WorkoutType(str, enum.Enum):
 
 class WorkoutTemplate(Base):
     __tablename__ = "workout_templates"
+    __table_args__ = (
+        Index("ix_workout_templates_owner_updated_at", "owner_user_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # Null for system templates
@@ -27,6 +31,11 @@ class WorkoutTemplate(Base):
 
 class WorkoutSession(Base):
     __tablename__ = "workout_sessions"
+    __table_args__ = (
+        Index("ix_workout_sessions_user_start_time", "user_id", "start_time"),
+        Index("ix_workout_sessions_metrics", "metrics", postgresql_using="gin"),
+        Index("ix_workout_sessions_user_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -36,11 +45,22 @@ class WorkoutSession(Base):
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=True)
     notes = Column(Text, nullable=True)
-    metrics = Column(JSON, nullable=True)  # {"total_volume": float, "calories_est": int?, "heart_rate_avg": int?}
+    metrics = Column(JSONB, nullable=True)  # {"total_volume": float, "calories_est": int?, "heart_rate_avg": int?}
+    # Frequently aggregated metrics, kept in sync with `metrics` on write
+    total_volume = Column(Float, nullable=True)
+    duration_minutes = Column(Integer, nullable=True)
     exercises_performed = Column(JSON, nullable=True)  # Actual exercises with completed sets/reps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="workout_sessions")
     couple = relationship("Couple", back_populates="workout_sessions")
-    template = relationship("WorkoutTemplate", back_populates="sessions")
\ No newline at end of file
+    template = relationship("WorkoutTemplate", back_populates="sessions")
+
+    @validates("metrics")
+    def _sync_hot_metrics(self, key, metrics):
+        self.total_volume = numeric_metric(metrics, "total_volume")
+        duration = numeric_metric(metrics, "duration_minutes")
+        self.duration_minutes = int(duration) if duration is not None else None
+        return metrics
\ No newline at end of file
@@ -5,6 +5,9 @@ from .workouts import router as workouts_router
 from .habits import router as habits_router
 from .progress import router as progress_router
 from .share import router as share_router
+from .imports import router as imports_router
+from .sync import router as sync_router
+from .health import router as health_router
 
 __all__ = [
     "auth_router",
@@ -13,5 +16,8 @@ __all__ = [
     "workouts_router",
     "habits_router",
     "progress_router",
-    "share_router"
+    "share_router",
+    "imports_router",
+    "sync_router",
+    "health_router"
 ]
\ No newline at end of file
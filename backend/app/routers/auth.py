@@ -1,22 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import Optional
+import math
 
+from ..core.config import settings
 from ..core.database import get_db
+from ..core.metrics import LOGIN_ATTEMPTS
+from ..core.network import get_client_ip
 from ..core.security import (
-    verify_password, 
-    get_password_hash, 
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
-    decode_token
+    decode_token,
+    dummy_password_hash
 )
+from ..core.timing import TimedRoute
+from ..dependencies.auth import get_current_active_user
+from ..models.couple import CoupleMember
 from ..models.user import User
-from ..schemas.auth import LoginRequest, RegisterRequest, Token, RefreshTokenRequest
+from ..schemas.auth import AppleAuthRequest, LoginRequest, LogoutRequest, RegisterRequest, Token, RefreshTokenRequest
 from ..schemas.user import UserResponse
+from ..services.apple import AppleTokenError, verify_identity_token
+from ..services.login_throttle import login_throttle
+from ..services.revocation import revoke_token
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TimedRoute)
 security = HTTPBearer()
+# Logout must work with only a refresh token, e.g. after the access token expired
+optional_security = HTTPBearer(auto_error=False)
+
+def _issue_tokens(db: Session, user: User) -> Token:
+    # Claims that let get_current_principal skip loading the user; see bump_security_version
+    couple_id = db.query(CoupleMember.couple_id).filter(CoupleMember.user_id == user.id).scalar()
+    access_token = create_access_token(
+        subject=str(user.id),
+        claims={
+            "cid": str(couple_id) if couple_id else None,
+            "act": bool(user.is_active),
+            "sv": user.security_version
+        }
+    )
+    refresh_token = create_refresh_token(subject=str(user.id))
+    
+    return Token(
+        access_token=access_token,
+        refresh_token=refresh_token
+    )
 
 @router.post("/register", response_model=Token)
 async def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
@@ -29,7 +63,7 @@ async def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         email=user_data.email,
         password_hash=hashed_password,
@@ -39,39 +73,47 @@ async def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(db_user)
     
-    # Create tokens
-    access_token = create_access_token(subject=str(db_user.id))
-    refresh_token = create_refresh_token(subject=str(db_user.id))
-    
-    return Token(
-        access_token=access_token,
-        refresh_token=refresh_token
-    )
+    return _issue_tokens(db, db_user)
 
 @router.post("/login", response_model=Token)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, request: Request, db: Session = Depends(get_db)):
+    client_ip = get_client_ip(request.scope)
+    
+    # Refuse locked-out emails/IPs before spending a bcrypt verify on them
+    retry_after = login_throttle.retry_after(login_data.email, client_ip)
+    if retry_after > 0:
+        LOGIN_ATTEMPTS.labels("throttled").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+    
     # Find user by email
     user = db.query(User).filter(User.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.password_hash):
+    # Unknown emails (and Apple-only accounts, which have no password) still pay
+    # for one verify, so response time doesn't reveal which accounts exist
+    has_password = user is not None and user.password_hash is not None
+    password_hash = user.password_hash if has_password else dummy_password_hash()
+    password_ok = await verify_password_async(login_data.password, password_hash)
+    if not has_password or not password_ok:
+        login_throttle.record_failure(login_data.email, client_ip)
+        LOGIN_ATTEMPTS.labels("failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    login_throttle.record_success(login_data.email)
+    LOGIN_ATTEMPTS.labels("success").inc()
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
     
-    # Create tokens
-    access_token = create_access_token(subject=str(user.id))
-    refresh_token = create_refresh_token(subject=str(user.id))
-    
-    return Token(
-        access_token=access_token,
-        refresh_token=refresh_token
-    )
+    return _issue_tokens(db, user)
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)):
@@ -98,25 +140,123 @@ async def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends
             detail="Invalid user"
         )
     
-    # Create new access token
-    access_token = create_access_token(subject=str(user.id))
+    # Rotate: each refresh token works once, so a stolen copy dies on the owner's next refresh
+    if not revoke_token(db, refresh_data.refresh_token, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
     
-    return Token(
-        access_token=access_token,
-        refresh_token=refresh_data.refresh_token  # Return same refresh token
-    )
+    return _issue_tokens(db, user)
+
+async def _verify_apple_token(identity_token: str) -> dict:
+    if not settings.APPLE_CLIENT_ID:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Apple Sign-In is not configured"
+        )
+    
+    # Usually a cached key lookup, but a key rotation means a blocking fetch
+    try:
+        return await run_in_threadpool(verify_identity_token, identity_token)
+    except AppleTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Apple identity token"
+        )
 
-@router.post("/apple")
-async def apple_signin():
-    # Placeholder for Apple Sign-In integration
-    # This will be implemented when we add the frontend
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Apple Sign-In not yet implemented - coming with frontend integration"
+def _apple_id_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="An account with this email already exists; sign in to it and link your Apple ID"
     )
 
+@router.post("/apple", response_model=Token)
+async def apple_signin(apple_data: AppleAuthRequest, db: Session = Depends(get_db)):
+    claims = await _verify_apple_token(apple_data.identity_token)
+    apple_sub = claims["sub"]
+    email = claims.get("email")
+    
+    user = db.query(User).filter(User.apple_sub == apple_sub).first()
+    if user is None:
+        if not email:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Apple identity token has no email"
+            )
+        # Registration never proves email ownership, so an existing account with this
+        # email may belong to someone else: it is only linked from its own session
+        if db.query(User.id).filter(User.email == email).first() is not None:
+            raise _apple_id_conflict()
+        
+        user = User(
+            email=email,
+            apple_sub=apple_sub,
+            display_name=apple_data.display_name or email.split("@")[0]
+        )
+        db.add(user)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Signed in concurrently, or the email was registered meanwhile
+            db.rollback()
+            user = db.query(User).filter(User.apple_sub == apple_sub).first()
+            if user is None:
+                raise _apple_id_conflict()
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    return _issue_tokens(db, user)
+
+@router.post("/apple/link", response_model=UserResponse)
+async def link_apple_id(
+    apple_data: AppleAuthRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    claims = await _verify_apple_token(apple_data.identity_token)
+    apple_sub = claims["sub"]
+    
+    if current_user.apple_sub == apple_sub:
+        return current_user
+    if current_user.apple_sub is not None or db.query(User.id).filter(User.apple_sub == apple_sub).first() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This account or Apple ID is already linked"
+        )
+    
+    current_user.apple_sub = apple_sub
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This account or Apple ID is already linked"
+        )
+    db.refresh(current_user)
+    return current_user
+
 @router.post("/logout")
-async def logout():
-    # In a production app, you'd blacklist the token
-    # For now, just return success - client should delete tokens
+async def logout(
+    logout_data: Optional[LogoutRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+):
+    # Already invalid tokens need no revoking; logging out stays idempotent
+    if credentials is not None:
+        payload = decode_token(credentials.credentials)
+        if payload is not None and payload.get("type") != "refresh":
+            revoke_token(db, credentials.credentials, payload)
+    
+    # A validly signed refresh token proves ownership by itself
+    if logout_data and logout_data.refresh_token:
+        refresh_payload = decode_token(logout_data.refresh_token)
+        if refresh_payload is not None and refresh_payload.get("type") == "refresh":
+            revoke_token(db, logout_data.refresh_token, refresh_payload)
+    
     return {"message": "Logged out successfully"}
\ No newline at end of file
@@ -1,28 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from typing import List
+from datetime import datetime, timezone
 import uuid
-import secrets
-import string
 
 from ..core.database import get_db
-from ..dependencies.auth import get_current_active_user
+from ..core.timing import TimedRoute
+from ..dependencies.auth import Principal, get_active_principal
+from ..dependencies.permissions import PermissionResolver, get_permissions
 from ..models.user import User
-from ..models.couple import Couple, CoupleMember, CoupleSettings, CoupleRole
+from ..models.couple import Couple, CoupleMember, CoupleSettings, CoupleRole, CoupleInvite
+from ..schemas.couple import CoupleMemberResponse
+from ..services.invites import create_couple_invite
+from ..services.revocation import bump_security_version
 
-router = APIRouter(prefix="/couples", tags=["couples"])
+router = APIRouter(prefix="/couples", tags=["couples"], route_class=TimedRoute)
 
 @router.post("/")
 async def create_couple(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Check if user is already in a couple
-    existing_membership = db.query(CoupleMember).filter(
-        CoupleMember.user_id == current_user.id
-    ).first()
-    
-    if existing_membership:
+    if permissions.membership:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User is already part of a couple"
@@ -49,6 +51,8 @@ async def create_couple(
     )
     db.add(settings)
     
+    # Tokens claiming no couple are stale now
+    bump_security_version(db, current_user.id)
     db.commit()
     
     return {
@@ -60,29 +64,24 @@ async def create_couple(
 @router.post("/{couple_id}/invite")
 async def create_invite_code(
     couple_id: uuid.UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Verify user is owner of the couple
-    membership = db.query(CoupleMember).filter(
-        CoupleMember.user_id == current_user.id,
-        CoupleMember.couple_id == couple_id,
-        CoupleMember.role == CoupleRole.owner
-    ).first()
-    
-    if not membership:
+    if not permissions.is_couple_owner(couple_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only couple owners can generate invite codes"
         )
     
-    # Generate a simple invite code (in production, store this securely)
-    invite_code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(8))
+    invite = create_couple_invite(db, couple_id=couple_id, created_by_user_id=current_user.id)
     
     return {
         "couple_id": couple_id,
-        "invite_code": invite_code,
-        "invite_url": f"/couples/{couple_id}/accept?code={invite_code}",
+        "invite_code": invite.code,
+        "invite_url": f"/couples/{couple_id}/accept?code={invite.code}",
+        "expires_at": invite.expires_at,
         "message": "Share this code with your partner"
     }
 
@@ -90,121 +89,130 @@ async def create_invite_code(
 async def accept_couple_invite(
     couple_id: uuid.UUID,
     code: str,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Check if user is already in a couple
-    existing_membership = db.query(CoupleMember).filter(
-        CoupleMember.user_id == current_user.id
-    ).first()
-    
-    if existing_membership:
+    if permissions.membership:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User is already part of a couple"
         )
     
-    # Verify couple exists
-    couple = db.query(Couple).filter(Couple.id == couple_id).first()
+    # Lock the couple row so concurrent accepts for the same couple are serialized
+    couple = db.query(Couple).filter(Couple.id == couple_id).with_for_update().first()
     if not couple:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Couple not found"
         )
     
-    # Check if couple already has 2 members
+    # Look up the invite by its unique code
+    invite = db.query(CoupleInvite).filter(
+        CoupleInvite.code == code.upper(),
+        CoupleInvite.couple_id == couple_id,
+        CoupleInvite.expires_at > datetime.now(timezone.utc)
+    ).first()
+    
+    if not invite:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired invite code"
+        )
+    
+    # Check if couple already has 2 members (safe while the couple row is locked)
     member_count = db.query(CoupleMember).filter(
         CoupleMember.couple_id == couple_id
     ).count()
     
     if member_count >= 2:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="This couple is already full"
         )
     
-    # In production, validate the invite code properly
-    # For now, just accept any 8-character code
-    if len(code) != 8:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid invite code"
-        )
-    
-    # Add user to couple
+    # Add user to couple and consume the invite
     member = CoupleMember(
         user_id=current_user.id,
         couple_id=couple_id,
         role=CoupleRole.member
     )
     db.add(member)
-    db.commit()
+    db.delete(invite)
+    bump_security_version(db, current_user.id)
+    
+    try:
+        db.commit()
+    except IntegrityError:
+        # Unique couple_members.user_id: the user joined another couple concurrently
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User is already part of a couple"
+        )
     
     return {
         "message": "Successfully joined couple",
         "couple_id": couple_id
     }
 
-@router.get("/{couple_id}/members")
+@router.get("/{couple_id}/members", response_model=List[CoupleMemberResponse])
 async def get_couple_members(
     couple_id: uuid.UUID,
-    current_user: User = Depends(get_current_active_user),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Verify user is member of this couple
-    membership = db.query(CoupleMember).filter(
-        CoupleMember.user_id == current_user.id,
-        CoupleMember.couple_id == couple_id
-    ).first()
-    
-    if not membership:
+    if not permissions.is_couple_member(couple_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a member of this couple"
         )
     
-    # Get all members with user info
-    members = db.query(CoupleMember).filter(
+    # Get all members with user info in one joined query
+    members = db.query(
+        CoupleMember.user_id,
+        CoupleMember.role,
+        CoupleMember.joined_at,
+        User.display_name,
+        User.avatar_url
+    ).join(
+        User, User.id == CoupleMember.user_id
+    ).filter(
         CoupleMember.couple_id == couple_id
     ).all()
     
-    result = []
-    for member in members:
-        user = db.query(User).filter(User.id == member.user_id).first()
-        result.append({
-            "user_id": user.id,
-            "display_name": user.display_name,
-            "avatar_url": user.avatar_url,
-            "role": member.role,
-            "joined_at": member.joined_at
-        })
-    
-    return result
+    return [
+        CoupleMemberResponse(
+            user_id=member.user_id,
+            display_name=member.display_name,
+            avatar_url=member.avatar_url,
+            role=member.role,
+            joined_at=member.joined_at
+        )
+        for member in members
+    ]
 
 @router.patch("/{couple_id}/settings")
 async def update_couple_settings(
     couple_id: uuid.UUID,
     share_progress_enabled: bool = None,
     share_habits_enabled: bool = None,
-    current_user: User = Depends(get_current_active_user),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Verify user is member of this couple  
-    membership = db.query(CoupleMember).filter(
-        CoupleMember.user_id == current_user.id,
-        CoupleMember.couple_id == couple_id
-    ).first()
-    
-    if not membership:
+    if not permissions.is_couple_member(couple_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a member of this couple"
         )
     
-    # Get couple settings
-    settings = db.query(CoupleSettings).filter(
-        CoupleSettings.couple_id == couple_id
-    ).first()
+    # Couple settings were loaded along with the membership
+    settings = permissions.couple_settings
     
     if not settings:
         raise HTTPException(
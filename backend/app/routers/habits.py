@@ -1,22 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime, timedelta
 import uuid
 
 from ..core.database import get_db
-from ..dependencies.auth import get_current_active_user
-from ..models.user import User
+from ..core.timing import TimedRoute
+from ..dependencies.auth import Principal, get_active_principal
+from ..dependencies.conditional import ConditionalGet, conditional_get
+from ..dependencies.permissions import PermissionResolver, get_permissions
 from ..models.habit import Habit, HabitLog, HabitCadence, HabitLogStatus
+from ..schemas.habit import HabitResponse, HabitLogResponse
+from ..services.rollups import bump_weekly_rollup, get_recent_weekly_rollups
+from ..services.versions import bump_collection_version
 
-router = APIRouter(prefix="/habits", tags=["habits"])
+router = APIRouter(prefix="/habits", tags=["habits"], route_class=TimedRoute)
 
 @router.post("/")
 async def create_habit(
     name: str,
     cadence: HabitCadence = HabitCadence.daily,
     reminder_time_local: Optional[str] = None,  # "HH:MM" format
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
     habit = Habit(
@@ -27,6 +33,7 @@ async def create_habit(
         is_active=True
     )
     db.add(habit)
+    bump_collection_version(db, current_user.id, "habits")
     db.commit()
     db.refresh(habit)
     
@@ -39,39 +46,38 @@ async def create_habit(
         "created_at": habit.created_at
     }
 
-@router.get("/")
+@router.get("/", response_model=List[HabitResponse])
 async def get_habits(
     active_only: bool = Query(True, description="Only return active habits"),
-    current_user: User = Depends(get_current_active_user),
+    conditional: ConditionalGet = Depends(conditional_get("habits")),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Habit).filter(Habit.user_id == current_user.id)
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    
+    # Each habit with today's log status (if any) in one joined query
+    query = db.query(Habit, HabitLog.status).outerjoin(
+        HabitLog, (HabitLog.habit_id == Habit.id) & (HabitLog.date == date.today())
+    ).filter(Habit.user_id == current_user.id)
     
     if active_only:
         query = query.filter(Habit.is_active == True)
     
-    habits = query.order_by(Habit.created_at.desc()).all()
-    
-    result = []
-    for habit in habits:
-        # Get today's log if exists
-        today = date.today()
-        today_log = db.query(HabitLog).filter(
-            HabitLog.habit_id == habit.id,
-            HabitLog.date == today
-        ).first()
-        
-        result.append({
-            "id": habit.id,
-            "name": habit.name,
-            "cadence": habit.cadence,
-            "reminder_time_local": habit.reminder_time_local,
-            "is_active": habit.is_active,
-            "created_at": habit.created_at,
-            "today_status": today_log.status if today_log else None
-        })
+    rows = query.order_by(Habit.created_at.desc()).all()
     
-    return result
+    return [
+        HabitResponse(
+            id=habit.id,
+            name=habit.name,
+            cadence=habit.cadence,
+            reminder_time_local=habit.reminder_time_local,
+            is_active=habit.is_active,
+            created_at=habit.created_at,
+            today_status=today_status
+        )
+        for habit, today_status in rows
+    ]
 
 @router.patch("/{habit_id}")
 async def update_habit(
@@ -80,7 +86,7 @@ async def update_habit(
     cadence: Optional[HabitCadence] = None,
     reminder_time_local: Optional[str] = None,
     is_active: Optional[bool] = None,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
     habit = db.query(Habit).filter(
@@ -104,6 +110,7 @@ async def update_habit(
     if is_active is not None:
         habit.is_active = is_active
     
+    bump_collection_version(db, current_user.id, "habits")
     db.commit()
     db.refresh(habit)
     
@@ -121,7 +128,7 @@ async def create_habit_log(
     log_date: date,
     status: HabitLogStatus,
     notes: Optional[str] = None,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
     # Verify habit belongs to user
@@ -136,16 +143,25 @@ async def create_habit_log(
             detail="Habit not found"
         )
     
-    # Check if log already exists for this date
+    # Check if log already exists for this date, locking it so concurrent
+    # updates compute their rollup deltas from the committed status
     existing_log = db.query(HabitLog).filter(
         HabitLog.habit_id == habit_id,
         HabitLog.date == log_date
-    ).first()
+    ).with_for_update().first()
     
     if existing_log:
-        # Update existing log
+        # Update existing log, moving it between the weekly rollup counters
+        completed_delta = int(status == HabitLogStatus.done) - int(existing_log.status == HabitLogStatus.done)
+        skipped_delta = int(status == HabitLogStatus.skipped) - int(existing_log.status == HabitLogStatus.skipped)
         existing_log.status = status
         existing_log.notes = notes
+        if completed_delta or skipped_delta:
+            bump_weekly_rollup(
+                db, current_user.id, log_date,
+                habits_completed=completed_delta, habits_skipped=skipped_delta
+            )
+        bump_collection_version(db, current_user.id, "habits")
         db.commit()
         db.refresh(existing_log)
         return {
@@ -164,6 +180,13 @@ async def create_habit_log(
             notes=notes
         )
         db.add(log)
+        if status in (HabitLogStatus.done, HabitLogStatus.skipped):
+            bump_weekly_rollup(
+                db, current_user.id, log_date,
+                habits_completed=int(status == HabitLogStatus.done),
+                habits_skipped=int(status == HabitLogStatus.skipped)
+            )
+        bump_collection_version(db, current_user.id, "habits")
         db.commit()
         db.refresh(log)
         
@@ -175,14 +198,18 @@ async def create_habit_log(
             "notes": log.notes
         }
 
-@router.get("/logs")
+@router.get("/logs", response_model=List[HabitLogResponse])
 async def get_habit_logs(
     from_date: Optional[date] = Query(None),
     to_date: Optional[date] = Query(None),
     habit_id: Optional[uuid.UUID] = Query(None),
-    current_user: User = Depends(get_current_active_user),
+    conditional: ConditionalGet = Depends(conditional_get("habits")),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    
     # Get user's habits
     user_habit_ids = db.query(Habit.id).filter(
         Habit.user_id == current_user.id
@@ -192,7 +219,10 @@ async def get_habit_logs(
     if not habit_ids:
         return []
     
-    query = db.query(HabitLog).filter(HabitLog.habit_id.in_(habit_ids))
+    # Logs with their habit's name in one joined query
+    query = db.query(HabitLog, Habit.name).join(
+        Habit, Habit.id == HabitLog.habit_id
+    ).filter(HabitLog.habit_id.in_(habit_ids))
     
     if habit_id:
         # Verify this habit belongs to the user
@@ -209,62 +239,161 @@ async def get_habit_logs(
     if to_date:
         query = query.filter(HabitLog.date <= to_date)
     
-    logs = query.order_by(HabitLog.date.desc()).all()
+    rows = query.order_by(HabitLog.date.desc()).all()
     
-    result = []
-    for log in logs:
-        # Get habit name
-        habit = db.query(Habit).filter(Habit.id == log.habit_id).first()
-        result.append({
-            "id": log.id,
-            "habit_id": log.habit_id,
-            "habit_name": habit.name if habit else None,
-            "date": log.date,
-            "status": log.status,
-            "notes": log.notes,
-            "created_at": log.created_at
-        })
-    
-    return result
+    return [
+        HabitLogResponse(
+            id=log.id,
+            habit_id=log.habit_id,
+            habit_name=habit_name,
+            date=log.date,
+            status=log.status,
+            notes=log.notes,
+            created_at=log.created_at
+        )
+        for log, habit_name in rows
+    ]
 
 @router.get("/stats/weekly")
 async def get_weekly_habit_stats(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
-    # Get logs from last 7 days
-    week_ago = date.today() - timedelta(days=7)
     today = date.today()
     
-    # Get user's active habits
-    habits = db.query(Habit).filter(
+    active_habits = db.query(func.count(Habit.id)).filter(
         Habit.user_id == current_user.id,
         Habit.is_active == True
-    ).all()
+    ).scalar()
     
-    # Get logs for the week
-    habit_ids = [h.id for h in habits]
-    logs = db.query(HabitLog).filter(
-        HabitLog.habit_id.in_(habit_ids),
-        HabitLog.date >= week_ago,
-        HabitLog.date <= today
-    ).all()
+    # Completion counts for the current and previous ISO week come from the rollup rows
+    current_week, previous_week = get_recent_weekly_rollups(db, current_user.id, today)
+    
+    def _week_stats(week: dict, days: int) -> dict:
+        possible_completions = active_habits * days
+        completion_rate = (week["habits_completed"] / possible_completions * 100) if possible_completions > 0 else 0
+        return {
+            "week_start": week["week_start"],
+            "completed_count": week["habits_completed"],
+            "skipped_count": week["habits_skipped"],
+            "completion_rate": round(completion_rate, 1)
+        }
+    
+    return {
+        "period": "current_week",
+        "active_habits": active_habits,
+        **_week_stats(current_week, today.weekday() + 1),  # Days elapsed this week, including today
+        "streak_days": 0,  # TODO: Calculate longest streak
+        "previous_week": _week_stats(previous_week, 7)
+    }
+
+def _current_streak(done_dates: set, cadence: HabitCadence, today: date) -> int:
+    """Consecutive completed periods ending today (or yesterday, if today isn't logged yet)."""
+    if cadence == HabitCadence.weekly:
+        done_weeks = {d - timedelta(days=d.weekday()) for d in done_dates}
+        week = today - timedelta(days=today.weekday())
+        if week not in done_weeks:
+            week -= timedelta(weeks=1)
+        streak = 0
+        while week in done_weeks:
+            streak += 1
+            week -= timedelta(weeks=1)
+        return streak
+    
+    day = today if today in done_dates else today - timedelta(days=1)
+    streak = 0
+    while day in done_dates:
+        streak += 1
+        day -= timedelta(days=1)
+    return streak
+
+@router.get("/partner")
+async def get_partner_habits(
+    days: int = Query(30, ge=7, le=365, description="Days of history to load for streaks and the log history"),
+    limit: int = Query(50, ge=1, le=500, description="Log history page size"),
+    offset: int = Query(0, ge=0, description="Log history page offset"),
+    permissions: PermissionResolver = Depends(get_permissions),
+    db: Session = Depends(get_db)
+):
+    # Find partner
+    partner_membership = permissions.partner
+    if not partner_membership:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Partner not found"
+        )
+    
+    # Check share grant and couple settings (answered from the resolver)
+    if not permissions.can_view_habits(partner_membership.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Partner has not granted permission to view their habits"
+        )
     
-    # Calculate stats
-    total_habits = len(habits)
-    completed_logs = [log for log in logs if log.status == HabitLogStatus.done]
-    skipped_logs = [log for log in logs if log.status == HabitLogStatus.skipped]
+    habits = db.query(Habit).filter(
+        Habit.user_id == partner_membership.user_id,
+        Habit.is_active == True
+    ).order_by(Habit.created_at.desc()).all()
     
-    # Calculate completion rate
-    possible_completions = total_habits * 7  # 7 days
-    actual_completions = len(completed_logs)
-    completion_rate = (actual_completions / possible_completions * 100) if possible_completions > 0 else 0
+    today = date.today()
+    window_start = today - timedelta(days=days - 1)
+    week_start = today - timedelta(days=6)
+    
+    # One batched load of every log in the window, newest first
+    habit_names = {habit.id: habit.name for habit in habits}
+    logs = []
+    if habits:
+        logs = db.query(HabitLog).filter(
+            HabitLog.habit_id.in_(list(habit_names)),
+            HabitLog.date >= window_start,
+            HabitLog.date <= today
+        ).order_by(HabitLog.date.desc(), HabitLog.created_at.desc()).all()
+    
+    logs_by_habit = {habit_id: [] for habit_id in habit_names}
+    for log in logs:
+        logs_by_habit[log.habit_id].append(log)
+    
+    habit_results = []
+    for habit in habits:
+        habit_logs = logs_by_habit[habit.id]
+        done_dates = {log.date for log in habit_logs if log.status == HabitLogStatus.done}
+        week_completed = sum(1 for d in done_dates if d >= week_start)
+        expected = 1 if habit.cadence == HabitCadence.weekly else 7
+        today_log = next((log for log in habit_logs if log.date == today), None)
+        
+        habit_results.append({
+            "id": habit.id,
+            "name": habit.name,
+            "cadence": habit.cadence,
+            "reminder_time_local": habit.reminder_time_local,
+            "is_active": habit.is_active,
+            "created_at": habit.created_at,
+            "today_status": today_log.status if today_log else None,
+            "week_completed_count": week_completed,
+            "week_completion_rate": round(min(week_completed, expected) / expected * 100, 1),
+            "streak": _current_streak(done_dates, habit.cadence, today)
+        })
+    
+    page = logs[offset:offset + limit]
     
     return {
-        "period": "last_7_days",
-        "active_habits": total_habits,
-        "completed_count": len(completed_logs),
-        "skipped_count": len(skipped_logs),
-        "completion_rate": round(completion_rate, 1),
-        "streak_days": 0  # TODO: Calculate longest streak
-    }
\ No newline at end of file
+        "partner_name": permissions.partner_name or "Partner",
+        "habits": habit_results,
+        "logs": [
+            {
+                "id": log.id,
+                "habit_id": log.habit_id,
+                "habit_name": habit_names.get(log.habit_id),
+                "date": log.date,
+                "status": log.status,
+                "notes": log.notes,
+                "created_at": log.created_at
+            }
+            for log in page
+        ],
+        "logs_from_date": window_start,
+        "logs_total": len(logs),
+        "limit": limit,
+        "offset": offset,
+        "has_more": offset + limit < len(logs)
+    }
@@ -0,0 +1,49 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from ..core.config import settings
+from ..core.health import readiness
+from ..core.timing import TimedRoute
+
+router = APIRouter(prefix="/health", tags=["health"], route_class=TimedRoute)
+
+def _report(status: str, report: dict) -> dict:
+    return {
+        "status": status,
+        "checks": {
+            "database": report["database"],
+            "pool": report["pool"],
+            "migration": report["migration"]
+        }
+    }
+
+@router.get("/live")
+async def liveness():
+    """The process is up and serving; never touches the database."""
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness_check():
+    """
+    503 while the cached database probe is failing or stale, or the
+    connection pool is saturated, so load balancers drain this worker.
+    """
+    report = readiness()
+    return ORJSONResponse(
+        status_code=200 if report["ready"] else 503,
+        content=_report("ready" if report["ready"] else "not_ready", report)
+    )
+
+@router.get("")
+async def health_check():
+    # Kept for existing clients; same checks as /health/ready
+    report = readiness()
+    return ORJSONResponse(
+        status_code=200 if report["ready"] else 503,
+        content={
+            **_report("healthy" if report["ready"] else "unhealthy", report),
+            "app": settings.APP_NAME,
+            "version": "1.0.0",
+            "database": "connected" if report["database"]["ok"] else "unavailable"
+        }
+    )
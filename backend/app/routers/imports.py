@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+import codecs
+import json
+
+from ..core.database import SessionLocal
+from ..core.timing import TimedRoute
+from ..dependencies.auth import Principal, get_active_principal
+from ..services.importer import (
+    IMPORT_FORMATS,
+    IMPORT_KINDS,
+    ImportJob,
+    RecordParser,
+    feed_line,
+    summary_event
+)
+
+router = APIRouter(prefix="/import", tags=["import"], route_class=TimedRoute)
+
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for bodies that read the request while responding.
+
+    The stock response listens for a client disconnect by calling receive()
+    concurrently, which would swallow the request body chunks the import is
+    still reading. request.stream() raises ClientDisconnect on its own.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    """Decode the request body incrementally into lines without buffering it."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    remainder = ""
+    async for chunk in request.stream():
+        text = remainder + decoder.decode(chunk)
+        lines = text.split("\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    remainder += decoder.decode(b"", final=True)
+    if remainder:
+        yield remainder.rstrip("\r")
+
+@router.post("/{kind}")
+async def import_data(
+    kind: str,
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults from the Content-Type"),
+    current_user: Principal = Depends(get_active_principal)
+):
+    """
+    Stream a CSV or NDJSON body of progress snapshots or workout sessions
+    into the user's account. The response is NDJSON: row errors as they are
+    found, a progress line after each loaded chunk, and a final summary.
+    """
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown import kind; expected one of {', '.join(IMPORT_KINDS)}"
+        )
+    
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = format or CONTENT_TYPE_FORMATS.get(content_type)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+    
+    user_id = current_user.id
+    
+    async def events():
+        # get_db's session is closed before a streaming body runs, so the import owns its own
+        db = SessionLocal()
+        try:
+            job = await run_in_threadpool(ImportJob, db, user_id, kind)
+            parser = RecordParser(fmt)
+            line_number = 0
+            async for line in _iter_lines(request):
+                line_number += 1
+                error = feed_line(job, parser, line_number, line)
+                if error:
+                    yield json.dumps(error) + "\n"
+                if job.chunk_ready:
+                    await run_in_threadpool(job.flush)
+                    yield json.dumps({"event": "progress", **job.progress()}) + "\n"
+            
+            summary = await run_in_threadpool(job.finish)
+            yield json.dumps(summary_event(summary)) + "\n"
+        finally:
+            db.close()
+    
+    return UploadStreamingResponse(events(), media_type="application/x-ndjson")
@@ -1,25 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+import re
 import uuid
 
 from ..core.database import get_db
-from ..dependencies.auth import get_current_active_user
-from ..models.user import User
+from ..core.timing import TimedRoute
+from ..dependencies.auth import Principal, get_active_principal
+from ..dependencies.conditional import ConditionalGet, conditional_get
+from ..dependencies.permissions import PermissionResolver, get_permissions
 from ..models.progress import ProgressSnapshot
-from ..models.couple import CoupleMember
-from ..models.share import SharePermissions
+from ..schemas.progress import ProgressSnapshotResponse
+from ..services.progress import (
+    SUMMARY_HORIZONS_DAYS,
+    compute_metric_timeseries,
+    get_progress_summary as get_cached_progress_summary,
+    invalidate_progress_summary
+)
+from ..services.rollups import get_weekly_rollup
+from ..services.versions import bump_collection_version
 
-router = APIRouter(prefix="/progress", tags=["progress"])
+router = APIRouter(prefix="/progress", tags=["progress"], route_class=TimedRoute)
+
+METRIC_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+TIMESERIES_BUCKETS = ("day", "week", "month")
 
 @router.post("/snapshots")
 async def create_progress_snapshot(
     snapshot_date: date,
     metrics: dict,  # {"weight_kg": float?, "bodyfat_pct": float?, "waist_cm": float?, "workouts_completed_week": int, "habits_completed_week": int}
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
+    # Weekly activity counters are derived server-side from the rollup, not trusted from the client
+    week = get_weekly_rollup(db, current_user.id, snapshot_date)
+    metrics = {
+        **metrics,
+        "workouts_completed_week": week["workouts_completed"],
+        "habits_completed_week": week["habits_completed"]
+    }
+    
     # Check if snapshot already exists for this date
     existing = db.query(ProgressSnapshot).filter(
         ProgressSnapshot.user_id == current_user.id,
@@ -29,8 +50,10 @@ async def create_progress_snapshot(
     if existing:
         # Update existing snapshot
         existing.metrics = metrics
+        bump_collection_version(db, current_user.id, "progress_snapshots")
         db.commit()
         db.refresh(existing)
+        invalidate_progress_summary(current_user.id)
         return {
             "id": existing.id,
             "date": existing.date,
@@ -45,8 +68,10 @@ async def create_progress_snapshot(
             metrics=metrics
         )
         db.add(snapshot)
+        bump_collection_version(db, current_user.id, "progress_snapshots")
         db.commit()
         db.refresh(snapshot)
+        invalidate_progress_summary(current_user.id)
         
         return {
             "id": snapshot.id,
@@ -55,13 +80,17 @@ async def create_progress_snapshot(
             "created_at": snapshot.created_at
         }
 
-@router.get("/snapshots")
+@router.get("/snapshots", response_model=List[ProgressSnapshotResponse])
 async def get_progress_snapshots(
     from_date: Optional[date] = Query(None),
     to_date: Optional[date] = Query(None),
-    current_user: User = Depends(get_current_active_user),
+    conditional: ConditionalGet = Depends(conditional_get("progress_snapshots")),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    
     query = db.query(ProgressSnapshot).filter(
         ProgressSnapshot.user_id == current_user.id
     )
@@ -72,43 +101,69 @@ async def get_progress_snapshots(
     if to_date:
         query = query.filter(ProgressSnapshot.date <= to_date)
     
-    snapshots = query.order_by(ProgressSnapshot.date.desc()).all()
+    # Serialized straight from the ORM rows by the response model
+    return query.order_by(ProgressSnapshot.date.desc()).all()
+
+@router.get("/timeseries")
+async def get_progress_timeseries(
+    metric: str = Query(..., description="Metric key, e.g. weight_kg"),
+    bucket: str = Query("week", description="Bucket size: day, week or month"),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None),
+    rolling_window: int = Query(4, ge=1, le=52, description="Buckets in the trailing rolling mean"),
+    user_id: Optional[uuid.UUID] = Query(None, description="Another user who shares progress with you"),
+    current_user: Principal = Depends(get_active_principal),
+    permissions: PermissionResolver = Depends(get_permissions),
+    db: Session = Depends(get_db)
+):
+    if not METRIC_KEY_PATTERN.match(metric):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid metric key"
+        )
     
-    result = []
-    for snapshot in snapshots:
-        result.append({
-            "id": snapshot.id,
-            "date": snapshot.date,
-            "metrics": snapshot.metrics,
-            "created_at": snapshot.created_at
-        })
+    if bucket not in TIMESERIES_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"bucket must be one of {', '.join(TIMESERIES_BUCKETS)}"
+        )
+    
+    owner_id = user_id or current_user.id
+    if not permissions.can_view_progress(owner_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User has not granted permission to view their progress"
+        )
     
-    return result
+    to_date = to_date or date.today()
+    from_date = from_date or to_date - timedelta(days=365)
+    
+    return compute_metric_timeseries(
+        db,
+        owner_id,
+        metric=metric,
+        bucket=bucket,
+        from_date=from_date,
+        to_date=to_date,
+        rolling_window=rolling_window
+    )
 
 @router.get("/partner")
 async def get_partner_progress(
     from_date: Optional[date] = Query(None),
     to_date: Optional[date] = Query(None),
-    current_user: User = Depends(get_current_active_user),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Find user's couple
-    membership = db.query(CoupleMember).filter(
-        CoupleMember.user_id == current_user.id
-    ).first()
-    
-    if not membership:
+    if not permissions.membership:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User is not part of a couple"
         )
     
     # Find partner
-    partner_membership = db.query(CoupleMember).filter(
-        CoupleMember.couple_id == membership.couple_id,
-        CoupleMember.user_id != current_user.id
-    ).first()
-    
+    partner_membership = permissions.partner
     if not partner_membership:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -116,13 +171,7 @@ async def get_partner_progress(
         )
     
     # Check if partner allows progress sharing
-    permissions = db.query(SharePermissions).filter(
-        SharePermissions.owner_user_id == partner_membership.user_id,
-        SharePermissions.viewer_user_id == current_user.id,
-        SharePermissions.can_view_progress == True
-    ).first()
-    
-    if not permissions:
+    if not permissions.can_view_progress(partner_membership.user_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Partner has not granted permission to view their progress"
@@ -141,9 +190,6 @@ async def get_partner_progress(
     
     snapshots = query.order_by(ProgressSnapshot.date.desc()).all()
     
-    # Get partner info
-    partner = db.query(User).filter(User.id == partner_membership.user_id).first()
-    
     result = []
     for snapshot in snapshots:
         result.append({
@@ -154,45 +200,27 @@ async def get_partner_progress(
         })
     
     return {
-        "partner_name": partner.display_name if partner else "Partner",
+        "partner_name": permissions.partner_name or "Partner",
         "progress": result
     }
 
 @router.get("/summary")
 async def get_progress_summary(
-    current_user: User = Depends(get_current_active_user),
+    horizon_days: int = Query(30, description="Comparison horizon: 7, 30, 90 or 365 days"),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
-    # Get latest snapshot
-    latest = db.query(ProgressSnapshot).filter(
-        ProgressSnapshot.user_id == current_user.id
-    ).order_by(ProgressSnapshot.date.desc()).first()
+    if horizon_days not in SUMMARY_HORIZONS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"horizon_days must be one of {', '.join(map(str, SUMMARY_HORIZONS_DAYS))}"
+        )
     
-    # Get snapshot from 30 days ago for comparison
-    from datetime import timedelta
-    month_ago = date.today() - timedelta(days=30)
+    # All horizons come from one query and are cached together per user
+    summaries = get_cached_progress_summary(db, current_user.id)
     
-    month_ago_snapshot = db.query(ProgressSnapshot).filter(
-        ProgressSnapshot.user_id == current_user.id,
-        ProgressSnapshot.date <= month_ago
-    ).order_by(ProgressSnapshot.date.desc()).first()
-    
-    result = {
-        "current": latest.metrics if latest else {},
-        "current_date": latest.date if latest else None,
-        "previous": month_ago_snapshot.metrics if month_ago_snapshot else {},
-        "previous_date": month_ago_snapshot.date if month_ago_snapshot else None,
-        "changes": {}
+    return {
+        **summaries[horizon_days],
+        "horizon_days": horizon_days,
+        "comparisons": {str(days): summary for days, summary in summaries.items()}
     }
-    
-    # Calculate changes
-    if latest and month_ago_snapshot:
-        current_metrics = latest.metrics
-        previous_metrics = month_ago_snapshot.metrics
-        
-        for key in current_metrics:
-            if key in previous_metrics and isinstance(current_metrics[key], (int, float)):
-                change = current_metrics[key] - previous_metrics[key]
-                result["changes"][key] = change
-    
-    return result
\ No newline at end of file
@@ -4,18 +4,23 @@ from typing import List
 import uuid
 
 from ..core.database import get_db
-from ..dependencies.auth import get_current_active_user
+from ..core.timing import TimedRoute
+from ..dependencies.auth import Principal, get_active_principal
+from ..dependencies.permissions import PermissionResolver, get_permissions
 from ..models.user import User
 from ..models.share import SharePermissions
+from ..schemas.share import SharedDataAvailableResponse
+from ..services.sync import record_tombstones
 
-router = APIRouter(prefix="/share", tags=["sharing"])
+router = APIRouter(prefix="/share", tags=["sharing"], route_class=TimedRoute)
 
 @router.post("/permissions")
 async def create_share_permissions(
     viewer_email: str,
     can_view_progress: bool = False,
     can_view_habits: bool = False,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Find viewer user by email
@@ -33,10 +38,7 @@ async def create_share_permissions(
         )
     
     # Check if permissions already exist
-    existing = db.query(SharePermissions).filter(
-        SharePermissions.owner_user_id == current_user.id,
-        SharePermissions.viewer_user_id == viewer.id
-    ).first()
+    existing = permissions.grant_to(viewer.id)
     
     if existing:
         # Update existing permissions
@@ -55,63 +57,81 @@ async def create_share_permissions(
         }
     else:
         # Create new permissions
-        permissions = SharePermissions(
+        grant = SharePermissions(
             owner_user_id=current_user.id,
             viewer_user_id=viewer.id,
             can_view_progress=can_view_progress,
             can_view_habits=can_view_habits
         )
-        db.add(permissions)
+        db.add(grant)
         db.commit()
-        db.refresh(permissions)
+        db.refresh(grant)
         
         return {
-            "id": permissions.id,
+            "id": grant.id,
             "viewer_email": viewer_email,
             "viewer_name": viewer.display_name,
-            "can_view_progress": permissions.can_view_progress,
-            "can_view_habits": permissions.can_view_habits,
-            "created_at": permissions.created_at
+            "can_view_progress": grant.can_view_progress,
+            "can_view_habits": grant.can_view_habits,
+            "created_at": grant.created_at
         }
 
 @router.get("/permissions")
 async def get_share_permissions(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
-    # Get permissions where current user is the owner (sharing their data)
-    owned_permissions = db.query(SharePermissions).filter(
+    # Permissions where current user is the owner (sharing their data), joined to the viewer
+    owned_permissions = db.query(
+        SharePermissions.id,
+        SharePermissions.can_view_progress,
+        SharePermissions.can_view_habits,
+        SharePermissions.created_at,
+        User.email,
+        User.display_name
+    ).outerjoin(
+        User, User.id == SharePermissions.viewer_user_id
+    ).filter(
         SharePermissions.owner_user_id == current_user.id
     ).all()
     
-    # Get permissions where current user is the viewer (can view others' data)  
-    received_permissions = db.query(SharePermissions).filter(
+    # Permissions where current user is the viewer (can view others' data), joined to the owner
+    received_permissions = db.query(
+        SharePermissions.id,
+        SharePermissions.can_view_progress,
+        SharePermissions.can_view_habits,
+        SharePermissions.created_at,
+        User.email,
+        User.display_name
+    ).outerjoin(
+        User, User.id == SharePermissions.owner_user_id
+    ).filter(
         SharePermissions.viewer_user_id == current_user.id
     ).all()
     
-    owned_result = []
-    for perm in owned_permissions:
-        viewer = db.query(User).filter(User.id == perm.viewer_user_id).first()
-        owned_result.append({
+    owned_result = [
+        {
             "id": perm.id,
-            "viewer_email": viewer.email if viewer else None,
-            "viewer_name": viewer.display_name if viewer else None,
+            "viewer_email": perm.email,
+            "viewer_name": perm.display_name,
             "can_view_progress": perm.can_view_progress,
             "can_view_habits": perm.can_view_habits,
             "created_at": perm.created_at
-        })
+        }
+        for perm in owned_permissions
+    ]
     
-    received_result = []
-    for perm in received_permissions:
-        owner = db.query(User).filter(User.id == perm.owner_user_id).first()
-        received_result.append({
+    received_result = [
+        {
             "id": perm.id,
-            "owner_email": owner.email if owner else None,
-            "owner_name": owner.display_name if owner else None,
+            "owner_email": perm.email,
+            "owner_name": perm.display_name,
             "can_view_progress": perm.can_view_progress,
             "can_view_habits": perm.can_view_habits,
             "created_at": perm.created_at
-        })
+        }
+        for perm in received_permissions
+    ]
     
     return {
         "sharing_with_others": owned_result,
@@ -121,14 +141,11 @@ async def get_share_permissions(
 @router.delete("/permissions/{permission_id}")
 async def revoke_share_permission(
     permission_id: uuid.UUID,
-    current_user: User = Depends(get_current_active_user),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Find permission - user must be the owner to revoke
-    permission = db.query(SharePermissions).filter(
-        SharePermissions.id == permission_id,
-        SharePermissions.owner_user_id == current_user.id
-    ).first()
+    permission = permissions.owned_grant(permission_id)
     
     if not permission:
         raise HTTPException(
@@ -137,32 +154,39 @@ async def revoke_share_permission(
         )
     
     db.delete(permission)
+    for user_id in (permission.owner_user_id, permission.viewer_user_id):
+        record_tombstones(db, user_id, "share_permissions", [permission.id])
     db.commit()
     
     return {"message": "Permission revoked successfully"}
 
-@router.get("/available")
+@router.get("/available", response_model=List[SharedDataAvailableResponse])
 async def get_shared_data_available(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
     """Get list of users whose data the current user can access"""
     
-    # Get permissions where current user is the viewer
-    permissions = db.query(SharePermissions).filter(
+    # Permissions where current user is the viewer, joined to the owner's public profile
+    permissions = db.query(
+        User.id,
+        User.display_name,
+        User.avatar_url,
+        SharePermissions.can_view_progress,
+        SharePermissions.can_view_habits
+    ).select_from(SharePermissions).join(
+        User, User.id == SharePermissions.owner_user_id
+    ).filter(
         SharePermissions.viewer_user_id == current_user.id
     ).all()
     
-    result = []
-    for perm in permissions:
-        owner = db.query(User).filter(User.id == perm.owner_user_id).first()
-        if owner:
-            result.append({
-                "user_id": owner.id,
-                "name": owner.display_name,
-                "avatar_url": owner.avatar_url,
-                "can_view_progress": perm.can_view_progress,
-                "can_view_habits": perm.can_view_habits
-            })
-    
-    return result
\ No newline at end of file
+    return [
+        SharedDataAvailableResponse(
+            user_id=perm.id,
+            name=perm.display_name,
+            avatar_url=perm.avatar_url,
+            can_view_progress=perm.can_view_progress,
+            can_view_habits=perm.can_view_habits
+        )
+        for perm in permissions
+    ]
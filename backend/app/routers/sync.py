@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ..core.config import settings
+from ..core.database import get_db
+from ..core.timing import TimedRoute
+from ..dependencies.auth import Principal, get_active_principal
+from ..services.sync import SyncCursorError, SyncCursorExpired, get_changes
+
+router = APIRouter(prefix="/sync", tags=["sync"], route_class=TimedRoute)
+
+@router.get("")
+async def sync_changes(
+    since: Optional[str] = Query(None, description="next_cursor from the previous response; omit for a full sync"),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_active_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    Habits, habit logs, workout templates and sessions, progress snapshots and
+    share grants created, updated or deleted since the cursor. Keep calling
+    with `next_cursor` while `has_more` is true, then store the last
+    `next_cursor` for the next sync.
+    """
+    try:
+        return get_changes(db, current_user.id, since, limit)
+    except SyncCursorExpired:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync cursor expired; start a full sync without `since`"
+        )
+    except SyncCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
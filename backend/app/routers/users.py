@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from datetime import datetime
 
-from ..core.database import get_db
+from ..core.database import SessionLocal, get_db
+from ..core.timing import TimedRoute
 from ..dependencies.auth import get_current_active_user
 from ..models.user import User
 from ..schemas.user import UserResponse, UserUpdate
+from ..services.accounts import request_account_deletion
+from ..services.exporter import EXPORT_FORMATS, stream_ndjson_export, stream_zip_export
 
-router = APIRouter(tags=["users"])
+router = APIRouter(tags=["users"], route_class=TimedRoute)
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
@@ -27,4 +32,51 @@ async def update_current_user(
     
     db.commit()
     db.refresh(current_user)
-    return current_user
\ No newline at end of file
+    return current_user
+
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
+async def delete_current_user(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Deactivate the account immediately; its data is erased shortly after by
+    the background purge job.
+    """
+    request_account_deletion(db, current_user)
+    return {"message": "Account scheduled for deletion"}
+
+@router.get("/me/export")
+async def export_current_user_data(
+    format: str = Query("zip", description="zip (one NDJSON file per section) or ndjson"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Download everything stored for the account: profile, habits and logs,
+    workout templates and sessions, progress snapshots and share grants.
+    The archive is streamed as it is read, so memory use does not grow
+    with the size of the account.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be zip or ndjson"
+        )
+    
+    user_id = current_user.id
+    stream = stream_zip_export if format == "zip" else stream_ndjson_export
+    
+    def body():
+        # get_db's session is closed before a streaming body runs, so the export owns its own
+        db = SessionLocal()
+        try:
+            yield from stream(db, user_id)
+        finally:
+            db.close()
+    
+    filename = f"couplesworkout-export-{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        body(),
+        media_type="application/zip" if format == "zip" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -5,13 +5,18 @@ from datetime import datetime, date
 import uuid
 
 from ..core.database import get_db
-from ..dependencies.auth import get_current_active_user
-from ..models.user import User
+from ..core.timing import TimedRoute
+from ..dependencies.auth import Principal, get_active_principal
+from ..dependencies.conditional import ConditionalGet, conditional_get
+from ..dependencies.permissions import PermissionResolver, get_permissions
 from ..models.workout import WorkoutTemplate, WorkoutSession, WorkoutType
-from ..models.couple import CoupleMember
+from ..schemas.workout import WorkoutTemplateResponse, WorkoutSessionResponse
+from ..services.rollups import bump_weekly_rollup, get_recent_weekly_rollups, utc_date
+from ..services.versions import bump_collection_version
+from ..services.workouts import compute_session_metrics
 
-router = APIRouter(prefix="/workout-templates", tags=["workouts"])
-sessions_router = APIRouter(prefix="/workout-sessions", tags=["workouts"])
+router = APIRouter(prefix="/workout-templates", tags=["workouts"], route_class=TimedRoute)
+sessions_router = APIRouter(prefix="/workout-sessions", tags=["workouts"], route_class=TimedRoute)
 
 # Workout Templates
 
@@ -20,7 +25,7 @@ async def create_workout_template(
     name: str,
     workout_type: WorkoutType,
     exercises: List[dict],  # [{"name": str, "sets": int, "reps": int, "weight_kg": float?, "duration_sec": int?}]
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
     template = WorkoutTemplate(
@@ -30,6 +35,7 @@ async def create_workout_template(
         exercises=exercises
     )
     db.add(template)
+    bump_collection_version(db, current_user.id, "workout_templates")
     db.commit()
     db.refresh(template)
     
@@ -41,12 +47,17 @@ async def create_workout_template(
         "created_at": template.created_at
     }
 
-@router.get("/")
+@router.get("/", response_model=List[WorkoutTemplateResponse])
 async def get_workout_templates(
     mine: bool = Query(False, description="Only return user's templates"),
-    current_user: User = Depends(get_current_active_user),
+    # System templates only change with a seed, so the user's own version is enough
+    conditional: ConditionalGet = Depends(conditional_get("workout_templates")),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    
     query = db.query(WorkoutTemplate)
     
     if mine:
@@ -61,18 +72,17 @@ async def get_workout_templates(
     
     templates = query.all()
     
-    result = []
-    for template in templates:
-        result.append({
-            "id": template.id,
-            "name": template.name,
-            "type": template.type,
-            "exercises": template.exercises,
-            "is_system": template.owner_user_id is None,
-            "created_at": template.created_at
-        })
-    
-    return result
+    return [
+        WorkoutTemplateResponse(
+            id=template.id,
+            name=template.name,
+            type=template.type,
+            exercises=template.exercises,
+            is_system=template.owner_user_id is None,
+            created_at=template.created_at
+        )
+        for template in templates
+    ]
 
 # Workout Sessions
 
@@ -84,15 +94,12 @@ async def create_workout_session(
     exercises_performed: Optional[List[dict]] = None,
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
+    permissions: PermissionResolver = Depends(get_permissions),
     db: Session = Depends(get_db)
 ):
     # Get user's couple if they have one
-    couple_membership = db.query(CoupleMember).filter(
-        CoupleMember.user_id == current_user.id
-    ).first()
-    
-    couple_id = couple_membership.couple_id if couple_membership else None
+    couple_id = permissions.couple_id
     
     # Default start_time to now if not provided
     if start_time is None:
@@ -110,18 +117,27 @@ async def create_workout_session(
     )
     
     # Calculate basic metrics if session is completed
-    if end_time and exercises_performed:
-        total_volume = 0
-        for exercise in exercises_performed:
-            if 'sets' in exercise and 'reps' in exercise and 'weight_kg' in exercise:
-                total_volume += exercise['sets'] * exercise['reps'] * exercise.get('weight_kg', 0)
-        
-        session.metrics = {
-            "total_volume": total_volume,
-            "duration_minutes": int((end_time - start_time).total_seconds() / 60)
-        }
+    metrics = compute_session_metrics(exercises_performed, start_time, end_time)
+    if metrics:
+        session.metrics = metrics
     
     db.add(session)
+    
+    bump_collection_version(db, current_user.id, "workout_sessions")
+    
+    # Count completed sessions in the user's weekly rollup, in the same transaction
+    if end_time:
+        bump_weekly_rollup(
+            db,
+            current_user.id,
+            utc_date(start_time),
+            workouts_completed=1,
+            gym_sessions=int(mode == WorkoutType.gym),
+            home_sessions=int(mode == WorkoutType.home),
+            workout_volume=session.total_volume or 0,
+            workout_minutes=session.duration_minutes or 0
+        )
+    
     db.commit()
     db.refresh(session)
     
@@ -135,13 +151,17 @@ async def create_workout_session(
         "metrics": session.metrics
     }
 
-@sessions_router.get("/")
+@sessions_router.get("/", response_model=List[WorkoutSessionResponse])
 async def get_workout_sessions(
     from_date: Optional[date] = Query(None),
     to_date: Optional[date] = Query(None),
-    current_user: User = Depends(get_current_active_user),
+    conditional: ConditionalGet = Depends(conditional_get("workout_sessions")),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    
     query = db.query(WorkoutSession).filter(
         WorkoutSession.user_id == current_user.id
     )
@@ -152,62 +172,32 @@ async def get_workout_sessions(
     if to_date:
         query = query.filter(WorkoutSession.start_time <= datetime.combine(to_date, datetime.max.time()))
     
-    sessions = query.order_by(WorkoutSession.start_time.desc()).all()
-    
-    result = []
-    for session in sessions:
-        result.append({
-            "id": session.id,
-            "mode": session.mode,
-            "start_time": session.start_time,
-            "end_time": session.end_time,
-            "notes": session.notes,
-            "exercises_performed": session.exercises_performed,
-            "metrics": session.metrics,
-            "template_id": session.template_id
-        })
-    
-    return result
+    # Serialized straight from the ORM rows by the response model
+    return query.order_by(WorkoutSession.start_time.desc()).all()
 
 @sessions_router.get("/stats/weekly")
 async def get_weekly_workout_stats(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
-    # Get sessions from last 7 days
-    from datetime import datetime, timedelta
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    
-    sessions = db.query(WorkoutSession).filter(
-        WorkoutSession.user_id == current_user.id,
-        WorkoutSession.start_time >= week_ago,
-        WorkoutSession.end_time.isnot(None)  # Only completed sessions
-    ).all()
-    
-    total_sessions = len(sessions)
-    total_volume = 0
-    total_duration = 0
-    gym_sessions = 0
-    home_sessions = 0
-    
-    for session in sessions:
-        if session.metrics:
-            total_volume += session.metrics.get("total_volume", 0)
-            total_duration += session.metrics.get("duration_minutes", 0)
-        
-        if session.mode == WorkoutType.gym:
-            gym_sessions += 1
-        elif session.mode == WorkoutType.home:
-            home_sessions += 1
+    # Current and previous ISO week straight from the rollup rows, no session scan
+    current_week, previous_week = [
+        {
+            "week_start": week["week_start"],
+            "total_sessions": week["workouts_completed"],
+            "gym_sessions": week["gym_sessions"],
+            "home_sessions": week["home_sessions"],
+            "total_volume_kg": week["workout_volume"],
+            "total_duration_minutes": week["workout_minutes"],
+            "avg_session_duration": week["workout_minutes"] / week["workouts_completed"] if week["workouts_completed"] > 0 else 0
+        }
+        for week in get_recent_weekly_rollups(db, current_user.id, datetime.utcnow().date())
+    ]
     
     return {
-        "period": "last_7_days",
-        "total_sessions": total_sessions,
-        "gym_sessions": gym_sessions,
-        "home_sessions": home_sessions,
-        "total_volume_kg": total_volume,
-        "total_duration_minutes": total_duration,
-        "avg_session_duration": total_duration / total_sessions if total_sessions > 0 else 0
+        "period": "current_week",
+        **current_week,
+        "previous_week": previous_week
     }
 
 # Include both routers
@@ -1,7 +1,7 @@
 from .user import UserCreate, UserResponse, UserUpdate
 from .auth import Token, TokenData, LoginRequest, RegisterRequest
 from .couple import CoupleCreate, CoupleResponse, CoupleMemberResponse, CoupleSettingsUpdate
-from .workout import WorkoutTemplateCreate, WorkoutTemplateResponse, WorkoutSessionCreate, WorkoutSessionResponse
+from .workout import WorkoutTemplateCreate, WorkoutTemplateResponse, WorkoutSessionCreate, WorkoutSessionResponse, WorkoutSessionImport
 from .habit import HabitCreate, HabitResponse, HabitLogCreate, HabitLogResponse
 from .progress import ProgressSnapshotCreate, ProgressSnapshotResponse
 from .share import SharePermissionsCreate, SharePermissionsResponse
@@ -10,7 +10,7 @@ __all__ = [
     "UserCreate", "UserResponse", "UserUpdate",
     "Token", "TokenData", "LoginRequest", "RegisterRequest",
     "CoupleCreate", "CoupleResponse", "CoupleMemberResponse", "CoupleSettingsUpdate",
-    "WorkoutTemplateCreate", "WorkoutTemplateResponse", "WorkoutSessionCreate", "WorkoutSessionResponse",
+    "WorkoutTemplateCreate", "WorkoutTemplateResponse", "WorkoutSessionCreate", "WorkoutSessionResponse", "WorkoutSessionImport",
     "HabitCreate", "HabitResponse", "HabitLogCreate", "HabitLogResponse",
     "ProgressSnapshotCreate", "ProgressSnapshotResponse",
     "SharePermissionsCreate", "SharePermissionsResponse"
@@ -12,6 +12,8 @@ class RegisterRequest(BaseModel):
 
 class AppleAuthRequest(BaseModel):
     identity_token: str
+    # Apple only shares the user's name with the app on first sign-in
+    display_name: Optional[str] = None
 
 class Token(BaseModel):
     access_token: str
@@ -23,4 +25,7 @@ class TokenData(BaseModel):
     user_id: Optional[str] = None
 
 class RefreshTokenRequest(BaseModel):
-    refresh_token: str
\ No newline at end of file
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
\ No newline at end of file
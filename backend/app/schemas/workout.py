@@ -46,4 +46,8 @@ class WorkoutSessionResponse(BaseModel):
     template_id: Optional[uuid.UUID] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class WorkoutSessionImport(WorkoutSessionCreate):
+    start_time: datetime
+    metrics: Optional[dict] = None
@@ -0,0 +1,17 @@
+from .accounts import purge_account, purge_deleted_accounts, request_account_deletion
+from .exporter import stream_ndjson_export, stream_zip_export
+from .invites import create_couple_invite, purge_expired_invites
+from .progress import get_progress_summary, invalidate_progress_summary
+from .rollups import bump_weekly_rollup, get_weekly_rollup, get_recent_weekly_rollups, rebuild_weekly_rollups
+from .sync import get_changes, purge_expired_tombstones, record_tombstones
+from .versions import bump_collection_version, get_collection_version
+
+__all__ = [
+    "request_account_deletion", "purge_account", "purge_deleted_accounts",
+    "stream_ndjson_export", "stream_zip_export",
+    "create_couple_invite", "purge_expired_invites",
+    "get_progress_summary", "invalidate_progress_summary",
+    "bump_weekly_rollup", "get_weekly_rollup", "get_recent_weekly_rollups", "rebuild_weekly_rollups",
+    "get_changes", "purge_expired_tombstones", "record_tombstones",
+    "bump_collection_version", "get_collection_version"
+]
@@ -0,0 +1,150 @@
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+import uuid
+
+from ..core.config import settings
+from ..models.couple import Couple, CoupleInvite, CoupleMember, CoupleRole, CoupleSettings
+from ..models.habit import Habit, HabitLog
+from ..models.progress import ProgressSnapshot
+from ..models.rollup import WeeklyRollup
+from ..models.share import SharePermissions
+from ..models.sync import SyncTombstone
+from ..models.user import User
+from ..models.version import CollectionVersion
+from ..models.workout import WorkoutSession, WorkoutTemplate
+from .progress import invalidate_progress_summary
+from .revocation import bump_security_version
+from .versions import bump_collection_version
+from .sync import record_tombstones
+
+logger = logging.getLogger(__name__)
+
+def request_account_deletion(db: Session, user: User) -> None:
+    """
+    Deactivate the account right away and queue it for purge_deleted_accounts.
+    The user can no longer sign in or call the API once this commits.
+    """
+    user.is_active = False
+    user.deleted_at = datetime.now(timezone.utc)
+    bump_security_version(db, user.id)
+    db.commit()
+    invalidate_progress_summary(user.id)
+
+def _delete_in_batches(db: Session, model, condition, batch_size: int) -> int:
+    # Each batch is its own short transaction, so no lock is held for long
+    deleted = 0
+    while True:
+        batch = select(model.id).where(condition).limit(batch_size).scalar_subquery()
+        result = db.execute(delete(model).where(model.id.in_(batch)))
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+def _bump_owner_versions(db: Session, owner_ids, collection: str) -> None:
+    # Other users' cached lists (ETags) must not outlive the rows we just changed
+    for owner_id in set(owner_ids):
+        bump_collection_version(db, owner_id, collection)
+
+def _detach_in_batches(db: Session, model, column, condition, owner, collection: str, batch_size: int) -> None:
+    # Null out references held by other users' rows, batched like the deletes
+    while True:
+        batch = select(model.id).where(condition).limit(batch_size).scalar_subquery()
+        owner_ids = db.execute(
+            update(model).where(model.id.in_(batch)).values({column: None, "updated_at": func.now()}).returning(owner)
+        ).scalars().all()
+        _bump_owner_versions(db, owner_ids, collection)
+        db.commit()
+        if len(owner_ids) < batch_size:
+            return
+
+def _tombstone_partner_grants(db: Session, user_id: uuid.UUID) -> None:
+    # The other side of each grant must learn on its next sync that it is gone
+    grants = db.query(
+        SharePermissions.id, SharePermissions.owner_user_id, SharePermissions.viewer_user_id
+    ).filter(
+        (SharePermissions.owner_user_id == user_id) | (SharePermissions.viewer_user_id == user_id)
+    ).all()
+    for grant_id, owner_user_id, viewer_user_id in grants:
+        partner_id = viewer_user_id if owner_user_id == user_id else owner_user_id
+        record_tombstones(db, partner_id, "share_permissions", [grant_id])
+    db.commit()
+
+def _leave_couple(db: Session, user_id: uuid.UUID) -> int:
+    membership = db.query(CoupleMember).filter(CoupleMember.user_id == user_id).first()
+    if membership is None:
+        return 0
+
+    couple_id = membership.couple_id
+    db.delete(membership)
+    db.flush()
+
+    remaining = db.query(CoupleMember).filter(CoupleMember.couple_id == couple_id).all()
+    if remaining:
+        # The partner keeps the couple and becomes its owner
+        for member in remaining:
+            member.role = CoupleRole.owner
+        db.commit()
+        return 1
+
+    owner_ids = db.execute(
+        update(WorkoutSession).where(WorkoutSession.couple_id == couple_id)
+        .values(couple_id=None, updated_at=func.now())
+        .returning(WorkoutSession.user_id)
+    ).scalars().all()
+    _bump_owner_versions(db, owner_ids, "workout_sessions")
+    db.query(CoupleInvite).filter(CoupleInvite.couple_id == couple_id).delete(synchronize_session=False)
+    db.query(CoupleSettings).filter(CoupleSettings.couple_id == couple_id).delete(synchronize_session=False)
+    db.query(Couple).filter(Couple.id == couple_id).delete(synchronize_session=False)
+    db.commit()
+    return 1
+
+def purge_account(db: Session, user_id: uuid.UUID, batch_size: Optional[int] = None) -> int:
+    """
+    Delete everything owned by one user, then the user row, in batches of
+    `batch_size` rows per transaction. Safe to re-run after an interruption.
+    Returns the number of rows removed.
+    """
+    batch_size = batch_size or settings.ACCOUNT_PURGE_BATCH_SIZE
+    user_habits = select(Habit.id).where(Habit.user_id == user_id)
+    user_templates = select(WorkoutTemplate.id).where(WorkoutTemplate.owner_user_id == user_id)
+
+    deleted = _delete_in_batches(db, HabitLog, HabitLog.habit_id.in_(user_habits), batch_size)
+    deleted += _delete_in_batches(db, Habit, Habit.user_id == user_id, batch_size)
+    deleted += _delete_in_batches(db, WorkoutSession, WorkoutSession.user_id == user_id, batch_size)
+    _detach_in_batches(
+        db, WorkoutSession, "template_id", WorkoutSession.template_id.in_(user_templates),
+        WorkoutSession.user_id, "workout_sessions", batch_size
+    )
+    deleted += _delete_in_batches(db, WorkoutTemplate, WorkoutTemplate.owner_user_id == user_id, batch_size)
+    deleted += _delete_in_batches(db, ProgressSnapshot, ProgressSnapshot.user_id == user_id, batch_size)
+    deleted += _delete_in_batches(db, WeeklyRollup, WeeklyRollup.user_id == user_id, batch_size)
+    deleted += _delete_in_batches(db, CollectionVersion, CollectionVersion.user_id == user_id, batch_size)
+    deleted += _delete_in_batches(db, SyncTombstone, SyncTombstone.user_id == user_id, batch_size)
+    _tombstone_partner_grants(db, user_id)
+    deleted += _delete_in_batches(
+        db, SharePermissions,
+        (SharePermissions.owner_user_id == user_id) | (SharePermissions.viewer_user_id == user_id),
+        batch_size
+    )
+    deleted += _delete_in_batches(db, CoupleInvite, CoupleInvite.created_by_user_id == user_id, batch_size)
+    deleted += _leave_couple(db, user_id)
+
+    deleted += db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def purge_deleted_accounts(db: Session) -> int:
+    """Purge every account queued by request_account_deletion. Returns the number of rows removed."""
+    user_ids = [
+        user_id for (user_id,) in db.query(User.id).filter(User.deleted_at.isnot(None)).order_by(User.deleted_at)
+    ]
+
+    deleted = 0
+    for user_id in user_ids:
+        deleted += purge_account(db, user_id)
+        logger.info("Purged account %s", user_id)
+    return deleted
@@ -0,0 +1,44 @@
+from jose import jwt
+from jose.exceptions import JOSEError
+
+from ..core.config import settings
+from ..core.jwks import FileKeySource, HTTPKeySource, JWKSCache, JWKSError, KeySource
+
+class AppleTokenError(ValueError):
+    """The identity token is malformed, expired, or not signed by Apple for this app."""
+
+def create_apple_key_source() -> KeySource:
+    if settings.APPLE_JWKS_FILE:
+        return FileKeySource(settings.APPLE_JWKS_FILE)
+    return HTTPKeySource(settings.APPLE_JWKS_URL, timeout_seconds=settings.APPLE_JWKS_TIMEOUT_SECONDS)
+
+apple_jwks = JWKSCache(
+    "apple_jwks",
+    create_apple_key_source(),
+    ttl_seconds=settings.APPLE_JWKS_TTL_SECONDS,
+    min_refresh_seconds=settings.APPLE_JWKS_MIN_REFRESH_SECONDS
+)
+
+def verify_identity_token(identity_token: str) -> dict:
+    """
+    Verified claims of a Sign in with Apple identity token. May block on a
+    key fetch, so async callers should run it in a thread.
+    """
+    try:
+        header = jwt.get_unverified_header(identity_token)
+        key = apple_jwks.get_key(header.get("kid", ""))
+        claims = jwt.decode(
+            identity_token,
+            key,
+            algorithms=["RS256"],
+            audience=settings.APPLE_CLIENT_ID,
+            issuer=settings.APPLE_ISSUER,
+            # Apple identity tokens carry no at_hash to check
+            options={"verify_at_hash": False}
+        )
+    except (JOSEError, JWKSError) as exc:
+        raise AppleTokenError(str(exc)) from exc
+
+    if not claims.get("sub"):
+        raise AppleTokenError("Identity token has no subject")
+    return claims
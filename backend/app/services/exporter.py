@@ -0,0 +1,153 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import Any, Callable, Iterator, List, Tuple
+import enum
+import io
+import json
+import uuid
+import zipfile
+
+from ..core.config import settings
+from ..models.habit import Habit, HabitLog
+from ..models.progress import ProgressSnapshot
+from ..models.share import SharePermissions
+from ..models.user import User
+from ..models.workout import WorkoutSession, WorkoutTemplate
+
+EXPORT_FORMATS = ("ndjson", "zip")
+
+# Never leaves the server, even in the user's own export
+EXCLUDED_USER_COLUMNS = ("password_hash",)
+
+def _profile(user_id: uuid.UUID):
+    columns = [c for c in User.__table__.c if c.name not in EXCLUDED_USER_COLUMNS]
+    return select(*columns).where(User.id == user_id)
+
+def _habits(user_id: uuid.UUID):
+    return select(Habit.__table__).where(Habit.user_id == user_id).order_by(Habit.created_at)
+
+def _habit_logs(user_id: uuid.UUID):
+    return select(HabitLog.__table__).join(Habit, Habit.id == HabitLog.habit_id).where(
+        Habit.user_id == user_id
+    ).order_by(HabitLog.date)
+
+def _workout_templates(user_id: uuid.UUID):
+    return select(WorkoutTemplate.__table__).where(
+        WorkoutTemplate.owner_user_id == user_id
+    ).order_by(WorkoutTemplate.created_at)
+
+def _workout_sessions(user_id: uuid.UUID):
+    return select(WorkoutSession.__table__).where(
+        WorkoutSession.user_id == user_id
+    ).order_by(WorkoutSession.start_time)
+
+def _progress_snapshots(user_id: uuid.UUID):
+    return select(ProgressSnapshot.__table__).where(
+        ProgressSnapshot.user_id == user_id
+    ).order_by(ProgressSnapshot.date)
+
+def _share_permissions(user_id: uuid.UUID):
+    return select(SharePermissions.__table__).where(
+        (SharePermissions.owner_user_id == user_id) |
+        (SharePermissions.viewer_user_id == user_id)
+    ).order_by(SharePermissions.created_at)
+
+# Export order; each section becomes `<name>.ndjson` in the ZIP archive
+EXPORT_SECTIONS: List[Tuple[str, Callable[[uuid.UUID], Any]]] = [
+    ("profile", _profile),
+    ("habits", _habits),
+    ("habit_logs", _habit_logs),
+    ("workout_templates", _workout_templates),
+    ("workout_sessions", _workout_sessions),
+    ("progress_snapshots", _progress_snapshots),
+    ("share_permissions", _share_permissions),
+]
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, default=_json_default, separators=(",", ":")) + "\n"
+
+def iter_section(db: Session, user_id: uuid.UUID, build_query: Callable[[uuid.UUID], Any]) -> Iterator[dict]:
+    """
+    Rows of one export section, fetched through a server-side cursor in
+    batches of EXPORT_BATCH_SIZE so only one batch is in memory at a time.
+    """
+    result = db.execute(
+        build_query(user_id).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    try:
+        for row in result.mappings():
+            yield dict(row)
+    finally:
+        result.close()
+
+def _buffered(lines: Iterator[str]) -> Iterator[bytes]:
+    # Coalesce lines so the response isn't flushed once per row
+    buffer: List[bytes] = []
+    size = 0
+    for line in lines:
+        encoded = line.encode("utf-8")
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= settings.EXPORT_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+def stream_ndjson_export(db: Session, user_id: uuid.UUID) -> Iterator[bytes]:
+    """One NDJSON stream of `{"section": ..., "record": ...}` lines covering every section."""
+    def lines() -> Iterator[str]:
+        for section, build_query in EXPORT_SECTIONS:
+            for record in iter_section(db, user_id, build_query):
+                yield _dumps({"section": section, "record": record})
+
+    return _buffered(lines())
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file object whose contents are drained as they arrive."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_zip_export(db: Session, user_id: uuid.UUID) -> Iterator[bytes]:
+    """
+    A ZIP archive with one NDJSON file per section, produced incrementally.
+
+    zipfile writes data descriptors when its target can't seek, so entries
+    are compressed and emitted as they are written and never buffered whole.
+    """
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+    for section, build_query in EXPORT_SECTIONS:
+        with archive.open(f"{section}.ndjson", mode="w", force_zip64=True) as entry:
+            lines = (_dumps(record) for record in iter_section(db, user_id, build_query))
+            for chunk in _buffered(lines):
+                entry.write(chunk)
+                data = sink.drain()
+                if data:
+                    yield data
+    # Closing writes the central directory
+    archive.close()
+    yield sink.drain()
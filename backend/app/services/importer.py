@@ -0,0 +1,334 @@
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, text
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+import csv
+import json
+import uuid
+
+from ..core.config import settings
+from ..models.couple import CoupleMember
+from ..models.progress import ProgressSnapshot, numeric_metric
+from ..models.workout import WorkoutSession
+from ..schemas.progress import ProgressSnapshotCreate
+from ..schemas.workout import WorkoutSessionImport
+from .progress import invalidate_progress_summary
+from .rollups import as_utc, iso_week_start, rebuild_weekly_rollups, utc_date
+from .sync import record_tombstones
+from .versions import bump_collection_version
+from .workouts import compute_session_metrics
+
+IMPORT_KINDS = ("progress", "workouts")
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# CSV cells holding nested JSON
+JSON_CSV_COLUMNS = ("metrics", "exercises_performed")
+
+class ImportRowError(ValueError):
+    pass
+
+def _csv_value(value: str) -> Any:
+    value = value.strip()
+    try:
+        return float(value) if any(c in value for c in ".eE") else int(value)
+    except ValueError:
+        return value
+
+class RecordParser:
+    """
+    Turns text lines into dict records one at a time, so neither the CLI nor
+    the upload endpoint ever holds more than one line of the source.
+
+    CSV input needs a header row and one record per line; NDJSON input is
+    one JSON object per line. Blank lines are skipped.
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.fmt = fmt
+        self.header: Optional[List[str]] = None
+
+    def parse(self, line: str) -> Optional[dict]:
+        """A record for `line`, None for lines that carry no record (blank or header)."""
+        if not line.strip():
+            return None
+
+        if self.fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ImportRowError(f"Invalid JSON: {e.msg}")
+            if not isinstance(record, dict):
+                raise ImportRowError("Each line must be a JSON object")
+            return record
+
+        cells = next(csv.reader([line]))
+        if self.header is None:
+            self.header = [cell.strip() for cell in cells]
+            return None
+        if len(cells) != len(self.header):
+            raise ImportRowError(f"Expected {len(self.header)} columns, got {len(cells)}")
+
+        record = {}
+        for column, cell in zip(self.header, cells):
+            if cell.strip() == "":
+                continue
+            if column in JSON_CSV_COLUMNS:
+                try:
+                    record[column] = json.loads(cell)
+                except json.JSONDecodeError as e:
+                    raise ImportRowError(f"Invalid JSON in column {column}: {e.msg}")
+            else:
+                record[column] = cell.strip()
+        return record
+
+class ImportJob:
+    """
+    Validates records and loads them in chunks of `chunk_size` rows.
+
+    Each chunk is a single multi-row INSERT in its own short transaction.
+    Row-level errors are collected (up to IMPORT_MAX_REPORTED_ERRORS) rather than
+    aborting the import. Call `finish()` once the input is exhausted to flush
+    the last chunk and refresh derived data.
+    """
+
+    def __init__(self, db: Session, user_id: uuid.UUID, kind: str, chunk_size: Optional[int] = None):
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unsupported import kind: {kind}")
+        self.db = db
+        self.user_id = user_id
+        self.kind = kind
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.rows_skipped = 0
+        self.rows_failed = 0
+        self.errors: List[dict] = []
+        self._pending: List[dict] = []
+        # Snapshot dates loaded by earlier chunks of this import, so a repeat isn't counted twice
+        self._progress_dates: Set[date] = set()
+        self._min_date: Optional[date] = None
+        self._max_date: Optional[date] = None
+        self._couple_id = None
+        if kind == "workouts":
+            membership = db.query(CoupleMember.couple_id).filter(CoupleMember.user_id == user_id).first()
+            self._couple_id = membership.couple_id if membership else None
+
+    @property
+    def chunk_ready(self) -> bool:
+        return len(self._pending) >= self.chunk_size
+
+    def progress(self) -> dict:
+        return {
+            "rows_read": self.rows_read,
+            "rows_imported": self.rows_imported,
+            "rows_skipped": self.rows_skipped,
+            "rows_failed": self.rows_failed
+        }
+
+    def record_error(self, line_number: int, message: str) -> Optional[dict]:
+        """Count a failed row; returns the error entry if it is still within the reporting cap."""
+        self.rows_failed += 1
+        if len(self.errors) >= settings.IMPORT_MAX_REPORTED_ERRORS:
+            return None
+        error = {"line": line_number, "error": message}
+        self.errors.append(error)
+        return error
+
+    def add(self, line_number: int, record: dict) -> Optional[dict]:
+        """Validate and buffer one record. Returns an error entry if the row was rejected and reportable."""
+        self.rows_read += 1
+        try:
+            row = self._progress_row(record) if self.kind == "progress" else self._workout_row(record)
+        except ValidationError as e:
+            first = e.errors()[0]
+            location = ".".join(str(part) for part in first["loc"])
+            return self.record_error(line_number, f"{location}: {first['msg']}")
+        except ImportRowError as e:
+            return self.record_error(line_number, str(e))
+
+        self._pending.append(row)
+        return None
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        if self.kind == "progress":
+            self._insert_progress(rows)
+            bump_collection_version(self.db, self.user_id, "progress_snapshots")
+        else:
+            self._insert_workouts(rows)
+            bump_collection_version(self.db, self.user_id, "workout_sessions")
+        self.db.commit()
+
+    def finish(self) -> dict:
+        self.flush()
+        if self.rows_imported:
+            # Rollups feed the snapshot weekly counters, so rebuild them first
+            rebuild_weekly_rollups(self.db, user_id=self.user_id)
+            self._derive_snapshot_counters()
+            invalidate_progress_summary(self.user_id)
+        return {**self.progress(), "errors": self.errors}
+
+    # Validation
+
+    def _progress_row(self, record: dict) -> dict:
+        if "metrics" not in record:
+            # Flat rows: every column other than date is a metric
+            record = {
+                "date": record.get("date"),
+                "metrics": {k: _csv_value(v) if isinstance(v, str) else v for k, v in record.items() if k != "date"}
+            }
+        snapshot = ProgressSnapshotCreate.model_validate(record)
+        if not snapshot.metrics:
+            raise ImportRowError("Row has no metrics")
+        self._track_date(snapshot.date)
+        return {
+            "id": uuid.uuid4(),
+            "user_id": self.user_id,
+            "date": snapshot.date,
+            "metrics": snapshot.metrics,
+            "weight_kg": numeric_metric(snapshot.metrics, "weight_kg"),
+            "bodyfat_pct": numeric_metric(snapshot.metrics, "bodyfat_pct"),
+            "waist_cm": numeric_metric(snapshot.metrics, "waist_cm")
+        }
+
+    def _workout_row(self, record: dict) -> dict:
+        session = WorkoutSessionImport.model_validate(record)
+        if session.end_time and session.end_time < session.start_time:
+            raise ImportRowError("end_time is before start_time")
+        # Compare and store in UTC so re-imports match the stored timestamptz values
+        start_time = as_utc(session.start_time)
+        end_time = as_utc(session.end_time) if session.end_time else None
+        metrics = session.metrics or compute_session_metrics(
+            session.exercises_performed, start_time, end_time
+        )
+        self._track_date(utc_date(start_time))
+        duration = numeric_metric(metrics, "duration_minutes")
+        return {
+            "id": uuid.uuid4(),
+            "user_id": self.user_id,
+            "couple_id": self._couple_id,
+            "template_id": session.template_id,
+            "mode": session.mode,
+            "start_time": start_time,
+            "end_time": end_time,
+            "notes": session.notes,
+            "exercises_performed": session.exercises_performed or [],
+            "metrics": metrics,
+            "total_volume": numeric_metric(metrics, "total_volume"),
+            "duration_minutes": int(duration) if duration is not None else None
+        }
+
+    def _track_date(self, day: date):
+        self._min_date = day if self._min_date is None else min(self._min_date, day)
+        self._max_date = day if self._max_date is None else max(self._max_date, day)
+
+    # Loading
+
+    def _insert_progress(self, rows: List[dict]):
+        # One snapshot per date: the last row for a date wins, replacing any stored one
+        by_date: Dict[date, dict] = {}
+        for row in rows:
+            by_date[row["date"]] = row
+        self.rows_skipped += len(rows) - len(by_date)
+
+        replaced = self.db.execute(
+            delete(ProgressSnapshot).where(
+                ProgressSnapshot.user_id == self.user_id,
+                ProgressSnapshot.date.in_(list(by_date))
+            ).returning(ProgressSnapshot.id)
+        ).scalars().all()
+        record_tombstones(self.db, self.user_id, "progress_snapshots", replaced)
+        self.db.execute(insert(ProgressSnapshot).values(list(by_date.values())))
+        # A date already loaded by an earlier chunk replaces that row: the earlier one becomes a skip
+        repeated = len(self._progress_dates.intersection(by_date))
+        self._progress_dates.update(by_date)
+        self.rows_imported += len(by_date) - repeated
+        self.rows_skipped += repeated
+
+    def _insert_workouts(self, rows: List[dict]):
+        # Re-importing the same history must not duplicate sessions
+        existing = {
+            start_time for (start_time,) in self.db.query(WorkoutSession.start_time).filter(
+                WorkoutSession.user_id == self.user_id,
+                WorkoutSession.start_time.in_([row["start_time"] for row in rows])
+            )
+        }
+        new_rows = []
+        for row in rows:
+            if row["start_time"] in existing:
+                continue
+            existing.add(row["start_time"])
+            new_rows.append(row)
+        self.rows_skipped += len(rows) - len(new_rows)
+
+        if new_rows:
+            self.db.execute(insert(WorkoutSession).values(new_rows))
+        self.rows_imported += len(new_rows)
+
+    def _derive_snapshot_counters(self):
+        # Same server-derived weekly counters create_progress_snapshot stores,
+        # refreshed for every snapshot in the weeks the import touched
+        self.db.execute(
+            text(
+                """
+                UPDATE progress_snapshots AS s
+                SET metrics = s.metrics || jsonb_build_object(
+                    'workouts_completed_week', coalesce(r.workouts_completed, 0),
+                    'habits_completed_week', coalesce(r.habits_completed, 0)
+                ),
+                    updated_at = now()
+                FROM progress_snapshots AS p
+                LEFT JOIN weekly_rollups AS r
+                    ON r.user_id = p.user_id
+                    AND r.week_start = date_trunc('week', p.date::timestamp)::date
+                WHERE s.id = p.id
+                    AND p.user_id = :user_id
+                    AND p.date BETWEEN :from_date AND :to_date
+                """
+            ),
+            {
+                "user_id": self.user_id,
+                "from_date": iso_week_start(self._min_date),
+                "to_date": iso_week_start(self._max_date) + timedelta(days=6)
+            }
+        )
+        bump_collection_version(self.db, self.user_id, "progress_snapshots")
+        self.db.commit()
+
+def feed_line(job: ImportJob, parser: RecordParser, line_number: int, line: str) -> Optional[dict]:
+    """Parse and buffer one line; returns an error event if the line was rejected and reportable."""
+    try:
+        record = parser.parse(line)
+    except ImportRowError as e:
+        job.rows_read += 1
+        error = job.record_error(line_number, str(e))
+        return {"event": "error", **error} if error else None
+    if record is None:
+        return None
+
+    error = job.add(line_number, record)
+    return {"event": "error", **error} if error else None
+
+def summary_event(summary: dict) -> dict:
+    return {"event": "summary", **{k: v for k, v in summary.items() if k != "errors"}}
+
+def run_import(job: ImportJob, parser: RecordParser, lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Drive an import from any iterable of lines (e.g. an open file), yielding
+    NDJSON-ready events: reportable row errors, a progress event after each
+    chunk, and a final summary.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        error = feed_line(job, parser, line_number, line)
+        if error:
+            yield error
+        if job.chunk_ready:
+            job.flush()
+            yield {"event": "progress", **job.progress()}
+
+    yield summary_event(job.finish())
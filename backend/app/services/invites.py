@@ -0,0 +1,46 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone
+import secrets
+import string
+import uuid
+
+from ..core.config import settings
+from ..models.couple import CoupleInvite
+
+INVITE_CODE_ALPHABET = string.ascii_uppercase + string.digits
+INVITE_CODE_LENGTH = 8
+MAX_CODE_ATTEMPTS = 5
+
+def generate_invite_code() -> str:
+    return ''.join(secrets.choice(INVITE_CODE_ALPHABET) for _ in range(INVITE_CODE_LENGTH))
+
+def create_couple_invite(db: Session, couple_id: uuid.UUID, created_by_user_id: uuid.UUID) -> CoupleInvite:
+    """Persist a new invite code, retrying on the (unlikely) unique-index collision."""
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=settings.COUPLE_INVITE_EXPIRE_HOURS)
+    
+    for _ in range(MAX_CODE_ATTEMPTS):
+        invite = CoupleInvite(
+            couple_id=couple_id,
+            code=generate_invite_code(),
+            created_by_user_id=created_by_user_id,
+            expires_at=expires_at
+        )
+        db.add(invite)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            continue
+        db.refresh(invite)
+        return invite
+    
+    raise RuntimeError("Could not generate a unique invite code")
+
+def purge_expired_invites(db: Session) -> int:
+    """Delete invites past their expiry. Returns the number of rows removed."""
+    deleted = db.query(CoupleInvite).filter(
+        CoupleInvite.expires_at <= datetime.now(timezone.utc)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
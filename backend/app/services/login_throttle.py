@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, List, Tuple
+import time
+
+from ..core.config import settings
+from ..core.metrics import LOGIN_LOCKOUTS
+
+class LoginThrottle:
+    """
+    Failed-login counters per email and per client IP. Past the free
+    failures for a key, each further failure locks it for an exponentially
+    growing delay, and login is refused before any password hash is checked.
+
+    Counters are per worker process and bounded to LOGIN_THROTTLE_MAX_TRACKED
+    keys (least recently failed dropped first).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        # key -> [failures, locked_until, last_failure]
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def _keys(self, email: str, ip: str) -> List[Tuple[str, str, int]]:
+        return [
+            ("email", email.strip().lower(), settings.LOGIN_THROTTLE_EMAIL_FREE_FAILURES),
+            ("ip", ip, settings.LOGIN_THROTTLE_IP_FREE_FAILURES),
+        ]
+
+    def retry_after(self, email: str, ip: str) -> float:
+        """Seconds until this email/IP may try again; 0 when not locked."""
+        now = self.clock()
+        wait = 0.0
+        with self._lock:
+            for scope, value, _ in self._keys(email, ip):
+                entry = self._entries.get((scope, value))
+                if entry is not None:
+                    wait = max(wait, entry[1] - now)
+        return wait
+
+    def record_failure(self, email: str, ip: str) -> None:
+        now = self.clock()
+        with self._lock:
+            for scope, value, free_failures in self._keys(email, ip):
+                entry = self._entries.get((scope, value))
+                if entry is None or now - entry[2] > settings.LOGIN_THROTTLE_RESET_SECONDS:
+                    entry = [0, 0.0, now]
+                entry[0] += 1
+                entry[2] = now
+                if entry[0] > free_failures:
+                    delay = min(
+                        settings.LOGIN_THROTTLE_BASE_DELAY_SECONDS * 2 ** (entry[0] - free_failures - 1),
+                        settings.LOGIN_THROTTLE_MAX_DELAY_SECONDS
+                    )
+                    entry[1] = now + delay
+                    LOGIN_LOCKOUTS.labels(scope).inc()
+                self._entries[(scope, value)] = entry
+                self._entries.move_to_end((scope, value))
+            while len(self._entries) > settings.LOGIN_THROTTLE_MAX_TRACKED:
+                self._entries.popitem(last=False)
+
+    def record_success(self, email: str) -> None:
+        # Only the account's counter: one valid login must not clear an attacking IP
+        with self._lock:
+            self._entries.pop(("email", email.strip().lower()), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+login_throttle = LoginThrottle()
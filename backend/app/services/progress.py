@@ -0,0 +1,178 @@
+from sqlalchemy import DateTime, Float, and_, case, cast, func, or_
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Dict, Optional
+import uuid
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.progress import ProgressSnapshot
+
+SUMMARY_HORIZONS_DAYS = (7, 30, 90, 365)
+
+progress_summary_cache = TTLCache(
+    "progress_summary",
+    maxsize=settings.PROGRESS_SUMMARY_CACHE_SIZE,
+    ttl_seconds=settings.PROGRESS_SUMMARY_CACHE_TTL_SECONDS
+)
+
+def _metric_changes(current: dict, previous: dict) -> dict:
+    changes = {}
+    for key in current:
+        if key in previous and isinstance(current[key], (int, float)) and isinstance(previous[key], (int, float)):
+            changes[key] = current[key] - previous[key]
+    return changes
+
+def compute_progress_summary(db: Session, user_id: uuid.UUID, today: date) -> Dict[int, dict]:
+    """
+    Latest snapshot compared against the latest snapshot on or before each
+    horizon cutoff, keyed by horizon in days.
+
+    A single query tags every snapshot with the date of the next one
+    (`lead()`); a snapshot is the answer for cutoff C exactly when
+    date <= C < next_date, and the latest snapshot is the one with no next
+    date. So at most 1 + len(horizons) rows come back.
+    """
+    cutoffs = {days: today - timedelta(days=days) for days in SUMMARY_HORIZONS_DAYS}
+    
+    ranked = db.query(
+        ProgressSnapshot.date,
+        ProgressSnapshot.metrics,
+        func.lead(ProgressSnapshot.date).over(order_by=ProgressSnapshot.date).label("next_date")
+    ).filter(
+        ProgressSnapshot.user_id == user_id
+    ).subquery()
+    
+    rows = db.query(ranked.c.date, ranked.c.metrics, ranked.c.next_date).filter(
+        or_(
+            ranked.c.next_date.is_(None),
+            *[
+                and_(ranked.c.date <= cutoff, ranked.c.next_date > cutoff)
+                for cutoff in cutoffs.values()
+            ]
+        )
+    ).all()
+    
+    latest = next((row for row in rows if row.next_date is None), None)
+    
+    summaries = {}
+    for days, cutoff in cutoffs.items():
+        previous = next(
+            (
+                row for row in rows
+                if row.date <= cutoff and (row.next_date is None or row.next_date > cutoff)
+            ),
+            None
+        )
+        summaries[days] = {
+            "current": latest.metrics if latest else {},
+            "current_date": latest.date if latest else None,
+            "previous": previous.metrics if previous else {},
+            "previous_date": previous.date if previous else None,
+            "changes": _metric_changes(latest.metrics, previous.metrics) if latest and previous else {}
+        }
+    
+    return summaries
+
+def get_progress_summary(db: Session, user_id: uuid.UUID, today: Optional[date] = None) -> Dict[int, dict]:
+    today = today or date.today()
+    cached = progress_summary_cache.get(user_id)
+    # Cutoffs move with the calendar, so an entry is only valid for the day it was computed
+    if cached is not None and cached[0] == today:
+        return cached[1]
+    
+    summaries = compute_progress_summary(db, user_id, today)
+    progress_summary_cache.set(user_id, (today, summaries))
+    return summaries
+
+def invalidate_progress_summary(user_id: uuid.UUID) -> None:
+    progress_summary_cache.delete(user_id)
+
+HOT_METRIC_COLUMNS = {
+    "weight_kg": ProgressSnapshot.weight_kg,
+    "bodyfat_pct": ProgressSnapshot.bodyfat_pct,
+    "waist_cm": ProgressSnapshot.waist_cm,
+}
+
+def metric_value_expression(metric: str):
+    """SQL expression for a metric as double precision, NULL when absent or non-numeric."""
+    if metric in HOT_METRIC_COLUMNS:
+        return HOT_METRIC_COLUMNS[metric]
+    raw = ProgressSnapshot.metrics[metric]
+    return case(
+        (func.jsonb_typeof(raw) == "number", raw.astext.cast(Float)),
+        else_=None
+    )
+
+def compute_metric_timeseries(
+    db: Session,
+    user_id: uuid.UUID,
+    metric: str,
+    bucket: str,
+    from_date: date,
+    to_date: date,
+    rolling_window: int
+) -> dict:
+    """
+    Bucket one metric by day/week/month with min/max/mean per bucket, a
+    trailing rolling mean over `rolling_window` buckets, and the
+    least-squares slope (units per day) over every point in the range,
+    all in one statement.
+    """
+    value = metric_value_expression(metric)
+    # Plain timestamps so bucketing never depends on the session time zone
+    snapshot_time = cast(ProgressSnapshot.date, DateTime)
+    
+    points = db.query(
+        func.date_trunc(bucket, snapshot_time).label("bucket"),
+        (func.extract("epoch", snapshot_time) / 86400.0).label("day"),
+        value.label("value")
+    ).filter(
+        ProgressSnapshot.user_id == user_id,
+        ProgressSnapshot.date >= from_date,
+        ProgressSnapshot.date <= to_date,
+        value.isnot(None)
+    ).cte("points")
+    
+    buckets = db.query(
+        points.c.bucket,
+        func.count().label("count"),
+        func.min(points.c.value).label("min"),
+        func.max(points.c.value).label("max"),
+        func.avg(points.c.value).label("mean")
+    ).group_by(points.c.bucket).subquery("buckets")
+    
+    slope = db.query(func.regr_slope(points.c.value, points.c.day)).scalar_subquery()
+    
+    rows = db.query(
+        buckets.c.bucket,
+        buckets.c.count,
+        buckets.c.min,
+        buckets.c.max,
+        buckets.c.mean,
+        func.avg(buckets.c.mean).over(
+            order_by=buckets.c.bucket,
+            rows=(-(rolling_window - 1), 0)
+        ).label("rolling_mean"),
+        slope.label("slope")
+    ).order_by(buckets.c.bucket).all()
+    
+    return {
+        "metric": metric,
+        "bucket": bucket,
+        "from_date": from_date,
+        "to_date": to_date,
+        "rolling_window": rolling_window,
+        "trend_slope_per_day": rows[0].slope if rows else None,
+        "points": [
+            {
+                "date": row.bucket.date(),
+                "count": row.count,
+                "min": row.min,
+                "max": row.max,
+                "mean": row.mean,
+                "rolling_mean": row.rolling_mean
+            }
+            for row in rows
+        ]
+    }
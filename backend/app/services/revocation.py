@@ -0,0 +1,109 @@
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+import time
+import uuid
+
+from ..core.config import settings
+from ..core.revocation import revocation_list
+from ..core.security import token_id
+from ..models.token import RevokedToken
+from ..models.user import User
+
+# Security versions bumped in a session's open transaction, published to this worker once it commits
+_PENDING_SECURITY_VERSIONS = "pending_security_versions"
+
+def revoke_token(db: Session, token: str, payload: dict) -> bool:
+    """
+    Revoke a verified token and commit. Returns False when it was already
+    revoked, which for a refresh token means it is being replayed.
+    """
+    jti = token_id(token, payload)
+    token_type = payload.get("type", "access")
+    try:
+        user_id = uuid.UUID(payload["sub"])
+    except (KeyError, ValueError):
+        user_id = None
+
+    revoked_id = db.execute(
+        pg_insert(RevokedToken)
+        .values(
+            id=uuid.uuid4(),
+            jti=jti,
+            token_type=token_type,
+            user_id=user_id,
+            expires_at=datetime.fromtimestamp(payload["exp"], timezone.utc)
+        )
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        .returning(RevokedToken.id)
+    ).scalar()
+    db.commit()
+
+    # This worker stops accepting it right away; the others at their next sync
+    if token_type == "access":
+        revocation_list.add(jti, payload["exp"])
+    return revoked_id is not None
+
+def bump_security_version(db: Session, user_id: uuid.UUID) -> None:
+    """
+    Make the user's outstanding access tokens stale, in the caller's
+    transaction. Call it whenever a claim they carry (active flag, couple)
+    changes; clients then refresh and get tokens with the new claims.
+    """
+    version = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(security_version=User.security_version + 1, security_changed_at=func.now())
+        .returning(User.security_version)
+    ).scalar()
+    if version is not None:
+        db.info.setdefault(_PENDING_SECURITY_VERSIONS, []).append((str(user_id), version))
+
+@event.listens_for(Session, "after_commit")
+def _publish_security_versions(session: Session) -> None:
+    # Tokens issued before the commit expire within one access-token lifetime of it
+    forget_at = time.time() + settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    for user_id, version in session.info.pop(_PENDING_SECURITY_VERSIONS, []):
+        revocation_list.set_security_version(user_id, version, forget_at)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_security_versions(session: Session) -> None:
+    session.info.pop(_PENDING_SECURITY_VERSIONS, None)
+
+def sync_revoked_tokens(db: Session) -> int:
+    """
+    Load access tokens revoked and security versions bumped since the last
+    sync (by any worker) into this worker's revocation list, and forget
+    expired entries. Returns how many entries were new to this worker.
+    """
+    started_at = db.scalar(select(func.now()))
+    lifetime = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    revoked = select(RevokedToken.jti, RevokedToken.expires_at).where(
+        RevokedToken.token_type == "access",
+        RevokedToken.expires_at > started_at
+    )
+    versions = select(User.id, User.security_version, User.security_changed_at).where(
+        User.security_changed_at > started_at - lifetime
+    )
+    if revocation_list.synced_at is not None:
+        since = revocation_list.synced_at - timedelta(seconds=settings.REVOCATION_SYNC_OVERLAP_SECONDS)
+        revoked = revoked.where(RevokedToken.revoked_at >= since)
+        versions = versions.where(User.security_changed_at >= since)
+
+    added = 0
+    for jti, expires_at in db.execute(revoked):
+        added += revocation_list.add(jti, expires_at.timestamp())
+    for user_id, version, changed_at in db.execute(versions):
+        added += revocation_list.set_security_version(str(user_id), version, (changed_at + lifetime).timestamp())
+    db.rollback()
+
+    revocation_list.synced_at = started_at
+    revocation_list.prune()
+    return added
+
+def purge_expired_revocations(db: Session) -> int:
+    """Delete revocations of tokens that have expired anyway. Returns the number of rows removed."""
+    result = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,151 @@
+from sqlalchemy import Date, DateTime, Float, Integer, cast, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+import uuid
+
+from ..models.habit import Habit, HabitLog, HabitLogStatus
+from ..models.rollup import WeeklyRollup
+from ..models.workout import WorkoutSession, WorkoutType
+
+ROLLUP_COUNTERS = (
+    "workouts_completed", "gym_sessions", "home_sessions", "workout_volume", "workout_minutes",
+    "habits_completed", "habits_skipped"
+)
+
+def iso_week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+def as_utc(moment: datetime) -> datetime:
+    # Naive datetimes are stored as UTC by the session endpoints
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+def utc_date(moment: datetime) -> date:
+    return as_utc(moment).date()
+
+def bump_weekly_rollup(
+    db: Session,
+    user_id: uuid.UUID,
+    day: date,
+    workouts_completed: int = 0,
+    gym_sessions: int = 0,
+    home_sessions: int = 0,
+    workout_volume: float = 0,
+    workout_minutes: int = 0,
+    habits_completed: int = 0,
+    habits_skipped: int = 0
+) -> None:
+    """
+    Add deltas to the user's rollup for the ISO week containing `day`.
+
+    A single upsert, so concurrent writers never lose increments. Runs in the
+    caller's transaction and is committed together with the row it counts.
+    """
+    stmt = pg_insert(WeeklyRollup).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        week_start=iso_week_start(day),
+        workouts_completed=workouts_completed,
+        gym_sessions=gym_sessions,
+        home_sessions=home_sessions,
+        workout_volume=workout_volume,
+        workout_minutes=workout_minutes,
+        habits_completed=habits_completed,
+        habits_skipped=habits_skipped
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_weekly_rollups_user_week",
+        set_={
+            counter: getattr(WeeklyRollup, counter) + getattr(stmt.excluded, counter)
+            for counter in ROLLUP_COUNTERS
+        } | {"updated_at": func.now()}
+    )
+    db.execute(stmt)
+
+def get_weekly_rollup(db: Session, user_id: uuid.UUID, day: date) -> dict:
+    rollup = db.query(WeeklyRollup).filter(
+        WeeklyRollup.user_id == user_id,
+        WeeklyRollup.week_start == iso_week_start(day)
+    ).first()
+    
+    return {
+        "week_start": iso_week_start(day),
+        **{counter: getattr(rollup, counter) if rollup else 0 for counter in ROLLUP_COUNTERS}
+    }
+
+def get_recent_weekly_rollups(db: Session, user_id: uuid.UUID, day: date, weeks: int = 2) -> List[dict]:
+    """Rollups for the ISO week containing `day` and the `weeks - 1` before it, newest first, in one query."""
+    week_starts = [iso_week_start(day) - timedelta(weeks=offset) for offset in range(weeks)]
+    rows = {
+        rollup.week_start: rollup
+        for rollup in db.query(WeeklyRollup).filter(
+            WeeklyRollup.user_id == user_id,
+            WeeklyRollup.week_start.in_(week_starts)
+        )
+    }
+    
+    return [
+        {
+            "week_start": week_start,
+            **{counter: getattr(rows[week_start], counter) if week_start in rows else 0 for counter in ROLLUP_COUNTERS}
+        }
+        for week_start in week_starts
+    ]
+
+def rebuild_weekly_rollups(db: Session, user_id: Optional[uuid.UUID] = None) -> int:
+    """
+    Recompute rollups from workout_sessions and habit_logs, for one user or
+    everyone. Returns the number of rollup rows written.
+    """
+    workouts = select(
+        WorkoutSession.user_id.label("user_id"),
+        cast(func.date_trunc("week", func.timezone("UTC", WorkoutSession.start_time)), Date).label("week_start"),
+        literal(1, Integer).label("workouts_completed"),
+        cast(WorkoutSession.mode == WorkoutType.gym, Integer).label("gym_sessions"),
+        cast(WorkoutSession.mode == WorkoutType.home, Integer).label("home_sessions"),
+        func.coalesce(WorkoutSession.total_volume, 0).label("workout_volume"),
+        func.coalesce(WorkoutSession.duration_minutes, 0).label("workout_minutes"),
+        literal(0, Integer).label("habits_completed"),
+        literal(0, Integer).label("habits_skipped")
+    ).where(WorkoutSession.end_time.isnot(None))
+    
+    habits = select(
+        Habit.user_id,
+        cast(func.date_trunc("week", cast(HabitLog.date, DateTime)), Date),
+        literal(0, Integer),
+        literal(0, Integer),
+        literal(0, Integer),
+        literal(0, Float),
+        literal(0, Integer),
+        cast(HabitLog.status == HabitLogStatus.done, Integer),
+        cast(HabitLog.status == HabitLogStatus.skipped, Integer)
+    ).join(Habit, Habit.id == HabitLog.habit_id).where(
+        HabitLog.status.in_([HabitLogStatus.done, HabitLogStatus.skipped])
+    )
+    
+    delete_query = db.query(WeeklyRollup)
+    if user_id is not None:
+        workouts = workouts.where(WorkoutSession.user_id == user_id)
+        habits = habits.where(Habit.user_id == user_id)
+        delete_query = delete_query.filter(WeeklyRollup.user_id == user_id)
+    
+    events = union_all(workouts, habits).subquery("events")
+    totals = select(
+        func.gen_random_uuid(),
+        events.c.user_id,
+        events.c.week_start,
+        *[func.sum(events.c[counter]) for counter in ROLLUP_COUNTERS]
+    ).group_by(events.c.user_id, events.c.week_start)
+    
+    delete_query.delete(synchronize_session=False)
+    result = db.execute(
+        pg_insert(WeeklyRollup).from_select(
+            ["id", "user_id", "week_start", *ROLLUP_COUNTERS],
+            totals
+        )
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,203 @@
+from sqlalchemy import delete, func, insert, or_, select, text, tuple_
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import base64
+import binascii
+import orjson
+import uuid
+
+from ..core.config import settings
+from ..models.habit import Habit, HabitLog
+from ..models.progress import ProgressSnapshot
+from ..models.share import SharePermissions
+from ..models.sync import SyncTombstone
+from ..models.workout import WorkoutSession, WorkoutTemplate
+
+SYNC_ENTITIES = (
+    "habits", "habit_logs", "workout_templates", "workout_sessions", "progress_snapshots", "share_permissions"
+)
+
+class SyncCursorError(ValueError):
+    """The cursor is malformed, or too old for its deletes to still be known."""
+
+class SyncCursorExpired(SyncCursorError):
+    pass
+
+def _habits(user_id: uuid.UUID):
+    return select(Habit.__table__), Habit, Habit.user_id == user_id
+
+def _habit_logs(user_id: uuid.UUID):
+    user_habits = select(Habit.id).where(Habit.user_id == user_id)
+    return select(HabitLog.__table__), HabitLog, HabitLog.habit_id.in_(user_habits)
+
+def _workout_templates(user_id: uuid.UUID):
+    # System templates (no owner) are visible to everyone
+    return select(WorkoutTemplate.__table__), WorkoutTemplate, or_(
+        WorkoutTemplate.owner_user_id == user_id,
+        WorkoutTemplate.owner_user_id.is_(None)
+    )
+
+def _workout_sessions(user_id: uuid.UUID):
+    return select(WorkoutSession.__table__), WorkoutSession, WorkoutSession.user_id == user_id
+
+def _progress_snapshots(user_id: uuid.UUID):
+    return select(ProgressSnapshot.__table__), ProgressSnapshot, ProgressSnapshot.user_id == user_id
+
+def _share_permissions(user_id: uuid.UUID):
+    return select(SharePermissions.__table__), SharePermissions, or_(
+        SharePermissions.owner_user_id == user_id,
+        SharePermissions.viewer_user_id == user_id
+    )
+
+def _tombstones(user_id: uuid.UUID):
+    query = select(
+        SyncTombstone.id,
+        SyncTombstone.entity,
+        SyncTombstone.entity_id,
+        SyncTombstone.deleted_at.label("updated_at")
+    )
+    return query, SyncTombstone, SyncTombstone.user_id == user_id
+
+# Page order; "deleted" comes last so a delete is never followed by a stale upsert of the same row
+SYNC_SECTIONS: List[Tuple[str, Callable[[uuid.UUID], Any]]] = [
+    ("habits", _habits),
+    ("habit_logs", _habit_logs),
+    ("workout_templates", _workout_templates),
+    ("workout_sessions", _workout_sessions),
+    ("progress_snapshots", _progress_snapshots),
+    ("share_permissions", _share_permissions),
+    ("deleted", _tombstones),
+]
+
+def _changed_at(model):
+    return model.deleted_at if model is SyncTombstone else model.updated_at
+
+def encode_cursor(position: dict) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(position)).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        position = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {
+            "since": datetime.fromisoformat(position["since"]) if position["since"] else None,
+            "until": datetime.fromisoformat(position["until"]) if position["until"] else None,
+            "section": int(position["section"]),
+            "after": (datetime.fromisoformat(position["after"][0]), uuid.UUID(position["after"][1]))
+            if position["after"] else None
+        }
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, IndexError, TypeError, ValueError):
+        raise SyncCursorError("Invalid sync cursor")
+
+def _position(since: Optional[datetime], until: Optional[datetime], section: int, after=None) -> str:
+    return encode_cursor({
+        "since": since.isoformat() if since else None,
+        "until": until.isoformat() if until else None,
+        "section": section,
+        "after": [after[0].isoformat(), str(after[1])] if after else None
+    })
+
+# Transactions other than ours that are open right now. updated_at is the writing
+# transaction's start time, so any of them may still commit rows stamped that early.
+# Needs to see other sessions' xact_start: same database role, or pg_read_all_stats.
+OLDEST_OPEN_TRANSACTION = text(
+    """
+    SELECT min(xact_start) FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid() AND xact_start IS NOT NULL
+    """
+)
+
+def _pass_upper_bound(db: Session, now: datetime) -> datetime:
+    until = now - timedelta(seconds=settings.SYNC_CURSOR_LAG_SECONDS)
+    oldest_open = db.execute(OLDEST_OPEN_TRANSACTION).scalar()
+    if oldest_open is not None:
+        until = min(until, oldest_open - timedelta(microseconds=1))
+    return until
+
+def get_changes(db: Session, user_id: uuid.UUID, cursor: Optional[str] = None, limit: Optional[int] = None) -> dict:
+    """
+    One page of everything the user's clients need to catch up since `cursor`
+    (everything, when no cursor is given), across all synced entities.
+
+    A sync pass is pinned to an upper bound just before the start of the
+    oldest transaction still open (and at least SYNC_CURSOR_LAG_SECONDS in
+    the past): updated_at is stamped with the writing transaction's start
+    time, so a long transaction can commit rows older than newer, already
+    committed ones. Those rows are picked up by a later pass instead of
+    being skipped. A long-running transaction therefore holds sync back
+    until it ends. Rows may occasionally be sent twice; clients apply them
+    as upserts.
+    """
+    limit = limit or settings.SYNC_PAGE_SIZE
+    position = decode_cursor(cursor) if cursor else {"since": None, "until": None, "section": 0, "after": None}
+
+    now = db.execute(select(func.now())).scalar()
+    since = position["since"]
+    if since is not None and since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        raise SyncCursorExpired("Sync cursor expired")
+    until = position["until"] or _pass_upper_bound(db, now)
+
+    page: Dict[str, List[dict]] = {name: [] for name, _ in SYNC_SECTIONS}
+    remaining = limit
+    after = position["after"]
+    for index in range(position["section"], len(SYNC_SECTIONS)):
+        name, build_query = SYNC_SECTIONS[index]
+        query, model, condition = build_query(user_id)
+        changed_at = _changed_at(model)
+
+        query = query.where(condition, changed_at <= until)
+        if since is not None:
+            query = query.where(changed_at > since)
+        if after is not None:
+            query = query.where(tuple_(changed_at, model.id) > tuple_(*after))
+        rows = [
+            dict(row) for row in
+            db.execute(query.order_by(changed_at, model.id).limit(remaining + 1)).mappings()
+        ]
+
+        if len(rows) > remaining:
+            page[name] = rows[:remaining]
+            last = page[name][-1] if page[name] else None
+            resume = (last["updated_at"], last["id"]) if last else after
+            return {
+                "changes": {entity: page[entity] for entity in SYNC_ENTITIES},
+                "deleted": _deleted(page["deleted"]),
+                "next_cursor": _position(since, until, index, resume),
+                "has_more": True
+            }
+
+        page[name] = rows
+        remaining -= len(rows)
+        after = None
+
+    return {
+        "changes": {entity: page[entity] for entity in SYNC_ENTITIES},
+        "deleted": _deleted(page["deleted"]),
+        "next_cursor": _position(until, None, 0),
+        "has_more": False
+    }
+
+def _deleted(rows: List[dict]) -> List[dict]:
+    return [
+        {"entity": row["entity"], "id": row["entity_id"], "deleted_at": row["updated_at"]}
+        for row in rows
+    ]
+
+def record_tombstones(db: Session, user_id: uuid.UUID, entity: str, entity_ids: Iterable[uuid.UUID]) -> None:
+    """Note deleted rows for the user's next sync, in the caller's transaction."""
+    if entity not in SYNC_ENTITIES:
+        raise ValueError(f"Unknown sync entity: {entity}")
+
+    rows = [
+        {"id": uuid.uuid4(), "user_id": user_id, "entity": entity, "entity_id": entity_id}
+        for entity_id in entity_ids
+    ]
+    if rows:
+        db.execute(insert(SyncTombstone).values(rows))
+
+def purge_expired_tombstones(db: Session) -> int:
+    """Delete tombstones older than any cursor get_changes still accepts. Returns the number of rows removed."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = db.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,36 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+import uuid
+
+from ..models.version import CollectionVersion
+
+# "habits" covers habit logs too, since GET /habits embeds today's log status
+VERSIONED_COLLECTIONS = ("habits", "workout_templates", "workout_sessions", "progress_snapshots")
+
+def bump_collection_version(db: Session, user_id: uuid.UUID, collection: str) -> None:
+    """
+    Mark one of the user's collections as changed. A single upsert in the
+    caller's transaction, so the new version commits with the write.
+    """
+    if collection not in VERSIONED_COLLECTIONS:
+        raise ValueError(f"Unknown collection: {collection}")
+    
+    stmt = pg_insert(CollectionVersion).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        collection=collection,
+        version=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_collection_versions_user_collection",
+        set_={"version": CollectionVersion.version + 1, "updated_at": func.now()}
+    )
+    db.execute(stmt)
+
+def get_collection_version(db: Session, user_id: uuid.UUID, collection: str) -> int:
+    version = db.query(CollectionVersion.version).filter(
+        CollectionVersion.user_id == user_id,
+        CollectionVersion.collection == collection
+    ).scalar()
+    return version or 0
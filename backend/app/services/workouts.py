@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import List, Optional
+
+def compute_session_metrics(
+    exercises_performed: Optional[List[dict]],
+    start_time: datetime,
+    end_time: Optional[datetime]
+) -> Optional[dict]:
+    """Basic metrics for a completed session, or None if it has no end time or exercises."""
+    if not end_time or not exercises_performed:
+        return None
+    
+    total_volume = 0
+    for exercise in exercises_performed:
+        if 'sets' in exercise and 'reps' in exercise and 'weight_kg' in exercise:
+            total_volume += exercise['sets'] * exercise['reps'] * exercise.get('weight_kg', 0)
+    
+    return {
+        "total_volume": total_volume,
+        "duration_minutes": int((end_time - start_time).total_seconds() / 60)
+    }
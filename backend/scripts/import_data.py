@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Bulk-import progress snapshots or workout sessions for one user.
+
+The file is read line by line and loaded in chunks, so large exports can be
+imported without holding them in memory.
+
+Usage:
+    python scripts/import_data.py --email alex@example.com --kind progress --file progress.csv
+    python scripts/import_data.py --user <uuid> --kind workouts --file sessions.ndjson
+"""
+
+import argparse
+import sys
+import uuid
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.importer import IMPORT_FORMATS, IMPORT_KINDS, ImportJob, RecordParser, run_import
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import progress or workout history")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--email", help="Import for the user with this email")
+    target.add_argument("--user", type=uuid.UUID, help="Import for the user with this id")
+    parser.add_argument("--kind", choices=IMPORT_KINDS, required=True)
+    parser.add_argument("--file", type=Path, required=True, help="CSV or NDJSON file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="Defaults from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+    
+    fmt = args.format or ("csv" if args.file.suffix.lower() == ".csv" else "ndjson")
+    
+    db = SessionLocal()
+    try:
+        query = db.query(User)
+        user = query.filter(User.email == args.email).first() if args.email else query.filter(User.id == args.user).first()
+        if not user:
+            print("❌ User not found")
+            sys.exit(1)
+        
+        job = ImportJob(db, user.id, args.kind, chunk_size=args.chunk_size)
+        with args.file.open(encoding="utf-8-sig", newline="") as source:
+            for event in run_import(job, RecordParser(fmt), (line.rstrip("\r\n") for line in source)):
+                if event["event"] == "error":
+                    print(f"⚠️  Line {event['line']}: {event['error']}")
+                elif event["event"] == "progress":
+                    print(f"📦 {event['rows_imported']} imported, {event['rows_read']} read")
+                else:
+                    print(
+                        f"✅ Imported {event['rows_imported']} {args.kind} rows for {user.email} "
+                        f"({event['rows_skipped']} skipped, {event['rows_failed']} failed)"
+                    )
+    except Exception as e:
+        print(f"❌ Error importing data: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Mint a token for the X-Profile header, which profiles the request it is sent with.
+
+Usage:
+    python scripts/profile_token.py               # valid for 1 hour
+    python scripts/profile_token.py --minutes 10
+"""
+
+import argparse
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.profiling import create_profile_token
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a signed X-Profile token")
+    parser.add_argument("--minutes", type=int, default=60, help="How long the token stays valid")
+    args = parser.parse_args()
+    
+    print(create_profile_token(timedelta(minutes=args.minutes)))
+
+if __name__ == "__main__":
+    main()
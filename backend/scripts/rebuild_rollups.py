@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Rebuild weekly rollups from workout sessions and habit logs.
+
+Usage:
+    python scripts/rebuild_rollups.py                 # every user
+    python scripts/rebuild_rollups.py --user <uuid>   # one user
+"""
+
+import argparse
+import sys
+import uuid
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.database import SessionLocal
+from app.services.rollups import rebuild_weekly_rollups
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild weekly rollup counters")
+    parser.add_argument("--user", type=uuid.UUID, default=None, help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        written = rebuild_weekly_rollups(db, user_id=args.user)
+        scope = f"user {args.user}" if args.user else "all users"
+        print(f"✅ Rebuilt {written} weekly rollup rows for {scope}")
+    except Exception as e:
+        print(f"❌ Error rebuilding rollups: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ from app.models.workout import WorkoutTemplate, WorkoutSession, WorkoutType
 from app.models.habit import Habit, HabitLog, HabitCadence, HabitLogStatus
 from app.models.progress import ProgressSnapshot
 from app.models.share import SharePermissions
+from app.services.rollups import rebuild_weekly_rollups
 
 def create_sample_users(db: Session):
     """Create sample users"""
@@ -347,6 +348,9 @@ def seed_database():
         create_sample_data(db, users, couple_id)
         create_share_permissions(db, users)
         
+        # Seeded sessions and logs bypass the routers, so derive their rollups
+        rebuild_weekly_rollups(db)
+        
         print("✅ Database seeding completed successfully!")
         print("\nSample accounts created:")
         for user in users:
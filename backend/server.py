@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from dotenv import load_dotenv
 import os
 from pathlib import Path
@@ -10,6 +11,16 @@ load_dotenv(ROOT_DIR / '.env')
 
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.health import database_probe
+from app.core.metrics import instrument_engine, mark_worker_stopped, render_metrics
+from app.core.tasks import start_periodic_job, stop_periodic_jobs
+from app.middleware import (
+    CompressionMiddleware, MetricsMiddleware, ProfilingMiddleware, RateLimitMiddleware, ServerTimingMiddleware
+)
+from app.services.accounts import purge_deleted_accounts
+from app.services.invites import purge_expired_invites
+from app.services.revocation import purge_expired_revocations, sync_revoked_tokens
+from app.services.sync import purge_expired_tombstones
 
 # Import all models to ensure they're registered with SQLAlchemy
 from app.models import *
@@ -22,9 +33,13 @@ from app.routers.workouts import workout_router
 from app.routers.habits import router as habits_router
 from app.routers.progress import router as progress_router
 from app.routers.share import router as share_router
+from app.routers.imports import router as imports_router
+from app.routers.sync import router as sync_router
+from app.routers.health import router as health_router
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+instrument_engine(engine)
 
 # Create FastAPI application
 app = FastAPI(
@@ -32,8 +47,12 @@ app = FastAPI(
     description="CouplesWorkout API - A fitness tracking app for couples",
     version="1.0.0",
     debug=settings.DEBUG,
+    default_response_class=ORJSONResponse,
 )
 
+# Reject over-quota clients before routing; added first so CORS headers still wrap the 429s
+app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -43,6 +62,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON and NDJSON bodies for mobile clients
+app.add_middleware(CompressionMiddleware)
+
+# Per-phase timings for a sample of requests
+app.add_middleware(ServerTimingMiddleware)
+
+# Opt-in statistical profiles (signed X-Profile header or PROFILER_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so latency covers the other middleware too
+app.add_middleware(MetricsMiddleware)
+
+# Background maintenance jobs
+@app.on_event("startup")
+async def start_background_jobs():
+    start_periodic_job(
+        "database_probe",
+        database_probe.refresh,
+        settings.HEALTH_PROBE_INTERVAL_SECONDS
+    )
+    start_periodic_job(
+        "sync_revoked_tokens",
+        sync_revoked_tokens,
+        settings.REVOCATION_SYNC_INTERVAL_SECONDS
+    )
+    start_periodic_job(
+        "purge_expired_revocations",
+        purge_expired_revocations,
+        settings.REVOCATION_PURGE_INTERVAL_SECONDS
+    )
+    start_periodic_job(
+        "purge_expired_invites",
+        purge_expired_invites,
+        settings.COUPLE_INVITE_PURGE_INTERVAL_SECONDS
+    )
+    start_periodic_job(
+        "purge_deleted_accounts",
+        purge_deleted_accounts,
+        settings.ACCOUNT_PURGE_INTERVAL_SECONDS
+    )
+    start_periodic_job(
+        "purge_expired_tombstones",
+        purge_expired_tombstones,
+        settings.SYNC_TOMBSTONE_PURGE_INTERVAL_SECONDS
+    )
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await stop_periodic_jobs()
+    mark_worker_stopped()
+
 # Include routers with /api prefix
 app.include_router(auth_router, prefix="/api")
 app.include_router(users_router, prefix="/api") 
@@ -51,16 +121,15 @@ app.include_router(workout_router, prefix="/api")
 app.include_router(habits_router, prefix="/api")
 app.include_router(progress_router, prefix="/api")
 app.include_router(share_router, prefix="/api")
+app.include_router(imports_router, prefix="/api")
+app.include_router(sync_router, prefix="/api")
+app.include_router(health_router, prefix="/api")
 
-# Health check endpoint
-@app.get("/api/health")
-async def health_check():
-    return {
-        "status": "healthy", 
-        "app": settings.APP_NAME,
-        "version": "1.0.0",
-        "database": "connected"
-    }
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
 
 @app.get("/api/")
 async def root():
@@ -68,7 +137,7 @@ async def root():
         "message": "CouplesWorkout API", 
         "version": "1.0.0",
         "docs": "/docs",
-        "health": "/api/health"
+        "health": "/api/health/ready"
     }
 
 if __name__ == "__main__":
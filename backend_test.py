@@ -7,6 +7,7 @@ Tests all implemented endpoints with realistic data scenarios
 import requests
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 from typing import Dict, Any, Optional
 
@@ -251,6 +252,82 @@ class CouplesWorkoutAPITester:
             
         return success
         
+    def test_couple_invite_concurrency(self) -> bool:
+        """Test that parallel invite accepts never put three members in one couple"""
+        self.log("Testing concurrent couple invite acceptance...")
+        
+        success = True
+        
+        try:
+            # Register an owner and several would-be partners
+            tokens = []
+            for i in range(4):
+                new_user = {
+                    "email": f"invite_race_{uuid.uuid4().hex[:12]}@example.com",
+                    "password": "testpass123",
+                    "display_name": f"Invite Race {i}"
+                }
+                response = self.make_request("POST", "/auth/register", json=new_user)
+                if response.status_code != 200:
+                    self.log(f"❌ Registration for invite race failed: {response.status_code}", "ERROR")
+                    return False
+                tokens.append(response.json()["access_token"])
+                
+            owner_token, joiner_tokens = tokens[0], tokens[1:]
+            
+            response = self.make_request("POST", "/couples/", token=owner_token)
+            if response.status_code != 200:
+                self.log(f"❌ Couple creation failed: {response.status_code} - {response.text}", "ERROR")
+                return False
+            couple_id = response.json()["id"]
+            
+            # An unknown code must be rejected
+            response = self.make_request("POST", f"/couples/{couple_id}/accept",
+                                       token=joiner_tokens[0],
+                                       params={"code": "ZZZZZZZZ"})
+            if response.status_code == 400:
+                self.log("✅ Unknown invite code rejected")
+            else:
+                self.log(f"❌ Unknown invite code accepted: {response.status_code}", "ERROR")
+                success = False
+                
+            response = self.make_request("POST", f"/couples/{couple_id}/invite", token=owner_token)
+            if response.status_code != 200:
+                self.log(f"❌ Invite generation failed: {response.status_code} - {response.text}", "ERROR")
+                return False
+            code = response.json()["invite_code"]
+            
+            # Fire all accepts at once with the same code
+            def accept(token: str) -> int:
+                return requests.post(
+                    f"{BASE_URL}/couples/{couple_id}/accept",
+                    params={"code": code},
+                    headers={"Authorization": f"Bearer {token}"},
+                    timeout=TIMEOUT
+                ).status_code
+                
+            with ThreadPoolExecutor(max_workers=len(joiner_tokens)) as pool:
+                statuses = list(pool.map(accept, joiner_tokens))
+                
+            if statuses.count(200) == 1:
+                self.log(f"✅ Exactly one parallel accept succeeded: {statuses}")
+            else:
+                self.log(f"❌ Expected exactly one successful accept, got {statuses}", "ERROR")
+                success = False
+                
+            response = self.make_request("GET", f"/couples/{couple_id}/members", token=owner_token)
+            if response.status_code == 200 and len(response.json()) == 2:
+                self.log("✅ Couple has exactly two members")
+            else:
+                self.log(f"❌ Unexpected couple members: {response.status_code} - {response.text}", "ERROR")
+                success = False
+                
+        except Exception as e:
+            self.log(f"❌ Couple invite concurrency exception: {e}", "ERROR")
+            success = False
+            
+        return success
+        
     def test_workout_system(self) -> bool:
         """Test workout templates and sessions"""
         self.log("Testing workout system...")
@@ -710,6 +787,7 @@ class CouplesWorkoutAPITester:
             ("Authentication", self.test_authentication),
             ("User Management", self.test_user_management),
             ("Couple Management", self.test_couple_management),
+            ("Couple Invite Concurrency", self.test_couple_invite_concurrency),
             ("Workout System", self.test_workout_system),
             ("Habit Tracking", self.test_habit_tracking),
             ("Progress Tracking", self.test_progress_tracking),
@@ -10,6 +10,8 @@ const REFRESH_TOKEN_KEY = 'refresh_token';
 
 class ApiService {
   private baseUrl: string;
+  // Refresh tokens work once, so concurrent 401s must share a single refresh
+  private refreshInFlight: Promise<boolean> | null = null;
 
   constructor() {
     this.baseUrl = `${API_BASE_URL}/api`;
@@ -77,7 +79,10 @@ class ApiService {
 
     // Handle 401 - attempt token refresh
     if (response.status === 401 && !skipAuth && !url.includes('/auth/')) {
-      const refreshed = await this.refreshAccessToken();
+      // Another request may have refreshed while this one was in flight
+      const storedAccessToken = await this.getAccessToken();
+      const refreshed = (storedAccessToken !== null && storedAccessToken !== accessToken)
+        || await this.refreshAccessToken();
       if (refreshed) {
         // Retry the original request with new token
         const newAccessToken = await this.getAccessToken();
@@ -117,7 +122,16 @@ class ApiService {
     return response.json();
   }
 
-  private async refreshAccessToken(): Promise<boolean> {
+  private refreshAccessToken(): Promise<boolean> {
+    if (!this.refreshInFlight) {
+      this.refreshInFlight = this.performTokenRefresh().finally(() => {
+        this.refreshInFlight = null;
+      });
+    }
+    return this.refreshInFlight;
+  }
+
+  private async performTokenRefresh(): Promise<boolean> {
     try {
       const refreshToken = await this.getRefreshToken();
       if (!refreshToken) {
@@ -161,7 +175,12 @@ class ApiService {
   }
 
   async logout(): Promise<void> {
-    await this.request('/auth/logout', { method: 'POST' });
+    // Revoke the refresh token too, so it can't mint new access tokens
+    const refreshToken = await this.getRefreshToken();
+    await this.request('/auth/logout', {
+      method: 'POST',
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
     await this.clearTokens();
   }
 
@@ -173,7 +192,7 @@ class ApiService {
     return this.request<HealthResponse>('/health', {}, true);
   }
 
-  // Apple Sign In - placeholder for now
+  // Apple Sign In
   async signInWithApple(identityToken: string, authorizationCode: string): Promise<LoginResponse> {
     return this.request<LoginResponse>('/auth/apple', {
       method: 'POST',
@@ -0,0 +1,78 @@
+"""
+Account deletion deactivates the user at once; the purge job then removes
+their rows in bounded batches and leaves the partner's data intact.
+"""
+
+from datetime import date, datetime, timedelta
+
+from app.models.couple import Couple, CoupleMember, CoupleRole
+from app.models.habit import Habit, HabitLog, HabitLogStatus
+from app.models.progress import ProgressSnapshot
+from app.models.share import SharePermissions
+from app.models.user import User
+from app.models.workout import WorkoutSession, WorkoutTemplate, WorkoutType
+from app.services.accounts import purge_account, purge_deleted_accounts
+from app.services.versions import get_collection_version
+
+from .conftest import auth_headers
+
+
+def test_delete_account_then_purge(client, db, make_user, make_couple, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "ACCOUNT_PURGE_BATCH_SIZE", 2)
+
+    alice, bob = make_user("alice"), make_user("bob")
+    alice_id, bob_id = alice.id, bob.id
+    couple = make_couple(alice, bob)
+    couple_id = couple.id
+
+    habit = Habit(user_id=alice_id, name="Water")
+    template = WorkoutTemplate(owner_user_id=alice_id, name="Legs", type=WorkoutType.gym, exercises=[])
+    db.add_all([habit, template])
+    db.flush()
+    for offset in range(5):
+        db.add(HabitLog(habit_id=habit.id, date=date.today() - timedelta(days=offset), status=HabitLogStatus.done))
+        db.add(ProgressSnapshot(user_id=alice_id, date=date.today() - timedelta(days=offset), metrics={"weight_kg": 70}))
+    db.add(WorkoutSession(user_id=alice_id, couple_id=couple_id, mode=WorkoutType.gym, start_time=datetime.utcnow()))
+    # Bob's session uses Alice's template; it survives with the reference cleared
+    db.add(WorkoutSession(user_id=bob_id, couple_id=couple_id, template_id=template.id,
+                          mode=WorkoutType.gym, start_time=datetime.utcnow()))
+    db.add(SharePermissions(owner_user_id=alice_id, viewer_user_id=bob_id, can_view_progress=True))
+    db.add(SharePermissions(owner_user_id=bob_id, viewer_user_id=alice_id, can_view_habits=True))
+    db.commit()
+
+    headers = auth_headers(alice)
+    assert client.delete("/api/me", headers=headers).status_code == 202
+    assert client.get("/api/me", headers=headers).status_code == 400
+
+    bob_sessions_version = get_collection_version(db, bob_id, "workout_sessions")
+    assert purge_deleted_accounts(db) > 0
+    db.expire_all()
+
+    assert db.query(User).filter(User.id == alice_id).first() is None
+    assert db.query(HabitLog).count() == 0
+    assert db.query(ProgressSnapshot).count() == 0
+    assert db.query(SharePermissions).count() == 0
+    assert db.query(WorkoutTemplate).count() == 0
+    remaining = db.query(WorkoutSession).one()
+    assert remaining.user_id == bob_id and remaining.template_id is None
+    # Bob's cached session list is invalidated by the cleared reference
+    assert get_collection_version(db, bob_id, "workout_sessions") > bob_sessions_version
+    membership = db.query(CoupleMember).one()
+    assert membership.user_id == bob_id and membership.role == CoupleRole.owner
+
+    # Nothing left to do on the next run
+    assert purge_deleted_accounts(db) == 0
+
+
+def test_purge_removes_empty_couple(db, make_user, make_couple):
+    alice, bob = make_user("alice"), make_user("bob")
+    alice_id, bob_id = alice.id, bob.id
+    make_couple(alice, bob)
+
+    purge_account(db, alice_id)
+    purge_account(db, bob_id)
+
+    assert db.query(CoupleMember).count() == 0
+    assert db.query(Couple).count() == 0
+    assert db.query(User).count() == 0
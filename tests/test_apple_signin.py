@@ -0,0 +1,176 @@
+"""
+Sign in with Apple verifies identity tokens against a cached JWKS, here a
+local fixture keyset, refetching only on expiry or an unknown key id.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.config import settings
+from app.core.jwks import FileKeySource, JWKSCache, JWKSError
+from app.models.user import User
+
+from .conftest import auth_headers
+
+CLIENT_ID = "com.example.couplesworkout"
+
+
+def make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {**public, "kid": kid, "use": "sig"}
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return {kid: make_key(kid) for kid in ("key-1", "key-2")}
+
+
+@pytest.fixture
+def keyset(keys, tmp_path, monkeypatch):
+    """Apple's keys served from a local file; write() swaps in another set."""
+    path = tmp_path / "apple_jwks.json"
+
+    def write(*kids):
+        path.write_text(json.dumps({"keys": [keys[kid][1] for kid in kids]}))
+
+    write("key-1")
+    write.now = [0.0]
+    cache = JWKSCache(
+        "apple_jwks", FileKeySource(str(path)), ttl_seconds=3600, min_refresh_seconds=60, clock=lambda: write.now[0]
+    )
+    monkeypatch.setattr("app.services.apple.apple_jwks", cache)
+    monkeypatch.setattr(settings, "APPLE_CLIENT_ID", CLIENT_ID)
+    write.cache = cache
+    return write
+
+
+def identity_token(keys, kid="key-1", **claims):
+    now = int(time.time())
+    payload = {
+        "iss": "https://appleid.apple.com",
+        "aud": CLIENT_ID,
+        "iat": now,
+        "exp": now + 600,
+        "sub": "001234.apple-user",
+        "email": "alice@privaterelay.appleid.com",
+        "email_verified": "true",
+        **claims,
+    }
+    return jwt.encode(payload, keys[kid][0], algorithm="RS256", headers={"kid": kid})
+
+
+def test_sign_in_creates_then_reuses_account(client, db, keys, keyset):
+    response = client.post("/api/auth/apple", json={"identity_token": identity_token(keys), "display_name": "Alice"})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/me", headers=headers).json()["display_name"] == "Alice"
+
+    assert client.post("/api/auth/apple", json={"identity_token": identity_token(keys)}).status_code == 200
+    assert db.query(User).filter(User.apple_sub == "001234.apple-user").count() == 1
+    assert keyset.cache.fetches == 1
+
+    # The account has no password to log in with
+    credentials = {"email": "alice@privaterelay.appleid.com", "password": "password123"}
+    assert client.post("/api/auth/login", json=credentials).status_code == 401
+
+
+def test_existing_email_is_only_linked_from_its_session(client, db, keys, keyset, make_user):
+    # Anyone can register an email, so signing in with Apple must not take the account over
+    alice = make_user("alice")
+    token = identity_token(keys, email="alice@example.com", email_verified=True)
+    assert client.post("/api/auth/apple", json={"identity_token": token}).status_code == 409
+    db.refresh(alice)
+    assert alice.apple_sub is None
+
+    # Signed in with the password, the owner links it explicitly
+    tokens = client.post("/api/auth/login", json={"email": "alice@example.com", "password": "password123"}).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post("/api/auth/apple/link", headers=headers, json={"identity_token": token}).status_code == 200
+    db.refresh(alice)
+    assert alice.apple_sub == "001234.apple-user"
+    assert client.post("/api/auth/apple", json={"identity_token": token}).status_code == 200
+
+    # The Apple ID can't be attached to a second account
+    bob_headers = auth_headers(make_user("bob"))
+    assert client.post("/api/auth/apple/link", headers=bob_headers, json={"identity_token": token}).status_code == 409
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "com.example.other"},
+    {"iss": "https://example.com"},
+    {"exp": int(time.time()) - 60},
+])
+def test_invalid_tokens_are_rejected(client, keys, keyset, claims):
+    response = client.post("/api/auth/apple", json={"identity_token": identity_token(keys, **claims)})
+    assert response.status_code == 401
+
+
+def test_unconfigured_sign_in(client, keys, keyset, monkeypatch):
+    monkeypatch.setattr(settings, "APPLE_CLIENT_ID", "")
+    assert client.post("/api/auth/apple", json={"identity_token": identity_token(keys)}).status_code == 501
+
+
+def test_key_rotation_refetches_once(client, keys, keyset):
+    assert client.post("/api/auth/apple", json={"identity_token": identity_token(keys)}).status_code == 200
+
+    # Apple rotates in key-2: the unknown kid triggers one refetch
+    keyset("key-1", "key-2")
+    keyset.now[0] = 61.0
+    assert client.post("/api/auth/apple", json={"identity_token": identity_token(keys, "key-2")}).status_code == 200
+    assert keyset.cache.fetches == 2
+
+    # Made-up kids can't force more fetches within min_refresh_seconds
+    with pytest.raises(JWKSError):
+        keyset.cache.get_key("made-up")
+    assert keyset.cache.fetches == 2
+
+
+def test_cache_expiry_and_single_flight():
+    now = [0.0]
+    fetches = []
+    fetching = threading.Event()
+
+    def slow_source():
+        fetches.append(now[0])
+        fetching.set()
+        time.sleep(0.2)
+        return {"keys": [{"kid": "key-1", "kty": "RSA"}]}
+
+    cache = JWKSCache("test_jwks", slow_source, ttl_seconds=100, min_refresh_seconds=10, clock=lambda: now[0])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: cache.get_key("key-1"), range(8)))
+    assert len(fetches) == 1
+    assert all(result["kid"] == "key-1" for result in results)
+
+    now[0] = 50.0
+    cache.get_key("key-1")
+    assert len(fetches) == 1
+    now[0] = 101.0
+    cache.get_key("key-1")
+    assert len(fetches) == 2
+
+
+def test_failed_refresh_keeps_serving_cached_keys():
+    now = [0.0]
+    responses = [{"keys": [{"kid": "key-1", "kty": "RSA"}]}]
+
+    def flaky_source():
+        if not responses:
+            raise OSError("network down")
+        return responses.pop()
+
+    cache = JWKSCache("test_jwks", flaky_source, ttl_seconds=100, min_refresh_seconds=10, clock=lambda: now[0])
+    assert cache.get_key("key-1")
+    now[0] = 200.0
+    assert cache.get_key("key-1")["kid"] == "key-1"
@@ -0,0 +1,108 @@
+"""
+CompressionMiddleware negotiates brotli/gzip, leaves small or non-allowlisted
+bodies alone and compresses streaming responses chunk by chunk.
+"""
+
+import gzip
+import zlib
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import CompressionMiddleware, compression_stats
+from app.middleware.compression import negotiate_encoding
+
+ROWS = [{"id": i, "exercises_performed": [{"name": "Squat", "sets": 5, "reps": 5}]} for i in range(200)]
+
+
+def build_client() -> TestClient:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    async def big():
+        return ORJSONResponse(ROWS, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    @app.get("/archive")
+    async def archive():
+        return Response(b"PK" * 1000, media_type="application/zip")
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(50):
+                yield f'{{"event": "progress", "rows": {i}}}\n'.encode()
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+def test_negotiation():
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_large_json_is_compressed():
+    client = build_client()
+    before = compression_stats.snapshot().get("gzip", {}).get("responses", 0)
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == ROWS
+
+    stats = compression_stats.snapshot()["gzip"]
+    assert stats["responses"] == before + 1
+    assert stats["bytes_out"] < stats["bytes_in"]
+    assert stats["cpu_seconds"] >= 0
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == ROWS
+
+
+def test_small_and_binary_bodies_pass_through():
+    client = build_client()
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    response = client.get("/archive", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+    response = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == ROWS
+
+
+def test_streaming_is_compressed_incrementally():
+    client = build_client()
+    expected = b"".join(f'{{"event": "progress", "rows": {i}}}\n'.encode() for i in range(50))
+
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw) == expected
+
+    # Every chunk is sync-flushed, so a prefix of the stream decodes on its own
+    first_chunk = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(raw[:len(raw) // 2])
+    assert expected.startswith(first_chunk) and first_chunk
+
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "br"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert brotli.decompress(raw) == expected
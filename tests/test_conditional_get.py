@@ -0,0 +1,63 @@
+"""
+List endpoints send an ETag derived from a per-user collection version and
+answer If-None-Match with 304 before running their own queries.
+"""
+
+from datetime import date
+
+from .conftest import auth_headers
+
+# Auth dependency (user lookup) + the collection version lookup
+AUTH_AND_VERSION_QUERIES = 2
+
+
+def test_habits_etag_revalidation(client, make_user, query_counter):
+    alice = make_user("alice")
+    headers = auth_headers(alice)
+    habit_id = client.post("/api/habits/", headers=headers, params={"name": "Water"}).json()["id"]
+
+    first = client.get("/api/habits/", headers=headers)
+    etag = first.headers["etag"]
+    conditional = {**headers, "If-None-Match": etag}
+
+    with query_counter:
+        response = client.get("/api/habits/", headers=conditional)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert query_counter.count == AUTH_AND_VERSION_QUERIES
+
+    # Different query parameters are a different representation
+    assert client.get("/api/habits/", headers=conditional, params={"active_only": False}).status_code == 200
+
+    # Logging today's habit changes GET /habits (today_status) and the logs list
+    client.post(f"/api/habits/{habit_id}/logs", headers=headers,
+                params={"log_date": date.today().isoformat(), "status": "done"})
+    response = client.get("/api/habits/", headers=conditional)
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()[0]["today_status"] == "done"
+
+
+def test_collections_are_versioned_independently(client, make_user):
+    bob = make_user("bob")
+    headers = auth_headers(bob)
+
+    etags = {
+        url: client.get(url, headers=headers).headers["etag"]
+        for url in ("/api/workout-templates/", "/api/workout-sessions/", "/api/progress/snapshots")
+    }
+    client.post("/api/progress/snapshots", headers=headers,
+                params={"snapshot_date": date.today().isoformat()}, json={"weight_kg": 80})
+
+    for url, etag in etags.items():
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        expected = 200 if url == "/api/progress/snapshots" else 304
+        assert response.status_code == expected, url
+
+
+def test_etags_differ_between_users(client, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    alice_etag = client.get("/api/workout-sessions/", headers=auth_headers(alice)).headers["etag"]
+    response = client.get("/api/workout-sessions/", headers={**auth_headers(bob), "If-None-Match": alice_etag})
+    assert response.status_code == 200
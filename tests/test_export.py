@@ -0,0 +1,76 @@
+"""
+Account export streams every section of the user's data as NDJSON, either
+as one stream or as a ZIP with one file per section.
+"""
+
+import io
+import json
+import zipfile
+from datetime import date, datetime, timedelta
+
+from app.models.habit import Habit, HabitLog, HabitLogStatus
+from app.models.progress import ProgressSnapshot
+from app.models.share import SharePermissions
+from app.models.workout import WorkoutSession, WorkoutType
+
+from .conftest import auth_headers
+
+
+def _seed(db, user, partner):
+    habit = Habit(user_id=user.id, name="Water")
+    db.add(habit)
+    db.flush()
+    for offset in range(5):
+        db.add(HabitLog(habit_id=habit.id, date=date.today() - timedelta(days=offset), status=HabitLogStatus.done))
+    db.add(WorkoutSession(user_id=user.id, mode=WorkoutType.gym, start_time=datetime.utcnow(),
+                          exercises_performed=[{"name": "Squats", "sets": 3}]))
+    db.add(ProgressSnapshot(user_id=user.id, date=date.today(), metrics={"weight_kg": 70}))
+    db.add(SharePermissions(owner_user_id=user.id, viewer_user_id=partner.id, can_view_progress=True))
+    # The partner's own data is not part of this user's export
+    db.add(ProgressSnapshot(user_id=partner.id, date=date.today(), metrics={"weight_kg": 90}))
+    db.commit()
+
+
+def test_ndjson_export_covers_every_section(client, db, make_user, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+    alice, bob = make_user("alice"), make_user("bob")
+    _seed(db, alice, bob)
+
+    response = client.get("/api/me/export", headers=auth_headers(alice), params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    counts = {}
+    for line in lines:
+        counts[line["section"]] = counts.get(line["section"], 0) + 1
+    assert counts == {
+        "profile": 1, "habits": 1, "habit_logs": 5,
+        "workout_sessions": 1, "progress_snapshots": 1, "share_permissions": 1,
+    }
+    profile = lines[0]["record"]
+    assert profile["email"] == "alice@example.com"
+    assert "password_hash" not in profile
+
+
+def test_zip_export_has_one_file_per_section(client, db, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    _seed(db, alice, bob)
+
+    response = client.get("/api/me/export", headers=auth_headers(alice))
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [
+            "profile.ndjson", "habits.ndjson", "habit_logs.ndjson", "workout_templates.ndjson",
+            "workout_sessions.ndjson", "progress_snapshots.ndjson", "share_permissions.ndjson",
+        ]
+        logs = archive.read("habit_logs.ndjson").decode().splitlines()
+        assert len(logs) == 5
+        assert archive.read("workout_templates.ndjson") == b""
+        snapshot = json.loads(archive.read("progress_snapshots.ndjson"))
+        assert snapshot["metrics"] == {"weight_kg": 70}
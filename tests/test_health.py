@@ -0,0 +1,76 @@
+"""
+Liveness never touches the database; readiness serves the cached background
+probe and reports pool saturation and the migration version.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.health import DatabaseProbe
+
+
+@pytest.fixture
+def probe(monkeypatch):
+    probe = DatabaseProbe()
+    monkeypatch.setattr("app.core.health.database_probe", probe)
+    return probe
+
+
+def test_liveness_and_unprobed_readiness(client, probe, query_counter):
+    with query_counter:
+        assert client.get("/api/health/live").json() == {"status": "alive"}
+        response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
+    assert query_counter.count == 0
+
+
+def test_readiness_serves_cached_probe(client, db, engine, probe, query_counter, monkeypatch):
+    probe.refresh(db)
+    assert probe.alembic_version is None
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        conn.execute(text("INSERT INTO alembic_version VALUES ('0007_delta_sync')"))
+    try:
+        probe.refresh(db)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+
+    with query_counter:
+        response = client.get("/api/health/ready")
+    assert query_counter.count == 0
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["database"]["ok"] is True
+    assert body["checks"]["migration"]["version"] == "0007_delta_sync"
+    assert body["checks"]["pool"]["capacity"] == engine.pool.size() + engine.pool._max_overflow
+
+    legacy = client.get("/api/health").json()
+    assert legacy["status"] == "healthy" and legacy["database"] == "connected"
+
+    # A saturated pool drains the worker even though the database answers
+    monkeypatch.setattr(settings, "HEALTH_POOL_SATURATION_THRESHOLD", 0.0)
+    assert client.get("/api/health/ready").status_code == 503
+
+
+def test_failed_or_stale_probe_is_not_ready(client, db, probe, monkeypatch):
+    unreachable = create_engine("postgresql://nobody@/missing?host=/nonexistent")
+    session = sessionmaker(bind=unreachable)()
+    probe.refresh(session)
+    session.close()
+
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["database"]["error"] == "OperationalError"
+
+    probe.refresh(db)
+    assert client.get("/api/health/ready").status_code == 200
+    monkeypatch.setattr(settings, "HEALTH_PROBE_MAX_AGE_SECONDS", -1)
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["database"]["error"] == "probe result is stale"
@@ -0,0 +1,113 @@
+"""
+Bulk import streams CSV/NDJSON bodies into the database in chunks and
+reports row errors, progress and a summary as NDJSON.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from app.models.progress import ProgressSnapshot
+from app.models.rollup import WeeklyRollup
+from app.models.workout import WorkoutSession
+
+from .conftest import auth_headers
+
+
+def _events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_progress_csv_import(client, db, make_user):
+    alice = make_user("alice")
+    user_id = alice.id
+    headers = {**auth_headers(alice), "Content-Type": "text/csv"}
+    body = "\n".join([
+        "date,weight_kg,waist_cm",
+        "2024-01-01,80.5,90",
+        "2024-01-02,80.1,",
+        "not-a-date,79,88",
+        "2024-01-02,79.9,89",
+        "2024-01-03,79.5",
+    ])
+
+    response = client.post("/api/import/progress", headers=headers, content=body)
+    assert response.status_code == 200
+    events = _events(response)
+    errors = [e for e in events if e["event"] == "error"]
+    assert [e["line"] for e in errors] == [4, 6]
+    summary = events[-1]
+    assert summary["event"] == "summary"
+    assert summary["rows_read"] == 5
+    assert summary["rows_imported"] == 2
+    assert summary["rows_skipped"] == 1
+    assert summary["rows_failed"] == 2
+
+    snapshots = db.query(ProgressSnapshot).filter(ProgressSnapshot.user_id == user_id).order_by(ProgressSnapshot.date).all()
+    assert [s.weight_kg for s in snapshots] == [80.5, 79.9]
+    assert snapshots[1].waist_cm == 89
+    assert snapshots[0].metrics["workouts_completed_week"] == 0
+
+
+def test_progress_date_repeated_across_chunks_counts_once(client, db, make_user, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+
+    alice = make_user("alice")
+    user_id = alice.id
+    headers = {**auth_headers(alice), "Content-Type": "text/csv"}
+    body = "\n".join(["date,weight_kg", "2024-01-01,80", "2024-01-02,79", "2024-01-01,78"])
+
+    summary = _events(client.post("/api/import/progress", headers=headers, content=body))[-1]
+    assert summary["rows_imported"] == 2
+    assert summary["rows_skipped"] == 1
+    snapshots = db.query(ProgressSnapshot).filter(ProgressSnapshot.user_id == user_id).order_by(ProgressSnapshot.date).all()
+    assert [s.weight_kg for s in snapshots] == [78, 79]
+
+
+def test_workout_ndjson_import_is_chunked_and_idempotent(client, db, make_user, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+
+    bob = make_user("bob")
+    user_id = bob.id
+    headers = auth_headers(bob)
+    start = datetime(2024, 3, 4, 7, 0)
+    lines = [
+        json.dumps({
+            "mode": "gym",
+            "start_time": (start + timedelta(days=i)).isoformat(),
+            "end_time": (start + timedelta(days=i, minutes=30)).isoformat(),
+            "exercises_performed": [{"name": "Squats", "sets": 3, "reps": 10, "weight_kg": 20}],
+        })
+        for i in range(3)
+    ]
+    lines.append("{broken")
+    body = "\n".join(lines) + "\n"
+    client.post("/api/progress/snapshots", headers=headers,
+                params={"snapshot_date": "2024-03-09"}, json={"weight_kg": 80})
+
+    response = client.post("/api/import/workouts", headers=headers, params={"format": "ndjson"}, content=body)
+    events = _events(response)
+    assert [e["event"] for e in events] == ["progress", "error", "summary"]
+    assert events[-1]["rows_imported"] == 3
+
+    sessions = db.query(WorkoutSession).filter(WorkoutSession.user_id == user_id).all()
+    assert len(sessions) == 3
+    assert all(s.total_volume == 600.0 and s.duration_minutes == 30 for s in sessions)
+
+    rollup = db.query(WeeklyRollup).filter(WeeklyRollup.user_id == user_id).one()
+    assert rollup.workouts_completed == 3
+    snapshot = db.query(ProgressSnapshot).filter(ProgressSnapshot.user_id == user_id).one()
+    assert snapshot.metrics["workouts_completed_week"] == 3
+
+    # Re-sending the same file adds nothing
+    events = _events(client.post("/api/import/workouts", headers=headers, params={"format": "ndjson"}, content=body))
+    assert events[-1]["rows_imported"] == 0
+    assert events[-1]["rows_skipped"] == 3
+
+
+def test_import_rejects_unknown_kind_and_format(client, make_user):
+    headers = auth_headers(make_user("carol"))
+    assert client.post("/api/import/habits", headers=headers, content="x").status_code == 404
+    assert client.post("/api/import/progress", headers={**headers, "Content-Type": "text/plain"},
+                       content="x").status_code == 400
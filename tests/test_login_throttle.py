@@ -0,0 +1,94 @@
+"""
+Failed logins lock the email (and, later, the IP) with exponential backoff;
+locked attempts are refused before bcrypt runs, and unknown emails still
+cost one verify.
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.services.login_throttle import login_throttle
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(login_throttle, "clock", clock)
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_EMAIL_FREE_FAILURES", 2)
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_IP_FREE_FAILURES", 100)
+    login_throttle.clear()
+    yield clock
+    login_throttle.clear()
+
+
+@pytest.fixture
+def verify_calls(monkeypatch):
+    calls = []
+    import app.routers.auth as auth_module
+    original = auth_module.verify_password_async
+
+    async def counting_verify(plain, hashed):
+        calls.append(hashed)
+        return await original(plain, hashed)
+
+    monkeypatch.setattr(auth_module, "verify_password_async", counting_verify)
+    return calls
+
+
+def login(client, email, password):
+    return client.post("/api/auth/login", json={"email": email, "password": password})
+
+
+def throttled_count() -> float:
+    return REGISTRY.get_sample_value("login_attempts_total", {"result": "throttled"}) or 0.0
+
+
+def test_backoff_short_circuits_before_bcrypt(client, make_user, clock, verify_calls):
+    make_user("alice")
+    before = throttled_count()
+
+    assert [login(client, "alice@example.com", "wrong").status_code for _ in range(3)] == [401, 401, 401]
+    assert len(verify_calls) == 3
+
+    # Third failure is past the two free ones: locked for 1s, without hashing
+    response = login(client, "alice@example.com", "password123")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert len(verify_calls) == 3
+    assert throttled_count() == before + 1
+
+    # Each further failure doubles the lock
+    clock.now += 1
+    assert login(client, "alice@example.com", "wrong").status_code == 401
+    assert login(client, "alice@example.com", "wrong").headers["retry-after"] == "2"
+
+    # A successful login clears the account's counter
+    clock.now += 2
+    assert login(client, "alice@example.com", "password123").status_code == 200
+    assert login(client, "alice@example.com", "wrong").status_code == 401
+
+
+def test_unknown_emails_cost_a_verify_and_are_throttled_too(client, clock, verify_calls):
+    for _ in range(3):
+        assert login(client, "ghost@example.com", "guess").status_code == 401
+    assert len(verify_calls) == 3
+    assert len(set(verify_calls)) == 1
+
+    assert login(client, "ghost@example.com", "guess").status_code == 429
+    assert len(verify_calls) == 3
+
+
+def test_ip_counter_spans_emails(client, clock, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_THROTTLE_IP_FREE_FAILURES", 3)
+    for i in range(4):
+        assert login(client, f"user{i}@example.com", "guess").status_code == 401
+    assert login(client, "fresh@example.com", "guess").status_code == 429
@@ -0,0 +1,50 @@
+"""
+Typed hot metric columns stay in sync with the JSONB metrics on write.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from app.models.progress import ProgressSnapshot
+
+from .conftest import auth_headers
+
+
+def test_snapshot_hot_columns_follow_metrics(db, make_user):
+    user = make_user("alice")
+    snapshot = ProgressSnapshot(user_id=user.id, date=date.today(),
+                                metrics={"weight_kg": 70, "bodyfat_pct": "n/a"})
+    db.add(snapshot)
+    db.commit()
+    assert snapshot.weight_kg == 70.0
+    assert snapshot.bodyfat_pct is None
+
+    snapshot.metrics = {"waist_cm": 80.5}
+    db.commit()
+    assert snapshot.weight_kg is None
+    assert snapshot.waist_cm == 80.5
+
+
+def test_weekly_workout_stats_aggregate_typed_columns(client, make_user):
+    headers = auth_headers(make_user("alice"))
+    # Early today, so every session lands in the current ISO week's rollup
+    start = datetime.combine(datetime.utcnow().date(), time(0, 1))
+    for mode in ("gym", "gym", "home"):
+        response = client.post(
+            "/api/workout-sessions/",
+            params={
+                "mode": mode,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=30)).isoformat(),
+            },
+            json=[{"name": "Squats", "sets": 3, "reps": 10, "weight_kg": 20}],
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+
+    stats = client.get("/api/workout-sessions/stats/weekly", headers=headers).json()
+
+    assert stats["total_sessions"] == 3
+    assert stats["gym_sessions"] == 2
+    assert stats["home_sessions"] == 1
+    assert stats["total_volume_kg"] == 1800
+    assert stats["total_duration_minutes"] == 90
@@ -0,0 +1,103 @@
+"""
+Request, database, cache and password-hashing metrics, and /metrics output
+aggregated across worker processes in multiprocess mode.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.cache import TTLCache
+from app.core.metrics import instrument_engine
+from app.core.security import get_password_hash, verify_password_async
+from app.middleware import MetricsMiddleware
+
+from .conftest import BACKEND_DIR
+
+
+def sample(name: str, labels: dict = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_request_latency_is_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/api/habits/{habit_id}")
+    async def habit(habit_id: int):
+        return {"id": habit_id}
+
+    labels = {"method": "GET", "route": "/api/habits/{habit_id}", "status": "200"}
+    before = sample("http_request_duration_seconds_count", labels)
+    unmatched = {"method": "GET", "route": "unmatched", "status": "404"}
+    unmatched_before = sample("http_request_duration_seconds_count", unmatched)
+
+    client = TestClient(app)
+    client.get("/api/habits/1")
+    client.get("/api/habits/2")
+    client.get("/nope")
+
+    assert sample("http_request_duration_seconds_count", labels) == before + 2
+    assert sample("http_request_duration_seconds_count", unmatched) == unmatched_before + 1
+    assert sample("http_requests_in_flight", {"method": "GET"}) == 0
+
+
+def test_database_and_pool_metrics():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    selects = sample("db_queries_total", {"operation": "SELECT"})
+    checkouts = sample("db_pool_checkouts_total")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("select 2"))
+        assert sample("db_pool_connections_checked_out") >= 1
+
+    assert sample("db_queries_total", {"operation": "SELECT"}) == selects + 2
+    assert sample("db_query_duration_seconds_count", {"operation": "SELECT"}) >= 2
+    assert sample("db_pool_checkouts_total") == checkouts + 1
+
+
+def test_cache_and_bcrypt_metrics():
+    cache = TTLCache("metrics_test", maxsize=10, ttl_seconds=60)
+    cache.get("a")
+    cache.set("a", 1)
+    cache.get("a")
+    assert sample("cache_requests_total", {"cache": "metrics_test", "result": "hit"}) == 1
+    assert sample("cache_requests_total", {"cache": "metrics_test", "result": "miss"}) == 1
+
+    hashed = get_password_hash("secret")
+    before = sample("bcrypt_duration_seconds_count", {"operation": "verify"})
+    assert asyncio.run(verify_password_async("secret", hashed))
+    assert sample("bcrypt_duration_seconds_count", {"operation": "verify"}) == before + 1
+    assert sample("bcrypt_queue_depth") == 0
+
+
+WORKER = """
+from app.core.metrics import DB_QUERIES, REQUESTS_IN_FLIGHT
+DB_QUERIES.labels("SELECT").inc(3)
+REQUESTS_IN_FLIGHT.labels("GET").inc()
+"""
+
+SCRAPE = """
+import sys
+from app.core.metrics import render_metrics
+sys.stdout.write(render_metrics()[0].decode())
+"""
+
+
+def test_multiprocess_workers_are_aggregated(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": str(BACKEND_DIR)}
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", WORKER], env=env, check=True)
+
+    output = subprocess.run(
+        [sys.executable, "-c", SCRAPE], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'db_queries_total{operation="SELECT"} 6.0' in output
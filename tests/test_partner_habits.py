@@ -0,0 +1,59 @@
+"""
+GET /habits/partner: share-aware, with one habit query and one batched
+log query regardless of how many habits or logs the partner has.
+"""
+
+from datetime import date, timedelta
+
+from app.models.habit import Habit, HabitCadence, HabitLog, HabitLogStatus
+from app.models.share import SharePermissions
+
+from .conftest import auth_headers
+
+
+def _log_days(db, habit, days, status=HabitLogStatus.done):
+    for offset in days:
+        db.add(HabitLog(habit_id=habit.id, date=date.today() - timedelta(days=offset), status=status))
+
+
+def test_partner_habits_streaks_and_query_count(client, db, make_user, make_couple, query_counter):
+    alice, bob = make_user("alice"), make_user("bob")
+    make_couple(alice, bob)
+    db.add(SharePermissions(owner_user_id=bob.id, viewer_user_id=alice.id, can_view_habits=True))
+    water = Habit(user_id=bob.id, name="Water", cadence=HabitCadence.daily)
+    walk = Habit(user_id=bob.id, name="Walk", cadence=HabitCadence.daily)
+    db.add_all([water, walk])
+    db.flush()
+    _log_days(db, water, [0, 1, 2, 4])
+    _log_days(db, walk, [1, 2, 3])
+    _log_days(db, walk, [0], status=HabitLogStatus.skipped)
+    db.commit()
+
+    headers = auth_headers(alice)
+    with query_counter:
+        response = client.get("/api/habits/partner", params={"limit": 5}, headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    habits = {h["name"]: h for h in data["habits"]}
+    assert habits["Water"]["streak"] == 3
+    assert habits["Water"]["today_status"] == "done"
+    assert habits["Water"]["week_completed_count"] == 4
+    assert habits["Walk"]["streak"] == 3
+    assert habits["Walk"]["today_status"] == "skipped"
+    assert data["logs_total"] == 8
+    assert len(data["logs"]) == 5
+    assert data["has_more"] is True
+    # Auth user, couple + settings, share grants, habits, batched logs
+    assert query_counter.count == 5
+
+
+def test_partner_habits_requires_grant(client, db, make_user, make_couple):
+    alice, bob = make_user("alice"), make_user("bob")
+    make_couple(alice, bob)
+    db.add(SharePermissions(owner_user_id=bob.id, viewer_user_id=alice.id, can_view_progress=True))
+    db.commit()
+
+    response = client.get("/api/habits/partner", headers=auth_headers(alice))
+
+    assert response.status_code == 403
@@ -0,0 +1,50 @@
+"""
+Permission resolver tests: sharing checks are answered from one load of
+the couple and one load of the share grants per request.
+"""
+
+from datetime import date
+
+from app.models.progress import ProgressSnapshot
+from app.models.share import SharePermissions
+
+from .conftest import auth_headers
+
+
+def test_partner_progress_uses_one_couple_and_one_grant_query(client, db, make_user, make_couple, query_counter):
+    alice, bob = make_user("alice"), make_user("bob")
+    make_couple(alice, bob)
+    db.add(SharePermissions(owner_user_id=bob.id, viewer_user_id=alice.id, can_view_progress=True))
+    db.add(ProgressSnapshot(user_id=bob.id, date=date.today(), metrics={"weight_kg": 80}))
+    db.commit()
+
+    headers = auth_headers(alice)
+    with query_counter:
+        response = client.get("/api/progress/partner", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["partner_name"] == "Bob"
+    assert len(response.json()["progress"]) == 1
+    # Auth user, couple + settings, share grants, snapshots
+    assert query_counter.count == 4
+
+
+def test_partner_progress_respects_couple_settings(client, db, make_user, make_couple):
+    alice, bob = make_user("alice"), make_user("bob")
+    make_couple(alice, bob, share_progress_enabled=False)
+    db.add(SharePermissions(owner_user_id=bob.id, viewer_user_id=alice.id, can_view_progress=True))
+    db.commit()
+
+    response = client.get("/api/progress/partner", headers=auth_headers(alice))
+
+    assert response.status_code == 403
+
+
+def test_couple_owner_checks(client, db, make_user, make_couple):
+    alice, bob = make_user("alice"), make_user("bob")
+    couple = make_couple(alice, bob)
+    couple_id = couple.id
+
+    assert client.post(f"/api/couples/{couple_id}/invite", headers=auth_headers(bob)).status_code == 403
+    assert client.post(f"/api/couples/{couple_id}/invite", headers=auth_headers(alice)).status_code == 200
+    assert client.get(f"/api/couples/{couple_id}/members", headers=auth_headers(bob)).status_code == 200
@@ -0,0 +1,98 @@
+"""
+Routes that only need the caller's id trust the access token's signed
+claims; bumping the user's security version makes older tokens stale.
+"""
+
+import uuid
+
+from app.core.revocation import revocation_list
+from app.services.revocation import bump_security_version, sync_revoked_tokens
+
+from .conftest import auth_headers
+
+
+def login(client, name):
+    response = client.post("/api/auth/login", json={"email": f"{name}@example.com", "password": "password123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_claims_skip_the_user_lookup(client, make_user, query_counter):
+    make_user("alice")
+    headers = bearer(login(client, "alice"))
+
+    with query_counter:
+        assert client.get("/api/habits/", headers=headers).status_code == 200
+    assert not any("FROM users" in statement for statement in query_counter.statements)
+    assert query_counter.count == 2  # Collection version and the habits themselves
+
+    # Tokens without the claims still work, for one lookup
+    legacy_headers = auth_headers(make_user("bob"))
+    with query_counter:
+        assert client.get("/api/habits/", headers=legacy_headers).status_code == 200
+    assert query_counter.count == 3
+
+
+def test_couple_claim_scopes_the_membership_lookup(client, make_user, query_counter):
+    make_user("alice")
+    tokens = login(client, "alice")
+
+    # No couple claimed, so nothing to look up
+    with query_counter:
+        response = client.get(f"/api/couples/{uuid.uuid4()}/members", headers=bearer(tokens))
+    assert response.status_code == 403
+    assert not any("couple_members" in statement for statement in query_counter.statements)
+
+    couple_id = client.post("/api/couples/", headers=bearer(tokens)).json()["id"]
+    refreshed = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+    response = client.get(f"/api/couples/{couple_id}/members", headers=bearer(refreshed))
+    assert response.status_code == 200
+    assert [member["display_name"] for member in response.json()] == ["Alice"]
+
+
+def test_couple_change_makes_claims_stale(client, make_user):
+    make_user("alice")
+    tokens = login(client, "alice")
+    assert client.post("/api/couples/", headers=bearer(tokens)).status_code == 200
+
+    response = client.get("/api/habits/", headers=bearer(tokens))
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token is out of date"
+
+    refreshed = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+    assert client.get("/api/habits/", headers=bearer(refreshed)).status_code == 200
+
+
+def test_deactivation_reaches_other_workers_on_sync(client, db, make_user):
+    make_user("alice")
+    tokens = login(client, "alice")
+    assert client.delete("/api/me", headers=bearer(tokens)).status_code == 202
+    assert client.get("/api/habits/", headers=bearer(tokens)).status_code == 401
+
+    # A worker that hasn't synced yet still trusts the claims
+    revocation_list.clear()
+    assert client.get("/api/habits/", headers=bearer(tokens)).status_code == 200
+    assert sync_revoked_tokens(db) == 1
+    assert client.get("/api/habits/", headers=bearer(tokens)).status_code == 401
+
+    # And the account can't mint fresh claims
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_bumps_are_published_only_on_commit(client, db, make_user):
+    alice = make_user("alice")
+    tokens = login(client, "alice")
+
+    bump_security_version(db, alice.id)
+    db.rollback()
+    assert client.get("/api/habits/", headers=bearer(tokens)).status_code == 200
+
+    bump_security_version(db, alice.id)
+    db.commit()
+    assert client.get("/api/habits/", headers=bearer(tokens)).status_code == 401
+    db.refresh(alice)
+    assert alice.security_version == 1
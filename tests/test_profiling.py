@@ -0,0 +1,66 @@
+"""
+ProfilingMiddleware profiles requests with a signed X-Profile header or a
+sampled route, writes speedscope files, and never exceeds its concurrency cap.
+"""
+
+import json
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiling import create_profile_token
+from app.middleware import ProfilingMiddleware
+
+from .conftest import auth_headers
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILER_SAMPLE_RATE", 0.0)
+    return tmp_path
+
+
+def test_signed_header_writes_speedscope_profile(client, make_user, profile_dir):
+    headers = auth_headers(make_user("alice"))
+    profiled = TestClient(ProfilingMiddleware(client.app))
+
+    response = profiled.get("/api/habits/", headers={**headers, "X-Profile": create_profile_token()})
+    assert response.status_code == 200
+    filename = response.headers["x-profile-file"]
+    assert filename.endswith(".speedscope.json")
+    profile = json.loads((profile_dir / filename).read_text())
+    assert profile["$schema"].startswith("https://www.speedscope.app/")
+
+    expired = create_profile_token(timedelta(seconds=-1))
+    for token in ("not-a-token", expired):
+        response = profiled.get("/api/habits/", headers={**headers, "X-Profile": token})
+        assert "x-profile-file" not in response.headers
+    assert len(list(profile_dir.iterdir())) == 1
+
+
+def test_sampling_only_covers_configured_routes(client, make_user, profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILER_ROUTES", "/api/habits/logs")
+    headers = auth_headers(make_user("alice"))
+    profiled = TestClient(ProfilingMiddleware(client.app))
+
+    assert "x-profile-file" in profiled.get("/api/habits/logs", headers=headers).headers
+    assert "x-profile-file" not in profiled.get("/api/habits/", headers=headers).headers
+
+
+def test_concurrency_cap(client, make_user, profile_dir):
+    headers = {**auth_headers(make_user("alice")), "X-Profile": create_profile_token()}
+    middleware = ProfilingMiddleware(client.app)
+    profiled = TestClient(middleware)
+
+    middleware.slots.active = middleware.slots.limit
+    response = profiled.get("/api/habits/", headers=headers)
+    assert response.status_code == 200
+    assert "x-profile-file" not in response.headers
+
+    middleware.slots.active = 0
+    assert "x-profile-file" in profiled.get("/api/habits/", headers=headers).headers
+    assert middleware.slots.active == 0
@@ -0,0 +1,63 @@
+"""
+GET /progress/summary: one window-function query for every horizon,
+cached per user and invalidated by snapshot writes.
+"""
+
+from datetime import date, timedelta
+
+from app.models.progress import ProgressSnapshot
+from app.services.progress import progress_summary_cache
+
+from .conftest import auth_headers
+
+
+def _snapshot(db, user, days_ago, weight):
+    db.add(ProgressSnapshot(
+        user_id=user.id,
+        date=date.today() - timedelta(days=days_ago),
+        metrics={"weight_kg": weight, "note": "x"},
+    ))
+
+
+def test_summary_horizons_from_one_query_then_cache(client, db, make_user, query_counter):
+    progress_summary_cache.clear()
+    alice = make_user("alice")
+    for days_ago, weight in [(0, 70), (5, 71), (10, 72), (40, 74), (400, 80)]:
+        _snapshot(db, alice, days_ago, weight)
+    db.commit()
+    headers = auth_headers(alice)
+
+    with query_counter:
+        response = client.get("/api/progress/summary", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["current"]["weight_kg"] == 70
+    assert data["previous"]["weight_kg"] == 74
+    assert data["changes"] == {"weight_kg": -4}
+    assert data["comparisons"]["7"]["previous"]["weight_kg"] == 72
+    assert data["comparisons"]["90"]["previous"]["weight_kg"] == 80
+    assert data["comparisons"]["365"]["changes"] == {"weight_kg": -10}
+    # Auth user + one summary query
+    assert query_counter.count == 2
+
+    with query_counter:
+        response = client.get("/api/progress/summary", params={"horizon_days": 7}, headers=headers)
+    assert response.json()["previous"]["weight_kg"] == 72
+    assert query_counter.count == 1
+
+    response = client.post(
+        "/api/progress/snapshots",
+        params={"snapshot_date": (date.today() + timedelta(days=1)).isoformat()},
+        json={"weight_kg": 69},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/progress/summary", headers=headers)
+    assert response.json()["current"]["weight_kg"] == 69
+
+
+def test_summary_rejects_unknown_horizon(client, make_user):
+    response = client.get("/api/progress/summary", params={"horizon_days": 14},
+                          headers=auth_headers(make_user("alice")))
+    assert response.status_code == 400
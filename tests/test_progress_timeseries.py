@@ -0,0 +1,57 @@
+"""
+GET /progress/timeseries: bucketed aggregates, rolling mean and trend
+slope from a single query.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.progress import ProgressSnapshot
+
+from .conftest import auth_headers
+
+
+def test_weekly_buckets_with_rolling_mean_and_slope(client, db, make_user, query_counter):
+    alice = make_user("alice")
+    monday = date(2026, 1, 5)
+    # Two weeks of daily weigh-ins losing 0.1 kg/day, plus a custom JSON metric
+    for day in range(14):
+        db.add(ProgressSnapshot(
+            user_id=alice.id,
+            date=monday + timedelta(days=day),
+            metrics={"weight_kg": 80 - 0.1 * day, "steps": 1000 * day},
+        ))
+    db.commit()
+    headers = auth_headers(alice)
+
+    with query_counter:
+        response = client.get("/api/progress/timeseries", headers=headers, params={
+            "metric": "weight_kg", "bucket": "week", "rolling_window": 2,
+            "from_date": "2026-01-01", "to_date": "2026-01-31",
+        })
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [p["date"] for p in data["points"]] == ["2026-01-05", "2026-01-12"]
+    first, second = data["points"]
+    assert first["count"] == 7
+    assert first["max"] == pytest.approx(80)
+    assert first["min"] == pytest.approx(79.4)
+    assert first["mean"] == pytest.approx(79.7)
+    assert second["rolling_mean"] == pytest.approx((79.7 + 79.0) / 2)
+    assert data["trend_slope_per_day"] == pytest.approx(-0.1)
+    # Auth user + one time-series statement
+    assert query_counter.count == 2
+
+    response = client.get("/api/progress/timeseries", headers=headers, params={
+        "metric": "steps", "bucket": "month", "from_date": "2026-01-01", "to_date": "2026-01-31",
+    })
+    assert response.json()["points"][0]["max"] == 13000
+
+
+def test_timeseries_requires_progress_grant(client, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    response = client.get("/api/progress/timeseries", headers=auth_headers(alice),
+                          params={"metric": "weight_kg", "user_id": str(bob.id)})
+    assert response.status_code == 403
@@ -0,0 +1,110 @@
+"""
+Query-count regression tests: listing endpoints must not issue one
+query per row.
+"""
+
+from app.models.couple import Couple, CoupleMember, CoupleRole
+from app.models.share import SharePermissions
+
+from .conftest import auth_headers
+
+# Auth dependency (user lookup) + the endpoint's own queries
+AUTH_QUERIES = 1
+
+
+def _share_with(db, owner, viewers):
+    for viewer in viewers:
+        db.add(SharePermissions(
+            owner_user_id=owner.id,
+            viewer_user_id=viewer.id,
+            can_view_progress=True,
+            can_view_habits=True,
+        ))
+    db.commit()
+
+
+def test_share_permissions_query_count_is_constant(client, db, make_user, query_counter):
+    owner = make_user("owner")
+    viewers = [make_user(f"viewer{i}") for i in range(5)]
+    _share_with(db, owner, viewers)
+    for viewer in viewers[:3]:
+        _share_with(db, viewer, [owner])
+
+    headers = auth_headers(owner)
+    viewer_emails = {v.email for v in viewers}
+    with query_counter:
+        response = client.get("/api/share/permissions", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["sharing_with_others"]) == 5
+    assert len(data["receiving_from_others"]) == 3
+    assert {p["viewer_email"] for p in data["sharing_with_others"]} == viewer_emails
+    assert query_counter.count == AUTH_QUERIES + 2
+    assert not any("avatar_url" in statement for statement in query_counter.statements[AUTH_QUERIES:])
+
+
+def test_shared_data_available_query_count_is_constant(client, db, make_user, query_counter):
+    viewer = make_user("viewer")
+    owners = [make_user(f"owner{i}") for i in range(4)]
+    for owner in owners:
+        _share_with(db, owner, [viewer])
+
+    headers = auth_headers(viewer)
+    owner_names = {o.display_name for o in owners}
+    with query_counter:
+        response = client.get("/api/share/available", headers=headers)
+
+    assert response.status_code == 200
+    assert {item["name"] for item in response.json()} == owner_names
+    assert query_counter.count == AUTH_QUERIES + 1
+
+
+def test_couple_members_query_count_is_constant(client, db, make_user, query_counter):
+    alice, bob = make_user("alice"), make_user("bob")
+    couple = Couple()
+    db.add(couple)
+    db.flush()
+    db.add(CoupleMember(user_id=alice.id, couple_id=couple.id, role=CoupleRole.owner))
+    db.add(CoupleMember(user_id=bob.id, couple_id=couple.id, role=CoupleRole.member))
+    db.commit()
+
+    headers = auth_headers(alice)
+    url = f"/api/couples/{couple.id}/members"
+    with query_counter:
+        response = client.get(url, headers=headers)
+
+    assert response.status_code == 200
+    assert {m["display_name"] for m in response.json()} == {"Alice", "Bob"}
+    # Membership check + one joined member listing
+    assert query_counter.count == AUTH_QUERIES + 2
+
+
+def test_habits_and_logs_query_count_is_constant(client, db, make_user, query_counter):
+    from datetime import date, timedelta
+
+    from app.models.habit import Habit, HabitLog, HabitLogStatus
+
+    alice = make_user("alice")
+    habits = [Habit(user_id=alice.id, name=f"Habit {i}") for i in range(4)]
+    db.add_all(habits)
+    db.flush()
+    for habit in habits:
+        for offset in range(3):
+            db.add(HabitLog(habit_id=habit.id, date=date.today() - timedelta(days=offset), status=HabitLogStatus.done))
+    db.commit()
+
+    headers = auth_headers(alice)
+    with query_counter:
+        response = client.get("/api/habits/", headers=headers)
+    assert response.status_code == 200
+    assert all(h["today_status"] == "done" for h in response.json())
+    # ETag version lookup + habits joined to today's log
+    assert query_counter.count == AUTH_QUERIES + 2
+
+    with query_counter:
+        response = client.get("/api/habits/logs", headers=headers)
+    assert len(response.json()) == 12
+    assert response.json()[0]["habit_name"].startswith("Habit")
+    # ETag version lookup + habit ids + logs joined to their habit's name
+    assert query_counter.count == AUTH_QUERIES + 3
@@ -0,0 +1,100 @@
+"""
+Sliding-window limits per user and per IP, stricter per-route overrides,
+and the shared SQLite store seen from two workers.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.network import get_client_ip
+from app.core.ratelimit import MemoryRateLimitStore, SQLiteRateLimitStore, parse_route_overrides
+from app.middleware import RateLimitMiddleware
+
+from .conftest import auth_headers
+
+
+@pytest.mark.parametrize("make_store", [MemoryRateLimitStore, None], ids=["memory", "sqlite"])
+def test_sliding_window(make_store, tmp_path):
+    store = make_store() if make_store else SQLiteRateLimitStore(str(tmp_path / "limits.sqlite3"))
+
+    assert [store.hit("k", 3, 60, 600 + i).allowed for i in range(3)] == [True, True, True]
+    rejected = store.hit("k", 3, 60, 610)
+    assert not rejected.allowed
+    assert rejected.retry_after == 50
+
+    # Halfway into the next window the previous one counts for half: 1.5 + 1 fits, 2.5 + 1 doesn't
+    assert store.hit("k", 3, 60, 690).allowed
+    rejected = store.hit("k", 3, 60, 690)
+    assert not rejected.allowed
+    assert rejected.retry_after == 10
+
+    # Two full windows later nothing is left
+    assert store.hit("k", 3, 60, 800).remaining == 2
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "limits.sqlite3")
+    first, second = SQLiteRateLimitStore(path), SQLiteRateLimitStore(path)
+    assert first.hit("k", 2, 60, 0).allowed
+    assert second.hit("k", 2, 60, 1).allowed
+    assert not first.hit("k", 2, 60, 2).allowed
+
+
+def test_route_overrides_match_templates():
+    rule, = parse_route_overrides("POST /api/habits/{habit_id}/logs=5/10")
+    assert rule.method == "POST"
+    assert rule.path_regex.match("/api/habits/3f1c/logs")
+    assert not rule.path_regex.match("/api/habits/3f1c")
+    assert (rule.limit, rule.window) == (5, 10)
+
+
+def test_middleware_limits_users_and_login(client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_REQUESTS", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTE_OVERRIDES", "POST /api/auth/login=2/60")
+    limited = TestClient(RateLimitMiddleware(client.app, store=MemoryRateLimitStore()))
+    alice, bob = auth_headers(make_user("alice")), auth_headers(make_user("bob"))
+
+    assert [limited.get("/api/habits/", headers=alice).status_code for _ in range(2)] == [200, 200]
+    response = limited.get("/api/habits/", headers=alice)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["retry-after"]) <= settings.RATE_LIMIT_WINDOW
+    assert response.headers["x-ratelimit-limit"] == "2"
+
+    # Other users have their own budget, and probes are never limited
+    assert limited.get("/api/habits/", headers=bob).status_code == 200
+    assert limited.get("/api/health/live", headers=alice).status_code == 200
+
+    credentials = {"email": "alice@example.com", "password": "wrong"}
+    codes = [limited.post("/api/auth/login", json=credentials).status_code for _ in range(3)]
+    assert codes == [401, 401, 429]
+
+
+def test_sqlite_store_runs_off_the_loop_and_fails_open(client, make_user, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "RATE_LIMIT_REQUESTS", 1)
+    store = SQLiteRateLimitStore(str(tmp_path / "limits.sqlite3"))
+    limited = TestClient(RateLimitMiddleware(client.app, store=store))
+    headers = auth_headers(make_user("alice"))
+
+    assert [limited.get("/api/habits/", headers=headers).status_code for _ in range(2)] == [200, 429]
+
+    # A store that errors lets requests through instead of failing them
+    store._connection.close()
+    assert limited.get("/api/habits/", headers=headers).status_code == 200
+
+
+def test_client_ip_through_trusted_proxies(monkeypatch):
+    def scope(peer, forwarded=None):
+        headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+        return {"type": "http", "client": (peer, 5000), "headers": headers}
+
+    # Without trusted proxies the header is ignored
+    assert get_client_ip(scope("10.0.0.5", "203.0.113.7")) == "10.0.0.5"
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "10.0.0.0/8, 127.0.0.1")
+    assert get_client_ip(scope("10.0.0.5", "203.0.113.7")) == "203.0.113.7"
+    # Spoofed entries left of the real client are skipped, as are inner proxies
+    assert get_client_ip(scope("10.0.0.5", "1.2.3.4, 203.0.113.7, 10.0.0.9")) == "203.0.113.7"
+    # Untrusted peers can't claim another address
+    assert get_client_ip(scope("198.51.100.2", "203.0.113.7")) == "198.51.100.2"
+    assert get_client_ip(scope("10.0.0.5")) == "10.0.0.5"
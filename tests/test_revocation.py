@@ -0,0 +1,108 @@
+"""
+Logged-out access tokens are rejected from an in-memory list that workers
+sync from revoked_tokens; refresh tokens rotate and work exactly once.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.core.revocation import revocation_list
+from app.core.security import create_access_token, decode_token
+from app.models.token import RevokedToken
+from app.services.revocation import purge_expired_revocations, revoke_token, sync_revoked_tokens
+
+
+def login(client, name):
+    response = client.post("/api/auth/login", json={"email": f"{name}@example.com", "password": "password123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, make_user, query_counter):
+    make_user("alice")
+    tokens = login(client, "alice")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/habits/", headers=headers).status_code == 200
+
+    response = client.post("/api/auth/logout", headers=headers, json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+
+    # The check is a set lookup, not a query
+    with query_counter:
+        assert decode_token(tokens["access_token"]) is None
+    assert query_counter.count == 0
+    assert client.get("/api/habits/", headers=headers).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    # Nor can the refresh token stand in for the access token
+    refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+    assert client.get("/api/habits/", headers=refresh_headers).status_code == 401
+
+    # Logging out again is harmless
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+
+
+def test_logout_with_expired_access_token_revokes_refresh_token(client, make_user):
+    user = make_user("alice")
+    tokens = login(client, "alice")
+    expired = create_access_token(subject=str(user.id), expires_delta=timedelta(seconds=-60))
+
+    response = client.post(
+        "/api/auth/logout",
+        headers={"Authorization": f"Bearer {expired}"},
+        json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+    # No bearer header at all works too
+    tokens = login(client, "alice")
+    assert client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_other_workers_pick_up_revocations_on_sync(db, make_user):
+    user = make_user("alice")
+    token = create_access_token(subject=str(user.id))
+    assert revoke_token(db, token, decode_token(token))
+    assert decode_token(token) is None
+
+    # A worker that hasn't synced yet still accepts it
+    revocation_list.clear()
+    assert decode_token(token) is not None
+    assert sync_revoked_tokens(db) == 1
+    assert decode_token(token) is None
+    # Later syncs only read recent rows, and don't count ids already known
+    assert sync_revoked_tokens(db) == 0
+    assert len(revocation_list) == 1
+
+
+def test_refresh_tokens_rotate(client, make_user):
+    make_user("alice")
+    first = login(client, "alice")["refresh_token"]
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+    assert second != first
+
+    # Replaying the old one fails; the new one works once
+    assert client.post("/api/auth/refresh", json={"refresh_token": first}).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": second}).status_code == 200
+    assert client.post("/api/auth/refresh", json={"refresh_token": second}).status_code == 401
+
+
+def test_expired_revocations_are_pruned(db):
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        RevokedToken(jti="expired", token_type="access", expires_at=now - timedelta(minutes=1)),
+        RevokedToken(jti="live", token_type="access", expires_at=now + timedelta(minutes=5)),
+    ])
+    db.commit()
+    revocation_list.clear()
+    revocation_list.add("stale", now.timestamp() - 60)
+
+    assert sync_revoked_tokens(db) == 1
+    assert revocation_list.is_revoked("live")
+    assert not revocation_list.is_revoked("expired") and not revocation_list.is_revoked("stale")
+
+    assert purge_expired_revocations(db) == 1
+    assert [jti for (jti,) in db.query(RevokedToken.jti)] == ["live"]
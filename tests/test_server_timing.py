@@ -0,0 +1,56 @@
+"""
+Sampled requests report auth, JWT, DB, handler and serialization time in a
+Server-Timing header and a structured log line; unsampled ones report nothing.
+"""
+
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import instrument_engine
+from app.middleware import ServerTimingMiddleware
+
+from .conftest import auth_headers
+
+
+def phases(header: str) -> dict:
+    result = {}
+    for entry in header.split(","):
+        name, *params = entry.strip().split(";")
+        result[name] = dict(param.split("=", 1) for param in params)
+    return result
+
+
+def test_sampled_request_reports_phases(client, engine, make_user, caplog):
+    instrument_engine(engine)
+    headers = auth_headers(make_user("alice"))
+    timed_client = TestClient(ServerTimingMiddleware(client.app, sample_rate=1.0))
+
+    with caplog.at_level(logging.INFO, logger="app.timing"):
+        response = timed_client.get("/api/habits/", headers=headers)
+
+    assert response.status_code == 200
+    reported = phases(response.headers["server-timing"])
+    assert {"auth", "jwt", "db", "handler", "serialize", "total"} <= set(reported)
+    assert reported["db"]["desc"].endswith('queries"')
+    assert float(reported["auth"]["dur"]) >= float(reported["jwt"]["dur"])
+
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["event"] == "request_timing"
+    assert line["route"] == "/api/habits/"
+    assert line["status"] == 200
+    assert line["db_queries"] >= 2
+    assert set(line["phases_ms"]) == {"auth", "jwt", "db", "handler", "serialize"}
+
+
+def test_unsampled_request_has_no_header(client, make_user, caplog):
+    headers = auth_headers(make_user("alice"))
+    untimed_client = TestClient(ServerTimingMiddleware(client.app, sample_rate=0.0))
+
+    with caplog.at_level(logging.INFO, logger="app.timing"):
+        response = untimed_client.get("/api/habits/", headers=headers)
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert not [record for record in caplog.records if record.name == "app.timing"]
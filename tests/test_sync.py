@@ -0,0 +1,136 @@
+"""
+GET /sync pages through everything changed since a cursor, including deletes
+recorded as tombstones, and hands back the cursor for the next pass.
+"""
+
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.habit import Habit
+
+from .conftest import auth_headers
+
+
+@pytest.fixture(autouse=True)
+def no_cursor_lag(monkeypatch):
+    # Rows written by the test are visible to the very next sync
+    monkeypatch.setattr(settings, "SYNC_CURSOR_LAG_SECONDS", 0)
+
+
+@pytest.fixture
+def make_user(make_user, db):
+    def _make_user(name):
+        user = make_user(name)
+        # refresh() left the fixture session in an open transaction, which would hold sync back
+        db.expunge(user)
+        db.rollback()
+        return user
+
+    return _make_user
+
+
+def sync_all(client, headers, cursor=None, limit=None):
+    """Follow next_cursor until has_more is false; returns (changes, deleted, cursor, pages)."""
+    changes, deleted, pages = {}, [], 0
+    while True:
+        params = {}
+        if cursor:
+            params["since"] = cursor
+        if limit:
+            params["limit"] = limit
+        response = client.get("/api/sync", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        pages += 1
+        for entity, records in body["changes"].items():
+            changes.setdefault(entity, []).extend(records)
+        deleted.extend(body["deleted"])
+        cursor = body["next_cursor"]
+        if not body["has_more"]:
+            return changes, deleted, cursor, pages
+
+
+def test_full_sync_paginates_without_gaps(client, make_user):
+    alice = make_user("alice")
+    headers = auth_headers(alice)
+    habit_ids = [
+        client.post("/api/habits/", headers=headers, params={"name": f"Habit {i}"}).json()["id"]
+        for i in range(3)
+    ]
+    for offset in range(2):
+        client.post(f"/api/habits/{habit_ids[0]}/logs", headers=headers,
+                    params={"log_date": (date.today() - timedelta(days=offset)).isoformat(), "status": "done"})
+    client.post("/api/progress/snapshots", headers=headers,
+                params={"snapshot_date": date.today().isoformat()}, json={"weight_kg": 80})
+
+    changes, deleted, _, pages = sync_all(client, headers, limit=2)
+
+    assert pages == 3
+    assert sorted(h["id"] for h in changes["habits"]) == sorted(habit_ids)
+    assert len(changes["habit_logs"]) == 2
+    assert len(changes["progress_snapshots"]) == 1
+    assert changes["workout_sessions"] == []
+    assert deleted == []
+
+
+def test_incremental_sync_returns_only_changes_and_deletes(client, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    alice_headers, bob_headers = auth_headers(alice), auth_headers(bob)
+    habit_id = client.post("/api/habits/", headers=alice_headers, params={"name": "Water"}).json()["id"]
+    grant_id = client.post("/api/share/permissions", headers=alice_headers,
+                           params={"viewer_email": "bob@example.com", "can_view_habits": True}).json()["id"]
+
+    _, _, alice_cursor, _ = sync_all(client, alice_headers)
+    bob_changes, _, bob_cursor, _ = sync_all(client, bob_headers)
+    assert [g["id"] for g in bob_changes["share_permissions"]] == [grant_id]
+
+    # Nothing changed yet
+    changes, deleted, alice_cursor, _ = sync_all(client, alice_headers, alice_cursor)
+    assert all(records == [] for records in changes.values())
+    assert deleted == []
+
+    client.post(f"/api/habits/{habit_id}/logs", headers=alice_headers,
+                params={"log_date": date.today().isoformat(), "status": "done"})
+    client.delete(f"/api/share/permissions/{grant_id}", headers=alice_headers)
+
+    changes, deleted, _, _ = sync_all(client, alice_headers, alice_cursor)
+    assert changes["habits"] == []
+    assert [log["habit_id"] for log in changes["habit_logs"]] == [habit_id]
+    assert deleted == [{"entity": "share_permissions", "id": grant_id, "deleted_at": deleted[0]["deleted_at"]}]
+
+    # The viewer is told too
+    _, deleted, _, _ = sync_all(client, bob_headers, bob_cursor)
+    assert [(d["entity"], d["id"]) for d in deleted] == [("share_permissions", grant_id)]
+
+
+def test_rows_from_long_transactions_are_not_skipped(client, engine, make_user):
+    alice = make_user("alice")
+    headers = auth_headers(alice)
+
+    # A slow transaction stamps its habit with its start time, then commits after a newer one
+    with engine.connect() as slow:
+        slow_transaction = slow.begin()
+        slow_id = uuid.uuid4()
+        slow.execute(insert(Habit).values(id=slow_id, user_id=alice.id, name="Slow", is_active=True))
+        fast_id = client.post("/api/habits/", headers=headers, params={"name": "Fast"}).json()["id"]
+
+        changes, _, cursor, _ = sync_all(client, headers)
+        # The pass stops short of the open transaction, so the newer habit waits too
+        assert changes["habits"] == []
+        slow_transaction.commit()
+
+    changes, _, _, _ = sync_all(client, headers, cursor)
+    assert sorted(h["id"] for h in changes["habits"]) == sorted([str(slow_id), fast_id])
+
+
+def test_rejects_bad_and_expired_cursors(client, make_user, monkeypatch):
+    headers = auth_headers(make_user("alice"))
+    assert client.get("/api/sync", headers=headers, params={"since": "not-a-cursor"}).status_code == 400
+
+    cursor = client.get("/api/sync", headers=headers).json()["next_cursor"]
+    monkeypatch.setattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", -1)
+    assert client.get("/api/sync", headers=headers, params={"since": cursor}).status_code == 410
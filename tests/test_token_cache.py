@@ -0,0 +1,56 @@
+"""
+decode_token verifies each token once and serves its claims from a bounded
+cache until the token's exp.
+"""
+
+import time
+from datetime import timedelta
+
+import pytest
+from jose import jwt
+
+from app.core import security
+from app.core.security import create_access_token, decode_token, token_claims_cache
+
+
+@pytest.fixture
+def jwt_decodes(monkeypatch):
+    token_claims_cache.clear()
+    calls = []
+    original = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    yield calls
+    token_claims_cache.clear()
+
+
+def test_claims_are_cached_per_token(jwt_decodes):
+    token = create_access_token(subject="user-1")
+    other = create_access_token(subject="user-2")
+
+    assert decode_token(token)["sub"] == "user-1"
+    assert decode_token(token) is decode_token(token)
+    assert decode_token(other)["sub"] == "user-2"
+    assert len(jwt_decodes) == 2
+
+
+def test_invalid_tokens_are_not_cached(jwt_decodes):
+    assert decode_token("not-a-token") is None
+    assert decode_token("not-a-token") is None
+    assert len(jwt_decodes) == 2
+
+    tampered = create_access_token(subject="user-1")[:-2] + "xx"
+    assert decode_token(tampered) is None
+
+
+def test_entries_expire_with_the_token(jwt_decodes):
+    token = create_access_token(subject="user-1", expires_delta=timedelta(seconds=1))
+    assert decode_token(token) is not None
+    # jose compares exp in whole seconds
+    time.sleep(2.1)
+    assert decode_token(token) is None
+    assert len(jwt_decodes) == 2
@@ -0,0 +1,66 @@
+"""
+Weekly rollups are maintained incrementally on write and match a full
+rebuild from the source tables.
+"""
+
+from datetime import datetime, time, timedelta
+
+from app.models.rollup import WeeklyRollup
+from app.services.rollups import ROLLUP_COUNTERS, rebuild_weekly_rollups
+
+from .conftest import auth_headers
+
+
+def _rollups(db, user_id):
+    db.expire_all()
+    return {
+        row.week_start: tuple(getattr(row, c) for c in ROLLUP_COUNTERS)
+        for row in db.query(WeeklyRollup).filter(WeeklyRollup.user_id == user_id)
+    }
+
+
+def test_rollups_follow_writes_and_match_rebuild(client, db, make_user):
+    alice = make_user("alice")
+    user_id = alice.id
+    headers = auth_headers(alice)
+    today = datetime.utcnow().date()
+    # Early today, so the session always falls in the current ISO week
+    start = datetime.combine(today, time(0, 1))
+
+    response = client.post("/api/workout-sessions/", headers=headers, params={
+        "mode": "gym", "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=40)).isoformat(),
+    }, json=[{"name": "Squats", "sets": 3, "reps": 10, "weight_kg": 20}])
+    assert response.status_code == 200
+    # Unfinished sessions are not counted
+    client.post("/api/workout-sessions/", headers=headers, params={"mode": "home"})
+
+    habit_id = client.post("/api/habits/", headers=headers, params={"name": "Water"}).json()["id"]
+    for status in ("done", "skipped", "done"):
+        client.post(f"/api/habits/{habit_id}/logs", headers=headers,
+                    params={"log_date": today.isoformat(), "status": status})
+    client.post(f"/api/habits/{habit_id}/logs", headers=headers,
+                params={"log_date": (today - timedelta(days=14)).isoformat(), "status": "done"})
+
+    incremental = _rollups(db, user_id)
+    week_start = today - timedelta(days=today.weekday())
+    # Completed workouts, gym, home, volume, minutes, habits done, habits skipped
+    assert incremental[week_start] == (1, 1, 0, 600.0, 40, 1, 0)
+
+    stats = client.get("/api/habits/stats/weekly", headers=headers).json()
+    assert stats["completed_count"] == 1
+    assert stats["skipped_count"] == 0
+    assert stats["previous_week"]["week_start"] == (week_start - timedelta(weeks=1)).isoformat()
+    stats = client.get("/api/workout-sessions/stats/weekly", headers=headers).json()
+    assert stats["total_sessions"] == 1
+    assert stats["gym_sessions"] == 1
+    assert stats["previous_week"]["total_sessions"] == 0
+
+    snapshot = client.post("/api/progress/snapshots", headers=headers,
+                           params={"snapshot_date": today.isoformat()},
+                           json={"weight_kg": 70, "workouts_completed_week": 99}).json()
+    assert snapshot["metrics"]["workouts_completed_week"] == 1
+    assert snapshot["metrics"]["habits_completed_week"] == 1
+
+    rebuild_weekly_rollups(db, user_id=user_id)
+    assert _rollups(db, user_id) == incremental